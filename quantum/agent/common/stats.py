@@ -0,0 +1,173 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Timings and counters of the operations of an agent.
+
+The agents record the commands they execute, the RPC calls they make,
+their iptables applies and their loop iterations. When stats_socket is set,
+the statistics are served as JSON to the clients connecting to this UNIX
+domain socket, e.g. with "socat - UNIX-CONNECT:<stats_socket>".
+"""
+
+import bisect
+import contextlib
+import os
+import socket
+import time
+
+import eventlet
+
+from quantum.openstack.common import cfg
+from quantum.openstack.common import jsonutils
+from quantum.openstack.common import log as logging
+from quantum.openstack.common.rpc import proxy
+
+
+LOG = logging.getLogger(__name__)
+
+OPTS = [
+    cfg.StrOpt('stats_socket', default='',
+               help=_("Location of the UNIX domain socket serving the "
+                      "operation statistics of the agent, empty to disable "
+                      "it")),
+]
+
+cfg.CONF.register_opts(OPTS)
+
+# upper bounds in seconds of the buckets of the latency histograms
+LATENCY_BUCKETS = (0.001, 0.01, 0.1, 1, 10)
+
+
+class Timer(object):
+    """Count, total and longest duration and histogram of an operation."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # the last bucket counts the durations above all the bounds
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    def to_dict(self):
+        buckets = dict(('<=%s' % bound, count) for bound, count
+                       in zip(LATENCY_BUCKETS, self.buckets))
+        buckets['>%s' % LATENCY_BUCKETS[-1]] = self.buckets[-1]
+        return {'count': self.count,
+                'total': self.total,
+                'max': self.max,
+                'buckets': buckets}
+
+
+class Stats(object):
+    """Timers and counters of the operations, by name."""
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+
+    def record(self, name, duration):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Timer()
+        timer.record(duration)
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def timed(self, name):
+        """Record the duration of the with block under name."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, time.time() - start)
+
+    def to_dict(self):
+        return {'timers': dict((name, timer.to_dict())
+                               for name, timer in self.timers.iteritems()),
+                'counters': dict(self.counters)}
+
+
+STATS = Stats()
+
+record = STATS.record
+incr = STATS.incr
+timed = STATS.timed
+
+_installed = False
+
+
+class StatsServer(object):
+    """UNIX domain socket server sending the statistics to its clients."""
+
+    def __init__(self, path, stats=STATS):
+        self.path = path
+        self.stats = stats
+
+        dirname = os.path.dirname(path)
+        if os.path.isdir(dirname):
+            try:
+                os.unlink(path)
+            except OSError:
+                if os.path.exists(path):
+                    raise
+        else:
+            os.makedirs(dirname, 0755)
+
+    def _handler(self, client_sock, client_addr):
+        try:
+            client_sock.sendall(jsonutils.dumps(self.stats.to_dict()))
+        except Exception:
+            LOG.exception(_("Unable to send the agent statistics"))
+        finally:
+            client_sock.close()
+
+    def start(self):
+        """Spawn a green thread serving the statistics."""
+        listener = eventlet.listen(self.path, family=socket.AF_UNIX)
+        eventlet.spawn(eventlet.serve, listener, self._handler)
+
+
+def install():
+    """Time the RPC calls, made by the common code."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    call = proxy.RpcProxy.__dict__['call']
+
+    def timed_call(self, context, msg, *args, **kwargs):
+        with timed('rpc.%s' % msg.get('method')):
+            return call(self, context, msg, *args, **kwargs)
+    proxy.RpcProxy.call = timed_call
+
+
+def start_server(conf=cfg.CONF):
+    """Serve the statistics if stats_socket is configured."""
+    if not conf.stats_socket:
+        return
+    install()
+    StatsServer(conf.stats_socket).start()
+    LOG.info(_("Serving the agent statistics on %s"), conf.stats_socket)
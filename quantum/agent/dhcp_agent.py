@@ -17,12 +17,14 @@
 
 import os
 import socket
+import time
 import uuid
 
 import eventlet
 import netaddr
 
 from quantum.agent.common import config
+from quantum.agent.common import stats
 from quantum.agent.linux import dhcp
 from quantum.agent.linux import interface
 from quantum.agent.linux import ip_lib
@@ -34,6 +36,7 @@ from quantum.openstack.common import cfg
 from quantum.openstack.common import importutils
 from quantum.openstack.common import jsonutils
 from quantum.openstack.common import log as logging
+from quantum.openstack.common.rpc import common as rpc_common
 from quantum.openstack.common.rpc import proxy
 from quantum.openstack.common import uuidutils
 
@@ -45,6 +48,10 @@ class DhcpAgent(object):
     OPTS = [
         cfg.StrOpt('root_helper', default='sudo'),
         cfg.IntOpt('resync_interval', default=30),
+        cfg.IntOpt('sync_page_size', default=100,
+                   help="Number of networks fetched per RPC call when "
+                        "synchronizing the state, 0 to fetch the ids of all "
+                        "the networks at once and then each network."),
         cfg.StrOpt('dhcp_driver',
                    default='quantum.agent.linux.dhcp.Dnsmasq',
                    help="The driver used to manage the DHCP server."),
@@ -106,16 +113,46 @@ class DhcpAgent(object):
         LOG.info(_('Synchronizing state'))
         known_networks = set(self.cache.get_network_ids())
 
+        start = time.time()
         try:
-            active_networks = set(self.plugin_rpc.get_active_networks())
+            active_networks = None
+            if self.conf.sync_page_size > 0:
+                try:
+                    active_networks = self._sync_networks_paged()
+                except rpc_common.RemoteError as e:
+                    if e.exc_type != 'AttributeError':
+                        raise
+                    # the server predates get_active_networks_info
+                    LOG.warn(_("Unable to get the networks page by page, "
+                               "getting them one by one"))
+            if active_networks is None:
+                active_networks = set(self.plugin_rpc.get_active_networks())
+                for network_id in active_networks:
+                    self.refresh_dhcp_helper(network_id)
+
             for deleted_id in known_networks - active_networks:
                 self.disable_dhcp_helper(deleted_id)
-
-            for network_id in active_networks:
-                self.refresh_dhcp_helper(network_id)
         except:
             self.needs_resync = True
             LOG.exception(_('Unable to sync network state.'))
+        stats.record('agent.sync', time.time() - start)
+
+    def _sync_networks_paged(self):
+        """Refresh the active networks page by page.
+
+        Each network is processed as soon as its page is received. Returns
+        the ids of all the active networks.
+        """
+        active_networks = set()
+        marker = None
+        while True:
+            networks, marker = self.plugin_rpc.get_active_networks_info(
+                marker, self.conf.sync_page_size)
+            for network in networks:
+                active_networks.add(network.id)
+                self.refresh_dhcp_helper(network.id, network)
+            if not marker:
+                return active_networks
 
     def _periodic_resync_helper(self):
         """Resync the dhcp state at the configured interval."""
@@ -129,13 +166,20 @@ class DhcpAgent(object):
         """Spawn a thread to periodically resync the dhcp state."""
         eventlet.spawn(self._periodic_resync_helper)
 
-    def enable_dhcp_helper(self, network_id):
-        """Enable DHCP for a network that meets enabling criteria."""
+    def _get_network_info(self, network_id):
         try:
-            network = self.plugin_rpc.get_network_info(network_id)
+            return self.plugin_rpc.get_network_info(network_id)
         except:
             self.needs_resync = True
             LOG.exception(_('Network %s RPC info call failed.') % network_id)
+
+    def enable_dhcp_helper(self, network_id, network=None):
+        """Enable DHCP for a network that meets enabling criteria.
+
+        The network info is retrieved from the plugin unless given.
+        """
+        network = network or self._get_network_info(network_id)
+        if not network:
             return
 
         if not network.admin_state_up:
@@ -154,21 +198,19 @@ class DhcpAgent(object):
             if self.call_driver('disable', network):
                 self.cache.remove(network)
 
-    def refresh_dhcp_helper(self, network_id):
+    def refresh_dhcp_helper(self, network_id, network=None):
         """Refresh or disable DHCP for a network depending on the current state
         of the network.
 
+        The network info is retrieved from the plugin unless given.
         """
         old_network = self.cache.get_network_by_id(network_id)
         if not old_network:
             # DHCP current not running for network.
-            return self.enable_dhcp_helper(network_id)
+            return self.enable_dhcp_helper(network_id, network)
 
-        try:
-            network = self.plugin_rpc.get_network_info(network_id)
-        except:
-            self.needs_resync = True
-            LOG.exception(_('Network %s RPC info call failed.') % network_id)
+        network = network or self._get_network_info(network_id)
+        if not network:
             return
 
         old_cidrs = set(s.cidr for s in old_network.subnets if s.enable_dhcp)
@@ -265,6 +307,19 @@ class DhcpPluginApi(proxy.RpcProxy):
                                                  host=self.host),
                                    topic=self.topic))
 
+    def get_active_networks_info(self, marker, limit):
+        """Make a remote process call to retrieve a page of the active
+        networks, with their subnets and ports, and the next page marker.
+        """
+        page = self.call(self.context,
+                         self.make_msg('get_active_networks_info',
+                                       host=self.host,
+                                       marker=marker,
+                                       limit=limit),
+                         topic=self.topic)
+        return ([DictModel(network) for network in page['networks']],
+                page['marker'])
+
     def get_dhcp_port(self, network_id, device_id):
         """Make a remote process call to create the dhcp port."""
         return DictModel(self.call(self.context,
@@ -548,4 +603,5 @@ def main():
     config.setup_logging(cfg.CONF)
 
     mgr = DhcpAgent(cfg.CONF)
+    stats.start_server()
     mgr.run()
@@ -26,6 +26,7 @@ from eventlet import semaphore
 import netaddr
 
 from quantum.agent.common import config
+from quantum.agent.common import stats
 from quantum.agent.linux import external_process
 from quantum.agent.linux import interface
 from quantum.agent.linux import ip_lib
@@ -66,13 +67,20 @@ class L3PluginApi(proxy.RpcProxy):
             topic=topic, default_version=self.BASE_RPC_API_VERSION)
         self.host = host
 
-    def get_routers(self, context, fullsync=True, router_id=None):
-        """Make a remote process call to retrieve the sync data for routers."""
+    def get_routers(self, context, fullsync=True, router_id=None,
+                    marker=None, limit=None):
+        """Make a remote process call to retrieve the sync data for routers.
+
+        With a limit, at most limit routers whose id is greater than marker
+        are returned, sorted by id.
+        """
         router_ids = [router_id] if router_id else None
         return self.call(context,
                          self.make_msg('sync_routers', host=self.host,
                                        fullsync=fullsync,
-                                       router_ids=router_ids),
+                                       router_ids=router_ids,
+                                       marker=marker,
+                                       limit=limit),
                          topic=self.topic)
 
     def get_external_network_id(self, context):
@@ -136,6 +144,10 @@ class L3NATAgent(manager.Manager):
                         "by the agents."),
         cfg.StrOpt('l3_agent_manager',
                    default='quantum.agent.l3_agent.L3NATAgent'),
+        cfg.IntOpt('sync_page_size', default=100,
+                   help="Number of routers fetched per RPC call when "
+                        "synchronizing the routers, 0 to fetch them all at "
+                        "once."),
     ]
 
     def __init__(self, host, conf=None):
@@ -592,15 +604,29 @@ class L3NATAgent(manager.Manager):
                         router_id = self.conf.router_id
                     else:
                         router_id = None
-                    routers = self.plugin_rpc.get_routers(
-                        context, router_id)
                     self.router_info = {}
-                    self._process_routers(routers)
+                    with stats.timed('agent.sync'):
+                        self._sync_routers_paged(context, router_id)
                     self.fullsync = False
                 except Exception:
                     LOG.exception(_("Failed synchronizing routers"))
                     self.fullsync = True
 
+    def _sync_routers_paged(self, context, router_id):
+        """Process the routers as soon as each page of them is received."""
+        page_size = self.conf.sync_page_size
+        marker = None
+        while True:
+            routers = self.plugin_rpc.get_routers(
+                context, router_id=router_id, marker=marker,
+                limit=page_size or None)
+            self._process_routers(routers)
+            # a server not supporting pages returns all the routers
+            if (not page_size or len(routers) != page_size or
+                    routers[-1]['id'] == marker):
+                return
+            marker = routers[-1]['id']
+
     def after_start(self):
         LOG.info(_("L3 agent started"))
 
@@ -613,6 +639,7 @@ def main():
     conf.register_opts(external_process.OPTS)
     conf()
     config.setup_logging(conf)
+    stats.start_server()
     server = quantum_service.Service.create(binary='quantum-l3-agent',
                                             topic=topics.L3_AGENT)
     service.launch(server).wait()
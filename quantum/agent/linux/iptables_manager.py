@@ -24,6 +24,7 @@
 import inspect
 import os
 
+from quantum.agent.common import stats
 from quantum.agent.linux import utils
 from quantum.openstack.common import lockutils
 from quantum.openstack.common import log as logging
@@ -303,6 +304,14 @@ class IptablesManager(object):
         if self.use_ipv6:
             s += [('ip6tables', self.ipv6)]
 
+        with stats.timed('iptables.apply'):
+            self._apply_tables(s)
+        stats.incr('iptables.rules_applied',
+                   sum(len(table.rules) for cmd, tables in s
+                       for table in tables.itervalues()))
+        LOG.debug(("IPTablesManager.apply completed with success"))
+
+    def _apply_tables(self, s):
         for cmd, tables in s:
             for table in tables:
                 args = ['%s-save' % cmd, '-t', table]
@@ -319,7 +328,6 @@ class IptablesManager(object):
                 self.execute(args,
                              process_input='\n'.join(new_filter),
                              root_helper=self.root_helper)
-        LOG.debug(("IPTablesManager.apply completed with success"))
 
     def _modify_rules(self, current_lines, table, binary=None):
         unwrapped_chains = table.unwrapped_chains
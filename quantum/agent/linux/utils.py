@@ -22,9 +22,11 @@ import os
 import shlex
 import socket
 import struct
+import time
 
 from eventlet.green import subprocess
 
+from quantum.agent.common import stats
 from quantum.common import utils
 from quantum.openstack.common import log as logging
 
@@ -34,6 +36,7 @@ LOG = logging.getLogger(__name__)
 
 def execute(cmd, root_helper=None, process_input=None, addl_env=None,
             check_exit_code=True, return_stderr=False):
+    binary = os.path.basename(str(cmd[0]))
     if root_helper:
         cmd = shlex.split(root_helper) + cmd
     cmd = map(str, cmd)
@@ -42,6 +45,7 @@ def execute(cmd, root_helper=None, process_input=None, addl_env=None,
     env = os.environ.copy()
     if addl_env:
         env.update(addl_env)
+    start = time.time()
     obj = utils.subprocess_popen(cmd, shell=False,
                                  stdin=subprocess.PIPE,
                                  stdout=subprocess.PIPE,
@@ -52,6 +56,7 @@ def execute(cmd, root_helper=None, process_input=None, addl_env=None,
                         obj.communicate(process_input) or
                         obj.communicate())
     obj.stdin.close()
+    stats.record('execute.%s' % binary, time.time() - start)
     m = _("\nCommand: %(cmd)s\nExit code: %(code)s\nStdout: %(stdout)r\n"
           "Stderr: %(stderr)r") % {'cmd': cmd, 'code': obj.returncode,
                                    'stdout': _stdout, 'stderr': _stderr}
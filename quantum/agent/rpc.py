@@ -17,12 +17,15 @@
 
 import eventlet
 
+from quantum.common import rpc as q_rpc
 from quantum.common import topics
 
+from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
 from quantum.openstack.common.notifier import api
 from quantum.openstack.common.notifier import rpc_notifier
 from quantum.openstack.common import rpc
+from quantum.openstack.common.rpc import common as rpc_common
 from quantum.openstack.common.rpc import proxy
 from quantum.openstack.common import uuidutils
 
@@ -49,7 +52,62 @@ def create_consumers(dispatcher, prefix, topic_details):
     return connection
 
 
-class PluginApi(proxy.RpcProxy):
+class BatchRpcApiMixin(object):
+    """Mixin adding batched calls to an RpcProxy based client.
+
+    The messages of a batch are sent to the plugin in a single rpc call and
+    executed there in order by the PluginRpcDispatcher, saving a round trip
+    per message.
+    """
+
+    def batch_call(self, context, msgs, topic=None, timeout=None):
+        """Issue several rpc calls in a single round trip.
+
+        :param context: The request context
+        :param msgs: The messages to send, as built by make_msg().
+        :param topic: Override the topic for this batch.
+        :param timeout: (Optional) A timeout to use when waiting for the
+               response.
+
+        :returns: A list holding, for each message, the value returned by
+                  the remote method or the exception it raised.
+        """
+        if not msgs:
+            return []
+        for msg in msgs:
+            self._set_version(msg, msg.get('version'))
+        try:
+            replies = self.call(context,
+                                self.make_msg(q_rpc.BATCH_CALL, calls=msgs),
+                                topic=topic, timeout=timeout)
+        except AttributeError:
+            # NOTE: the remote side predates batching, fall back to
+            # issuing the calls one by one.
+            LOG.debug(_("Batched rpc calls unsupported, calling serially"))
+            return self._serial_call(context, msgs, topic, timeout)
+
+        results = []
+        for reply in replies:
+            if 'failure' in reply:
+                results.append(rpc_common.deserialize_remote_exception(
+                    cfg.CONF, reply['failure']))
+            else:
+                results.append(reply.get('result'))
+        return results
+
+    def _serial_call(self, context, msgs, topic, timeout):
+        results = []
+        for msg in msgs:
+            try:
+                results.append(self.call(context, msg, topic=topic,
+                                         version=msg.get('version'),
+                                         timeout=timeout))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class PluginApi(BatchRpcApiMixin, proxy.RpcProxy):
     '''Agent side of the rpc API.
 
     API version history:
@@ -69,6 +127,19 @@ class PluginApi(proxy.RpcProxy):
                                        agent_id=agent_id),
                          topic=self.topic)
 
+    def get_devices_details_list(self, context, devices, agent_id):
+        """Retrieve the details of several devices in a single call.
+
+        :returns: A list holding the details of each device, or the
+                  exception raised while retrieving them.
+        """
+        return self.batch_call(context,
+                               [self.make_msg('get_device_details',
+                                              device=device,
+                                              agent_id=agent_id)
+                                for device in devices],
+                               topic=self.topic)
+
     def update_device_down(self, context, device, agent_id):
         return self.call(context,
                          self.make_msg('update_device_down', device=device,
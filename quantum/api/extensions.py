@@ -20,6 +20,7 @@
 from abc import ABCMeta
 import imp
 import os
+import time
 
 import routes
 import webob.dec
@@ -30,12 +31,17 @@ import quantum.extensions
 from quantum.manager import QuantumManager
 from quantum.openstack.common import cfg
 from quantum.openstack.common import importutils
+from quantum.openstack.common import jsonutils
 from quantum.openstack.common import log as logging
 from quantum import wsgi
 
 
 LOG = logging.getLogger('quantum.api.extensions')
 
+# Name of the file of an extension path mapping the aliases of its
+# extensions to the modules defining them
+MANIFEST = 'manifest.json'
+
 
 class PluginInterface(object):
     __metaclass__ = ABCMeta
@@ -377,6 +383,8 @@ class ExtensionManager(object):
         LOG.info(_('Initializing extension manager.'))
         self.path = path
         self.extensions = {}
+        # seconds spent importing and checking each loaded extension file
+        self.load_times = {}
         self._load_all_extensions()
 
     def get_resources(self):
@@ -471,19 +479,54 @@ class ExtensionManager(object):
         extension implementation.
 
         """
+        start = time.time()
         for path in self.path.split(':'):
             if os.path.exists(path):
                 self._load_all_extensions_from_path(path)
             else:
                 LOG.error(_("Extension path '%s' doesn't exist!"), path)
+        LOG.info(_("Loaded %(count)d extensions in %(time).3f seconds"),
+                 {'count': len(self.extensions), 'time': time.time() - start})
+
+    def _read_manifest(self, path):
+        """Return the aliases of the extension modules of path by module.
+
+        Paths without manifest give an empty dict, their extensions are
+        all loaded.
+        """
+        manifest_path = os.path.join(path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path) as f:
+                manifest = jsonutils.loads(f.read())
+        except (IOError, ValueError) as exception:
+            LOG.warn(_("Extension manifest %(file)s wasn't read due to "
+                       "%(e)s"), {'file': manifest_path, 'e': exception})
+            return {}
+        return dict((mod_name, alias)
+                    for alias, mod_name in manifest.iteritems())
+
+    def _is_extension_needed(self, alias):
+        """Tell if the extension with alias has to be imported."""
+        return True
 
     def _load_all_extensions_from_path(self, path):
+        manifest = self._read_manifest(path)
         for f in os.listdir(path):
             try:
                 LOG.info(_('Loading extension file: %s'), f)
                 mod_name, file_ext = os.path.splitext(os.path.split(f)[-1])
                 ext_path = os.path.join(path, f)
                 if file_ext.lower() == '.py' and not mod_name.startswith('_'):
+                    alias = manifest.get(mod_name)
+                    if alias is not None and not self._is_extension_needed(
+                            alias):
+                        LOG.debug(_('Skipped extension file %(file)s, '
+                                    'extension %(alias)s is not needed'),
+                                  {'file': f, 'alias': alias})
+                        continue
+                    start = time.time()
                     mod = imp.load_source(mod_name, ext_path)
                     ext_name = mod_name[0].upper() + mod_name[1:]
                     new_ext_class = getattr(mod, ext_name, None)
@@ -495,6 +538,10 @@ class ExtensionManager(object):
                         continue
                     new_ext = new_ext_class()
                     self.add_extension(new_ext)
+                    self.load_times[ext_path] = time.time() - start
+                    LOG.debug(_('Extension file %(file)s loaded in '
+                                '%(time).3f seconds'),
+                              {'file': f, 'time': self.load_times[ext_path]})
             except Exception as exception:
                 LOG.warn(_("extension file %(file)s wasn't loaded due to "
                            "%(e)s"),
@@ -531,6 +578,11 @@ class PluginAwareExtensionManager(ExtensionManager):
                 self._plugins_support(extension) and
                 self._plugins_implement_interface(extension))
 
+    def _is_extension_needed(self, alias):
+        return any(alias in getattr(plugin, 'supported_extension_aliases',
+                                    [])
+                   for plugin in self.plugins.itervalues())
+
     def _plugins_support(self, extension):
         alias = extension.get_alias()
         supports_extension = any((hasattr(plugin,
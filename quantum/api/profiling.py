@@ -0,0 +1,94 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import random
+
+import webob.dec
+
+from quantum.common import profiler
+from quantum.openstack.common import log as logging
+from quantum import wsgi
+
+
+LOG = logging.getLogger(__name__)
+
+# Response header carrying the profile of the request
+PROFILE_HEADER = 'X-Quantum-Profile'
+
+
+class ProfilingMiddleware(wsgi.Middleware):
+    """Break down where the time of a sample of the requests goes.
+
+    The profile of a request counts the SQL statements, policy and quota
+    checks, notifications and RPC calls, and their duration. It is logged
+    when the request takes longer than slow_request_threshold seconds, and
+    returned in the X-Quantum-Profile header when headers is true.
+
+    Put the filter first in the pipeline, so that the request context is
+    made while the request is profiled. The profile of a streamed response
+    is completed while its body is sent, except with headers: the body is
+    then read before the response is returned, to know the profile.
+    """
+
+    def __init__(self, application, sample_rate=1.0,
+                 slow_request_threshold=1.0, headers=False):
+        super(ProfilingMiddleware, self).__init__(application)
+        self.sample_rate = float(sample_rate)
+        self.slow_request_threshold = float(slow_request_threshold)
+        self.headers = str(headers).lower() in ('true', '1', 'yes', 'on')
+        profiler.install()
+
+    @webob.dec.wsgify
+    def __call__(self, req):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.application
+        profile = profiler.start()
+        try:
+            response = req.get_response(self.application)
+            if self.headers:
+                # NOTE: the profile is only complete once the body is read
+                response.body
+        finally:
+            profiler.stop(profile)
+        if self.headers:
+            response.headers[PROFILE_HEADER] = str(profile)
+            self._log(req, response, profile)
+        else:
+            content_length = response.content_length
+            response.app_iter = self._profiled_body(req, response,
+                                                    response.app_iter,
+                                                    profile)
+            response.content_length = content_length
+        return response
+
+    def _profiled_body(self, req, response, app_iter, profile):
+        profiler.resume(profile)
+        try:
+            for chunk in app_iter:
+                yield chunk
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+            profiler.stop(profile)
+            self._log(req, response, profile)
+
+    def _log(self, req, response, profile):
+        if profile.duration >= self.slow_request_threshold:
+            LOG.info(_("Slow request %(method)s %(path)s "
+                       "(%(status)s): %(profile)s"),
+                     {'method': req.method, 'path': req.path_qs,
+                      'status': response.status_int, 'profile': profile})
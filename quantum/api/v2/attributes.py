@@ -123,7 +123,7 @@ def _validate_fixed_ips(data, valid_values=None):
         LOG.debug("validate_fixed_ips: %s", msg)
         return msg
 
-    ips = []
+    ips = set()
     for fixed_ip in data:
         if 'ip_address' in fixed_ip:
             # Ensure that duplicate entries are not set - just checking IP
@@ -136,7 +136,7 @@ def _validate_fixed_ips(data, valid_values=None):
             if msg:
                 LOG.debug("validate_fixed_ips: %s", msg)
                 return msg
-            ips.append(fixed_ip_address)
+            ips.add(fixed_ip_address)
         if 'subnet_id' in fixed_ip:
             msg = _validate_uuid(fixed_ip['subnet_id'])
             if msg:
@@ -150,12 +150,12 @@ def _validate_nameservers(data, valid_values=None):
         LOG.debug("validate_nameservers: %s", msg)
         return msg
 
-    ips = []
+    ips = set()
     for ip in data:
         msg = _validate_ip_address(ip)
         if msg:
             # This may be a hostname
-            msg = _validate_regex(ip, HOSTNAME_PATTERN)
+            msg = _validate_regex(ip, HOSTNAME_REGEX)
             if msg:
                 msg = _("'%s' is not a valid nameserver") % ip
                 LOG.debug("validate_nameservers: %s", msg)
@@ -164,7 +164,7 @@ def _validate_nameservers(data, valid_values=None):
             msg = _("Duplicate nameserver %s") % ip
             LOG.debug("validate_nameservers: %s", msg)
             return msg
-        ips.append(ip)
+        ips.add(ip)
 
 
 def _validate_hostroutes(data, valid_values=None):
@@ -174,7 +174,7 @@ def _validate_hostroutes(data, valid_values=None):
         return msg
 
     expected_keys = ['destination', 'nexthop']
-    hostroutes = []
+    hostroutes = set()
     for hostroute in data:
         msg = _verify_dict_keys(expected_keys, hostroute)
         if msg:
@@ -188,11 +188,12 @@ def _validate_hostroutes(data, valid_values=None):
         if msg:
             LOG.debug("validate_hostroutes: %s", msg)
             return msg
-        if hostroute in hostroutes:
+        route = (hostroute['destination'], hostroute['nexthop'])
+        if route in hostroutes:
             msg = _("Duplicate hostroute %s") % hostroute
             LOG.debug("validate_hostroutes: %s", msg)
             return msg
-        hostroutes.append(hostroute)
+        hostroutes.add(route)
 
 
 def _validate_ip_address_or_none(data, valid_values=None):
@@ -215,6 +216,7 @@ def _validate_subnet(data, valid_values=None):
 
 
 def _validate_regex(data, valid_values=None):
+    # valid_values may be a pattern or a compiled regular expression
     try:
         if re.match(valid_values, data):
             return
@@ -349,6 +351,7 @@ def convert_to_list(data):
 
 HOSTNAME_PATTERN = ("(?=^.{1,254}$)(^(?:(?!\d+\.|-)[a-zA-Z0-9_\-]"
                     "{1,63}(?<!-)\.?)+(?:[a-zA-Z]{2,})$)")
+HOSTNAME_REGEX = re.compile(HOSTNAME_PATTERN)
 
 HEX_ELEM = '[0-9A-Fa-f]'
 UUID_PATTERN = '-'.join([HEX_ELEM + '{8}', HEX_ELEM + '{4}',
@@ -377,6 +380,18 @@ validators = {'type:dict': _validate_dict,
               'type:uuid_list': _validate_uuid_list,
               'type:values': _validate_values}
 
+
+def compile_validator(rule, valid_values):
+    """Return a function checking a value against a validation rule.
+
+    The arguments of the rule are prepared once, the regular expressions
+    are compiled.
+    """
+    validator = validators[rule]
+    if rule == 'type:regex' and isinstance(valid_values, basestring):
+        valid_values = re.compile(valid_values)
+    return lambda data: validator(data, valid_values)
+
 # Note: a default of ATTR_NOT_SPECIFIED indicates that an
 # attribute is not required, but will be generated by the plugin
 # if it is not specified.  Particularly, a value of ATTR_NOT_SPECIFIED
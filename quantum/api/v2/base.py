@@ -15,12 +15,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+
 import netaddr
 import webob.exc
 
 from quantum.api.v2 import attributes
 from quantum.api.v2 import resource as wsgi_resource
 from quantum.common import exceptions
+from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
 from quantum.openstack.common.notifier import api as notifier_api
 from quantum import policy
@@ -78,6 +81,97 @@ def _filters(request, attr_info):
     return res
 
 
+class ResourceAttributes(object):
+    """Checks and conversions of the attributes of a resource.
+
+    They are compiled once from the attr_info of the resource, so that
+    preparing a request body only looks at the attributes having rules
+    and runs validators whose arguments are already prepared.
+    """
+
+    def __init__(self, attr_info):
+        # (attr, allow_post, has default, default) in attr_info order
+        self._post_rules = []
+        self._read_only = []
+        # (attr, convert_to, validators) of the attributes having any
+        self._checks = []
+        for attr, attr_vals in attr_info.iteritems():
+            self._post_rules.append((attr, attr_vals.get('allow_post'),
+                                     'default' in attr_vals,
+                                     attr_vals.get('default')))
+            if not attr_vals.get('allow_put'):
+                self._read_only.append(attr)
+            convert_to = attr_vals.get('convert_to')
+            validators = [attributes.compile_validator(rule, valid_values)
+                          for rule, valid_values
+                          in attr_vals.get('validate', {}).iteritems()]
+            if convert_to or validators:
+                self._checks.append((attr, convert_to, validators))
+
+    def prepare_request_body(self, context, body, is_create, resource,
+                             allow_bulk=False):
+        """Check and convert the attributes of a deserialized body.
+
+        See Controller.prepare_request_body.
+        """
+        collection = resource + "s"
+        if not body:
+            raise webob.exc.HTTPBadRequest(_("Resource body required"))
+
+        if collection in body:
+            if not allow_bulk:
+                raise webob.exc.HTTPBadRequest(_("Bulk operation "
+                                                 "not supported"))
+            bulk_body = [self.prepare_request_body(
+                context, item if resource in item else {resource: item},
+                is_create, resource, allow_bulk)
+                for item in body[collection]]
+            if not bulk_body:
+                raise webob.exc.HTTPBadRequest(_("Resources required"))
+            return {collection: bulk_body}
+
+        res_dict = body.get(resource)
+        if res_dict is None:
+            msg = _("Unable to find '%s' in request body") % resource
+            raise webob.exc.HTTPBadRequest(msg)
+
+        Controller._populate_tenant_id(context, res_dict, is_create)
+
+        if is_create:  # POST
+            for attr, allow_post, has_default, default in self._post_rules:
+                if allow_post:
+                    if not has_default and attr not in res_dict:
+                        msg = _("Failed to parse request. Required "
+                                "attribute '%s' not specified") % attr
+                        raise webob.exc.HTTPBadRequest(msg)
+                    res_dict.setdefault(attr, default)
+                elif attr in res_dict:
+                    msg = _("Attribute '%s' not allowed in POST") % attr
+                    raise webob.exc.HTTPBadRequest(msg)
+        else:  # PUT
+            for attr in self._read_only:
+                if attr in res_dict:
+                    msg = _("Cannot update read-only attribute %s") % attr
+                    raise webob.exc.HTTPBadRequest(msg)
+
+        for attr, convert_to, validators in self._checks:
+            value = res_dict.get(attr, attributes.ATTR_NOT_SPECIFIED)
+            if value is attributes.ATTR_NOT_SPECIFIED:
+                continue
+            # Convert values if necessary
+            if convert_to:
+                value = res_dict[attr] = convert_to(value)
+            # Check that configured values are correct
+            for validator in validators:
+                res = validator(value)
+                if res:
+                    msg_dict = dict(attr=attr, reason=res)
+                    msg = _("Invalid input for %(attr)s. "
+                            "Reason: %(reason)s.") % msg_dict
+                    raise webob.exc.HTTPBadRequest(msg)
+        return body
+
+
 class Controller(object):
     LIST = 'list'
     SHOW = 'show'
@@ -93,8 +187,10 @@ class Controller(object):
         self._collection = collection.replace('-', '_')
         self._resource = resource.replace('-', '_')
         self._attr_info = attr_info
+        self._attributes = ResourceAttributes(attr_info)
         self._allow_bulk = allow_bulk
         self._native_bulk = self._is_native_bulk_supported()
+        self._native_revision = self._is_native_revision_supported()
         self._policy_attrs = [name for (name, info) in self._attr_info.items()
                               if info.get('required_by_policy')]
         self._publisher_id = notifier_api.publisher_id('network')
@@ -114,11 +210,50 @@ class Controller(object):
             self._plugin_handlers[action] = '%s%s_%s' % (action, parent_part,
                                                          self._resource)
 
+    def _notify_start(self, request, action, payload):
+        if cfg.CONF.notify_start_events:
+            notifier_api.notify(request.context,
+                                self._publisher_id,
+                                '%s.%s.start' % (self._resource, action),
+                                notifier_api.CONF.default_notification_level,
+                                payload)
+
     def _is_native_bulk_supported(self):
         native_bulk_attr_name = ("_%s__native_bulk_support"
                                  % self._plugin.__class__.__name__)
         return getattr(self._plugin, native_bulk_attr_name, False)
 
+    def _is_native_revision_supported(self):
+        native_revision_attr_name = ("_%s__native_revision_support"
+                                     % self._plugin.__class__.__name__)
+        return getattr(self._plugin, native_revision_attr_name, False)
+
+    def _check_revision(self, request, action, *args):
+        """Answer 304 if the client already has the current representation.
+
+        Otherwise the ETag of the representation is stored in the request
+        environment, for the response to carry it. Only the revisions of the
+        requested resources are read, nothing is done for resources the
+        plugin has no revisions for.
+        """
+        handler = self._plugin_handlers[action]
+        revision_getter = getattr(self._plugin, '%s_revision' % handler, None)
+        if not self._native_revision or not revision_getter:
+            return
+        revision = revision_getter(request.context, *args)
+        if revision is None:
+            return
+        # NOTE: the representation also depends on the query, on the format
+        # and on what the user is allowed to see
+        ctx = request.context
+        etag = hashlib.md5(repr((revision, request.path_qs,
+                                 request.headers.get('Accept'),
+                                 ctx.tenant_id, sorted(ctx.roles))))
+        etag = etag.hexdigest()
+        if etag in request.if_none_match:
+            raise webob.exc.HTTPNotModified(headers={'ETag': '"%s"' % etag})
+        request.environ['quantum.etag'] = etag
+
     def _is_visible(self, attr):
         attr_val = self._attr_info.get(attr)
         return attr_val and attr_val['is_visible']
@@ -200,6 +335,9 @@ class Controller(object):
     def index(self, request, **kwargs):
         """Returns a list of the requested entity"""
         parent_id = kwargs.get(self._parent_id_name)
+        if not parent_id:
+            self._check_revision(request, self.LIST,
+                                 _filters(request, self._attr_info))
         return self._items(request, True, parent_id)
 
     def show(self, request, id, **kwargs):
@@ -210,6 +348,8 @@ class Controller(object):
             # away by the plugin before returning.
             field_list, added_fields = self._do_field_list(_fields(request))
             parent_id = kwargs.get(self._parent_id_name)
+            if not parent_id:
+                self._check_revision(request, self.SHOW, id)
             return {self._resource:
                     self._view(self._item(request,
                                           id,
@@ -257,14 +397,10 @@ class Controller(object):
     def create(self, request, body=None, **kwargs):
         """Creates a new instance of the requested entity"""
         parent_id = kwargs.get(self._parent_id_name)
-        notifier_api.notify(request.context,
-                            self._publisher_id,
-                            self._resource + '.create.start',
-                            notifier_api.CONF.default_notification_level,
-                            body)
-        body = Controller.prepare_request_body(request.context, body, True,
-                                               self._resource, self._attr_info,
-                                               allow_bulk=self._allow_bulk)
+        self._notify_start(request, 'create', body)
+        body = self._attributes.prepare_request_body(
+            request.context, body, True, self._resource,
+            allow_bulk=self._allow_bulk)
         action = self._plugin_handlers[self.CREATE]
         # Check authz
         if self._collection in body:
@@ -330,11 +466,7 @@ class Controller(object):
 
     def delete(self, request, id, **kwargs):
         """Deletes the specified entity"""
-        notifier_api.notify(request.context,
-                            self._publisher_id,
-                            self._resource + '.delete.start',
-                            notifier_api.CONF.default_notification_level,
-                            {self._resource + '_id': id})
+        self._notify_start(request, 'delete', {self._resource + '_id': id})
         action = self._plugin_handlers[self.DELETE]
 
         # Check authz
@@ -363,14 +495,10 @@ class Controller(object):
         parent_id = kwargs.get(self._parent_id_name)
         payload = body.copy()
         payload['id'] = id
-        notifier_api.notify(request.context,
-                            self._publisher_id,
-                            self._resource + '.update.start',
-                            notifier_api.CONF.default_notification_level,
-                            payload)
-        body = Controller.prepare_request_body(request.context, body, False,
-                                               self._resource, self._attr_info,
-                                               allow_bulk=self._allow_bulk)
+        self._notify_start(request, 'update', payload)
+        body = self._attributes.prepare_request_body(
+            request.context, body, False, self._resource,
+            allow_bulk=self._allow_bulk)
         action = self._plugin_handlers[self.UPDATE]
         # Load object to check authz
         # but pass only attributes in the original body and required
@@ -434,72 +562,8 @@ class Controller(object):
 
             body argument must be the deserialized body
         """
-        collection = resource + "s"
-        if not body:
-            raise webob.exc.HTTPBadRequest(_("Resource body required"))
-
-        prep_req_body = lambda x: Controller.prepare_request_body(
-            context,
-            x if resource in x else {resource: x},
-            is_create,
-            resource,
-            attr_info,
-            allow_bulk)
-        if collection in body:
-            if not allow_bulk:
-                raise webob.exc.HTTPBadRequest(_("Bulk operation "
-                                                 "not supported"))
-            bulk_body = [prep_req_body(item) for item in body[collection]]
-            if not bulk_body:
-                raise webob.exc.HTTPBadRequest(_("Resources required"))
-            return {collection: bulk_body}
-
-        res_dict = body.get(resource)
-        if res_dict is None:
-            msg = _("Unable to find '%s' in request body") % resource
-            raise webob.exc.HTTPBadRequest(msg)
-
-        Controller._populate_tenant_id(context, res_dict, is_create)
-
-        if is_create:  # POST
-            for attr, attr_vals in attr_info.iteritems():
-                if attr_vals['allow_post']:
-                    if ('default' not in attr_vals and
-                        attr not in res_dict):
-                        msg = _("Failed to parse request. Required "
-                                "attribute '%s' not specified") % attr
-                        raise webob.exc.HTTPBadRequest(msg)
-                    res_dict[attr] = res_dict.get(attr,
-                                                  attr_vals.get('default'))
-                else:
-                    if attr in res_dict:
-                        msg = _("Attribute '%s' not allowed in POST") % attr
-                        raise webob.exc.HTTPBadRequest(msg)
-        else:  # PUT
-            for attr, attr_vals in attr_info.iteritems():
-                if attr in res_dict and not attr_vals['allow_put']:
-                    msg = _("Cannot update read-only attribute %s") % attr
-                    raise webob.exc.HTTPBadRequest(msg)
-
-        for attr, attr_vals in attr_info.iteritems():
-            if (attr not in res_dict or
-                res_dict[attr] is attributes.ATTR_NOT_SPECIFIED):
-                continue
-            # Convert values if necessary
-            if 'convert_to' in attr_vals:
-                res_dict[attr] = attr_vals['convert_to'](res_dict[attr])
-            # Check that configured values are correct
-            if 'validate' not in attr_vals:
-                continue
-            for rule in attr_vals['validate']:
-                res = attributes.validators[rule](res_dict[attr],
-                                                  attr_vals['validate'][rule])
-                if res:
-                    msg_dict = dict(attr=attr, reason=res)
-                    msg = _("Invalid input for %(attr)s. "
-                            "Reason: %(reason)s.") % msg_dict
-                    raise webob.exc.HTTPBadRequest(msg)
-        return body
+        return ResourceAttributes(attr_info).prepare_request_body(
+            context, body, is_create, resource, allow_bulk)
 
     def _validate_network_tenant_ownership(self, request, resource_item):
         # TODO(salvatore-orlando): consider whether this check can be folded
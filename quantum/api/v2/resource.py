@@ -23,6 +23,7 @@ import webob.dec
 import webob.exc
 
 from quantum.common import exceptions
+from quantum.common import profiler
 from quantum import context
 from quantum.openstack.common import jsonutils as json
 from quantum.openstack.common import log as logging
@@ -49,6 +50,17 @@ class Request(webob.Request):
         return self.environ['quantum.context']
 
 
+def _is_collection(action, result):
+    """Whether the result is a {collection: list of items} dict.
+
+    The items are checked against the policy and formatted by the
+    controller, only their serialization is streamed: an error raised
+    while streaming could not be turned into a fault anymore.
+    """
+    return (action == 'index' and isinstance(result, dict) and
+            len(result) == 1 and isinstance(result.values()[0], list))
+
+
 def Resource(controller, faults=None, deserializers=None, serializers=None):
     """Represents an API entity resource and the associated serialization and
     deserialization logic
@@ -56,7 +68,7 @@ def Resource(controller, faults=None, deserializers=None, serializers=None):
     default_deserializers = {'application/xml': wsgi.XMLDeserializer(),
                              'application/json': lambda x: json.loads(x)}
     default_serializers = {'application/xml': wsgi.XMLDictSerializer(),
-                           'application/json': lambda x: json.dumps(x)}
+                           'application/json': wsgi.JSONDictSerializer()}
     format_types = {'xml': 'application/xml',
                     'json': 'application/json'}
     action_status = dict(create=201, delete=204)
@@ -93,7 +105,10 @@ def Resource(controller, faults=None, deserializers=None, serializers=None):
 
             method = getattr(controller, action)
 
-            result = method(request=request, **args)
+            with profiler.span(profiler.CONTROLLER):
+                result = method(request=request, **args)
+        except webob.exc.HTTPNotModified:
+            raise
         except (ValueError, AttributeError,
                 exceptions.QuantumException,
                 netaddr.AddrFormatError) as e:
@@ -120,7 +135,17 @@ def Resource(controller, faults=None, deserializers=None, serializers=None):
             raise webob.exc.HTTPInternalServerError(**kwargs)
 
         status = action_status.get(action, 200)
-        body = serializer(result)
+        if (_is_collection(action, result) and
+                hasattr(serializer, 'serialize_collection')):
+            name, items = result.items()[0]
+            chunks = serializer.serialize_collection(name, items)
+            return webob.Response(
+                request=request, status=status,
+                content_type=content_type,
+                etag=request.environ.get('quantum.etag'),
+                app_iter=profiler.iter_span(profiler.SERIALIZATION, chunks))
+        with profiler.span(profiler.SERIALIZATION):
+            body = serializer(result)
         # NOTE(jkoelker) Comply with RFC2616 section 9.7
         if status == 204:
             content_type = ''
@@ -128,5 +153,6 @@ def Resource(controller, faults=None, deserializers=None, serializers=None):
 
         return webob.Response(request=request, status=status,
                               content_type=content_type,
+                              etag=request.environ.get('quantum.etag'),
                               body=body)
     return resource
@@ -0,0 +1,161 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Notification driver publishing notifications from a background greenthread.
+
+Notifications are queued in a bounded in-memory buffer and handed over in
+batches to the drivers listed in buffered_notification_driver, so that API
+requests do not wait on the message broker.
+"""
+
+import atexit
+import collections
+
+import eventlet
+from eventlet import event
+
+from quantum.openstack.common import cfg
+from quantum.openstack.common import importutils
+from quantum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+buffered_notifier_opts = [
+    cfg.MultiStrOpt('buffered_notification_driver',
+                    default=['quantum.openstack.common.notifier.rpc_notifier'],
+                    help=_("Driver or drivers the buffered notifier "
+                           "publishes notifications to")),
+    cfg.IntOpt('notification_buffer_size', default=1000,
+               help=_("Maximum number of notifications waiting to be "
+                      "published")),
+    cfg.IntOpt('notification_batch_size', default=100,
+               help=_("Maximum number of notifications published before "
+                      "yielding to other greenthreads")),
+    cfg.StrOpt('notification_overflow_policy', default=DROP_OLDEST,
+               help=_("Notification dropped when the buffer is full, either "
+                      "'%(oldest)s' or '%(newest)s'") %
+               {'oldest': DROP_OLDEST, 'newest': DROP_NEWEST}),
+]
+
+cfg.CONF.register_opts(buffered_notifier_opts)
+
+
+class NotificationBuffer(object):
+    """Bounded buffer of notifications drained by a greenthread."""
+
+    def __init__(self, drivers, size, batch_size, overflow_policy):
+        if overflow_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(_("Invalid notification overflow policy: %s") %
+                             overflow_policy)
+        self.drivers = drivers
+        self.size = size
+        self.batch_size = batch_size
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._queue = collections.deque()
+        self._wakeup = event.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._queue)
+
+    def put(self, context, message):
+        """Queue a notification, dropping one if the buffer is full."""
+        if len(self._queue) >= self.size:
+            self.dropped += 1
+            if self.overflow_policy == DROP_NEWEST:
+                self._log_dropped(message)
+                return
+            self._log_dropped(self._queue.popleft()[1])
+        self._queue.append((context, message))
+        if self._thread is None:
+            self._thread = eventlet.spawn(self._run)
+        if not self._wakeup.ready():
+            self._wakeup.send()
+
+    def _log_dropped(self, message):
+        LOG.warn(_("Notification buffer full, dropping %(event_type)s "
+                   "notification %(message_id)s"), message)
+
+    def flush(self):
+        """Synchronously publish all the queued notifications."""
+        while self._queue:
+            self._publish_batch()
+
+    def _publish_batch(self):
+        for i in xrange(min(self.batch_size, len(self._queue))):
+            context, message = self._queue.popleft()
+            for driver in self.drivers:
+                try:
+                    driver.notify(context, message)
+                except Exception:
+                    LOG.exception(_("Unable to publish notification %s"),
+                                  message.get('message_id'))
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup = event.Event()
+            while self._queue:
+                self._publish_batch()
+                eventlet.sleep(0)
+
+
+_buffer = None
+
+
+def _get_buffer():
+    global _buffer
+    if _buffer is None:
+        drivers = []
+        for driver_name in cfg.CONF.buffered_notification_driver:
+            try:
+                drivers.append(importutils.import_module(driver_name))
+            except ImportError:
+                LOG.exception(_("Failed to load notifier %s. "
+                                "These notifications will not be sent."),
+                              driver_name)
+        _buffer = NotificationBuffer(drivers,
+                                     cfg.CONF.notification_buffer_size,
+                                     cfg.CONF.notification_batch_size,
+                                     cfg.CONF.notification_overflow_policy)
+        atexit.register(_buffer.flush)
+    return _buffer
+
+
+def notify(context, message):
+    """Queue a notification to be published in the background."""
+    _get_buffer().put(context, message)
+
+
+def flush():
+    """Publish the pending notifications, e.g. before shutting down."""
+    if _buffer is not None:
+        _buffer.flush()
+
+
+def _reset_buffer():
+    """Used by unit tests to reset the buffer."""
+    global _buffer
+    if _buffer is not None and _buffer._thread is not None:
+        _buffer._thread.kill()
+    _buffer = None
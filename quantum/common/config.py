@@ -68,6 +68,9 @@ core_opts = [
                help=_("The hostname Quantum is running on")),
     cfg.BoolOpt('force_gateway_on_subnet', default=False,
                 help=_("Ensure that configured gateway is on subnet")),
+    cfg.BoolOpt('notify_start_events', default=True,
+                help=_("Send a notification when the processing of a "
+                       "create, update or delete request starts")),
 ]
 
 core_cli_opts = [
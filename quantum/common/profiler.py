@@ -0,0 +1,192 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Recording of where the time of a profiled API request goes.
+
+The profile of the request being handled is kept in greenthread local
+storage while quantum.api.profiling.ProfilingMiddleware handles it. The
+instrumented code adds spans to it: SQL statements, policy and quota
+checks, notifications and RPC calls. When the request isn't profiled, the
+instrumentation only costs a lookup of the local storage.
+"""
+
+import contextlib
+import functools
+import time
+
+from quantum.openstack.common import local
+from quantum.openstack.common.notifier import api as notifier_api
+from quantum.openstack.common.rpc import proxy
+
+
+CONTROLLER = 'controller'
+DB = 'db'
+NOTIFIER = 'notifier'
+POLICY = 'policy'
+QUOTA = 'quota'
+RPC = 'rpc'
+SERIALIZATION = 'serialization'
+
+# key of the connection info keeping the start of the running statement
+_STATEMENT_START = 'profiler_statement_start'
+
+_installed = False
+
+
+class Profile(object):
+    """Number and duration of the spans of a request by kind.
+
+    The spans of nested calls are counted in their own kind and in the one
+    of the enclosing span.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.duration = None
+        # kind -> [count, total duration]
+        self.spans = {}
+
+    def add(self, kind, duration):
+        span = self.spans.setdefault(kind, [0, 0.0])
+        span[0] += 1
+        span[1] += duration
+
+    def stop(self):
+        self.duration = time.time() - self.start
+
+    def __str__(self):
+        """Return e.g. "total=0.1234; db=12/0.0456; policy=2/0.0012"."""
+        duration = self.duration
+        if duration is None:
+            duration = time.time() - self.start
+        items = ['total=%.4f' % duration]
+        items.extend('%s=%d/%.4f' % (kind, count, total)
+                     for kind, (count, total) in sorted(self.spans.items()))
+        return '; '.join(items)
+
+
+def current():
+    """Return the profile of the request being handled, if any."""
+    return getattr(local.store, 'profile', None)
+
+
+def start():
+    """Start profiling the request handled by this greenthread."""
+    profile = Profile()
+    local.store.profile = profile
+    return profile
+
+
+def resume(profile):
+    """Make profile current again, e.g. while streaming a response body."""
+    local.store.profile = profile
+
+
+def stop(profile):
+    profile.stop()
+    del local.store.profile
+
+
+@contextlib.contextmanager
+def span(kind):
+    """Record the execution of the with block as a span of kind."""
+    profile = current()
+    if profile is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        profile.add(kind, time.time() - start)
+
+
+def iter_span(kind, iterable):
+    """Record the iteration over iterable as a span of kind.
+
+    Used for the bodies streamed after the controller returned, the
+    profile being the one current when the iteration starts.
+    """
+    profile = current()
+    if profile is None:
+        for item in iterable:
+            yield item
+        return
+    iterator = iter(iterable)
+    duration = 0.0
+    try:
+        while True:
+            start = time.time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                duration += time.time() - start
+            yield item
+    finally:
+        profile.add(kind, duration)
+
+
+def profiled(kind):
+    """Decorator recording the calls of the function as spans of kind."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            profile = current()
+            if profile is None:
+                return f(*args, **kwargs)
+            start = time.time()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                profile.add(kind, time.time() - start)
+        return wrapper
+    return decorator
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    if current() is not None:
+        conn.info[_STATEMENT_START] = time.time()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context,
+                         executemany):
+    start = conn.info.pop(_STATEMENT_START, None)
+    if start is not None:
+        profile = current()
+        if profile is not None:
+            profile.add(DB, time.time() - start)
+
+
+def install():
+    """Record the RPC and notifier calls of the profiled requests.
+
+    They are done by the common code, whose functions are wrapped here
+    rather than decorated in place.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    for method in ('call', 'multicall', 'cast', 'fanout_cast',
+                   'cast_to_server', 'fanout_cast_to_server'):
+        setattr(proxy.RpcProxy, method,
+                profiled(RPC)(proxy.RpcProxy.__dict__[method]))
+    notifier_api.notify = profiled(NOTIFIER)(notifier_api.notify)
@@ -15,20 +15,122 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
+import sys
+import time
+
+from eventlet import semaphore
+
+from quantum.common import utils
 from quantum import context
+from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
+from quantum.openstack.common import loopingcall
+from quantum.openstack.common.rpc import common as rpc_common
 from quantum.openstack.common.rpc import dispatcher
 
 
 LOG = logging.getLogger(__name__)
 
+rpc_dispatch_opts = [
+    cfg.IntOpt('rpc_dispatch_max_concurrency', default=0,
+               help=_("Maximum number of RPC messages a plugin processes "
+                      "concurrently, 0 means unlimited")),
+    cfg.ListOpt('rpc_dispatch_method_limits', default=[],
+                help=_("List of <method>:<limit> bounding the number of "
+                       "concurrent calls of the given RPC methods")),
+    cfg.IntOpt('rpc_dispatch_report_interval', default=0,
+               help=_("Seconds between two reports of the RPC dispatch "
+                      "statistics in the log, 0 disables the reports")),
+]
+
+cfg.CONF.register_opts(rpc_dispatch_opts)
+
+# Name of the pseudo RPC method carrying a batch of calls in one message
+BATCH_CALL = 'batch_call'
+
+
+class DispatchStats(object):
+    """Load statistics of a RPC dispatcher."""
+
+    def __init__(self):
+        # number of messages waiting for a free slot
+        self.waiting = 0
+        # number of messages being processed
+        self.in_flight = 0
+        # method name -> [calls, total duration, longest duration]
+        self.methods = {}
+
+    def record(self, method, duration):
+        stats = self.methods.setdefault(method, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+
+    def to_dict(self):
+        methods = {}
+        for method, (calls, total, longest) in self.methods.iteritems():
+            methods[method] = {'calls': calls,
+                               'average': total / calls,
+                               'max': longest}
+        return {'waiting': self.waiting,
+                'in_flight': self.in_flight,
+                'methods': methods}
+
 
 class PluginRpcDispatcher(dispatcher.RpcDispatcher):
     """This class is used to convert RPC common context into
-    Quantum Context."""
+    Quantum Context.
+
+    It also bounds the number of messages processed concurrently, overall
+    and per method, so that a storm of agent requests queues up on the
+    broker instead of starving the API server.
+    """
 
     def __init__(self, callbacks):
         super(PluginRpcDispatcher, self).__init__(callbacks)
+        self.stats = DispatchStats()
+        self._semaphore = None
+        if cfg.CONF.rpc_dispatch_max_concurrency > 0:
+            self._semaphore = semaphore.Semaphore(
+                cfg.CONF.rpc_dispatch_max_concurrency)
+        self._method_semaphores = {}
+        limits = utils.parse_mappings(cfg.CONF.rpc_dispatch_method_limits,
+                                      unique_values=False)
+        for method, limit in limits.iteritems():
+            self._method_semaphores[method] = semaphore.Semaphore(int(limit))
+        if cfg.CONF.rpc_dispatch_report_interval > 0:
+            self._reporter = loopingcall.LoopingCall(self._report_stats)
+            self._reporter.start(
+                interval=cfg.CONF.rpc_dispatch_report_interval)
+
+    def _report_stats(self):
+        LOG.info(_("RPC dispatch statistics: %s"), self.stats.to_dict())
+
+    @contextlib.contextmanager
+    def _slot(self, sem):
+        """Hold a slot of the given semaphore, if any, while running."""
+        if sem is None:
+            yield
+            return
+        self.stats.waiting += 1
+        try:
+            sem.acquire()
+        finally:
+            self.stats.waiting -= 1
+        try:
+            yield
+        finally:
+            sem.release()
+
+    def _dispatch_one(self, quantum_ctxt, version, method, kwargs):
+        with self._slot(self._method_semaphores.get(method)):
+            start = time.time()
+            try:
+                return super(PluginRpcDispatcher, self).dispatch(
+                    quantum_ctxt, version, method, **kwargs)
+            finally:
+                self.stats.record(method, time.time() - start)
 
     def dispatch(self, rpc_ctxt, version, method, **kwargs):
         rpc_ctxt_dict = rpc_ctxt.to_dict()
@@ -39,5 +141,35 @@ class PluginRpcDispatcher(dispatcher.RpcDispatcher):
         if not tenant_id:
             tenant_id = rpc_ctxt_dict.pop('project_id', None)
         quantum_ctxt = context.Context(user_id, tenant_id, **rpc_ctxt_dict)
-        return super(PluginRpcDispatcher, self).dispatch(
-            quantum_ctxt, version, method, **kwargs)
+        with self._slot(self._semaphore):
+            self.stats.in_flight += 1
+            try:
+                if method == BATCH_CALL:
+                    return self._dispatch_batch(quantum_ctxt, **kwargs)
+                return self._dispatch_one(quantum_ctxt, version, method,
+                                          kwargs)
+            finally:
+                self.stats.in_flight -= 1
+
+    def _dispatch_batch(self, quantum_ctxt, calls):
+        """Dispatch the calls of a batch in order.
+
+        Each call is a message as built by RpcProxy.make_msg, optionally
+        carrying its own version. A failing call does not abort the batch:
+        the reply holds, for each call, either its result or the serialized
+        exception it raised.
+        """
+        replies = []
+        for call in calls:
+            try:
+                result = self._dispatch_one(quantum_ctxt,
+                                            call.get('version'),
+                                            call['method'],
+                                            call.get('args', {}))
+                replies.append({'result': result})
+            except Exception:
+                LOG.debug(_("Batched RPC call %s failed"), call.get('method'))
+                failure = rpc_common.serialize_remote_exception(
+                    sys.exc_info(), log_failure=False)
+                replies.append({'failure': failure})
+        return replies
@@ -31,7 +31,9 @@ from sqlalchemy.exc import DisconnectionError
 from sqlalchemy.interfaces import PoolListener
 from sqlalchemy.orm import sessionmaker
 
+from quantum.common import profiler
 from quantum.db import model_base
+from quantum.db import revisions
 from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
 
@@ -144,6 +146,10 @@ def configure_db():
         _ENGINE = create_engine(sql_connection, **engine_args)
 
         sql.event.listen(_ENGINE, 'checkin', greenthread_yield)
+        sql.event.listen(_ENGINE, 'before_cursor_execute',
+                         profiler.before_cursor_execute)
+        sql.event.listen(_ENGINE, 'after_cursor_execute',
+                         profiler.after_cursor_execute)
 
         if not register_models():
             if 'reconnect_interval' in options:
@@ -172,6 +178,7 @@ def get_session(autocommit=True, expire_on_commit=False):
         _MAKER = sessionmaker(bind=_ENGINE,
                               autocommit=autocommit,
                               expire_on_commit=expire_on_commit)
+        sql.event.listen(_MAKER, 'after_flush', revisions.after_flush)
     return _MAKER()
 
 
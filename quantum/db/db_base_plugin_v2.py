@@ -19,6 +19,7 @@ import datetime
 import random
 
 import netaddr
+import sqlalchemy as sa
 from sqlalchemy import orm
 from sqlalchemy.orm import exc
 
@@ -61,6 +62,11 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
     # bulk operations. Name mangling is used in order to ensure it
     # is qualified by class
     __native_bulk_support = True
+    # This attribute specifies whether the resources returned by the plugin
+    # are built from the database only, so that their revisions can be used
+    # as ETags. Name mangling is used in order to ensure it is qualified by
+    # class
+    __native_revision_support = True
     # Plugins, mixin classes implementing extension will register
     # hooks into the dict below for "augmenting" the "core way" of
     # building a query for retrieving objects from a model class.
@@ -199,6 +205,31 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
                          if key in fields))
         return resource
 
+    def _make_columns_dict(self, resource, fields, columns):
+        """Return a dict of the columns of resource requested by fields."""
+        return dict((column, resource[column]) for column in columns
+                    if not fields or column in fields)
+
+    def _apply_fields_to_query(self, query, model, fields,
+                               field_columns=None):
+        """Only load the columns needed by the requested fields.
+
+        :param field_columns: dict mapping the fields built from columns with
+                              other names to the names of these columns
+        """
+        if not fields:
+            return query
+        needed = set(fields)
+        for field in fields:
+            needed.update((field_columns or {}).get(field, ()))
+        deferred = [orm.defer(prop.key)
+                    for prop in orm.class_mapper(model).iterate_properties
+                    if (isinstance(prop, orm.ColumnProperty) and
+                        prop.key not in needed and
+                        not any(column.primary_key
+                                for column in prop.columns))]
+        return query.options(*deferred)
+
     def _apply_filters_to_query(self, query, model, filters):
         if filters:
             for key, value in filters.iteritems():
@@ -213,13 +244,29 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
         return collection
 
     def _get_collection(self, context, model, dict_func, filters=None,
-                        fields=None):
+                        fields=None, field_columns=None):
         query = self._get_collection_query(context, model, filters)
+        query = self._apply_fields_to_query(query, model, fields,
+                                            field_columns)
         return [dict_func(c, fields) for c in query.all()]
 
     def _get_collection_count(self, context, model, filters=None):
         return self._get_collection_query(context, model, filters).count()
 
+    def _get_revision(self, context, model, id):
+        """Return the revision of a resource, or None if it is not found."""
+        query = self._model_query(context, model).filter(model.id == id)
+        return query.with_entities(model.revision).scalar()
+
+    def _get_query_revision(self, query, model):
+        """Return the highest revision and the number of rows of a query."""
+        return tuple(query.with_entities(sa.func.max(model.revision),
+                                         sa.func.count(model.id)).one())
+
+    def _get_collection_revision(self, context, model, filters=None):
+        return self._get_query_revision(
+            self._get_collection_query(context, model, filters), model)
+
     @staticmethod
     def _generate_mac(context, network_id):
         base_mac = cfg.CONF.base_mac.split(':')
@@ -410,7 +457,11 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
         alloc_qry = context.session.query(models_v2.IPAllocation)
         allocated = alloc_qry.filter_by(network_id=network_id,
                                         ip_address=ip_address,
-                                        subnet_id=subnet_id).delete()
+                                        subnet_id=subnet_id)
+        # NOTE: deleted one by one for the port to get a new revision, a
+        # bulk delete does not go through the flush
+        for allocation in allocated:
+            context.session.delete(allocation)
 
     @staticmethod
     def _generate_ip(context, subnets):
@@ -847,56 +898,45 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
             tenant_ids.pop() != original.tenant_id):
             raise q_exc.InvalidSharedSetting(network=original.name)
 
+    # NOTE: the dict functions only read the columns and relationships of
+    # the requested fields, the others may not have been loaded
     def _make_network_dict(self, network, fields=None):
-        res = {'id': network['id'],
-               'name': network['name'],
-               'tenant_id': network['tenant_id'],
-               'admin_state_up': network['admin_state_up'],
-               'status': network['status'],
-               'shared': network['shared'],
-               'subnets': [subnet['id']
-                           for subnet in network['subnets']]}
-
-        return self._fields(res, fields)
+        res = self._make_columns_dict(network, fields,
+                                      ('id', 'name', 'tenant_id',
+                                       'admin_state_up', 'status', 'shared'))
+        if not fields or 'subnets' in fields:
+            res['subnets'] = [subnet['id'] for subnet in network['subnets']]
+        return res
 
     def _make_subnet_dict(self, subnet, fields=None):
-        res = {'id': subnet['id'],
-               'name': subnet['name'],
-               'tenant_id': subnet['tenant_id'],
-               'network_id': subnet['network_id'],
-               'ip_version': subnet['ip_version'],
-               'cidr': subnet['cidr'],
-               'allocation_pools': [{'start': pool['first_ip'],
-                                     'end': pool['last_ip']}
-                                    for pool in subnet['allocation_pools']],
-               'gateway_ip': subnet['gateway_ip'],
-               'enable_dhcp': subnet['enable_dhcp'],
-               'dns_nameservers': [dns['address']
-                                   for dns in subnet['dns_nameservers']],
-               'host_routes': [{'destination': route['destination'],
-                                'nexthop': route['nexthop']}
-                               for route in subnet['routes']],
-               'shared': subnet['shared']
-               }
-        if subnet['gateway_ip']:
-            res['gateway_ip'] = subnet['gateway_ip']
-
-        return self._fields(res, fields)
+        res = self._make_columns_dict(subnet, fields,
+                                      ('id', 'name', 'tenant_id',
+                                       'network_id', 'ip_version', 'cidr',
+                                       'gateway_ip', 'enable_dhcp', 'shared'))
+        if not fields or 'allocation_pools' in fields:
+            res['allocation_pools'] = [{'start': pool['first_ip'],
+                                        'end': pool['last_ip']}
+                                       for pool in subnet['allocation_pools']]
+        if not fields or 'dns_nameservers' in fields:
+            res['dns_nameservers'] = [dns['address']
+                                      for dns in subnet['dns_nameservers']]
+        if not fields or 'host_routes' in fields:
+            res['host_routes'] = [{'destination': route['destination'],
+                                   'nexthop': route['nexthop']}
+                                  for route in subnet['routes']]
+        return res
 
     def _make_port_dict(self, port, fields=None):
-        res = {"id": port["id"],
-               'name': port['name'],
-               "network_id": port["network_id"],
-               'tenant_id': port['tenant_id'],
-               "mac_address": port["mac_address"],
-               "admin_state_up": port["admin_state_up"],
-               "status": port["status"],
-               "fixed_ips": [{'subnet_id': ip["subnet_id"],
-                              'ip_address': ip["ip_address"]}
-                             for ip in port["fixed_ips"]],
-               "device_id": port["device_id"],
-               "device_owner": port["device_owner"]}
-        return self._fields(res, fields)
+        res = self._make_columns_dict(port, fields,
+                                      ('id', 'name', 'network_id',
+                                       'tenant_id', 'mac_address',
+                                       'admin_state_up', 'status',
+                                       'device_id', 'device_owner'))
+        if not fields or 'fixed_ips' in fields:
+            res['fixed_ips'] = [{'subnet_id': ip["subnet_id"],
+                                 'ip_address': ip["ip_address"]}
+                                for ip in port["fixed_ips"]]
+        return res
 
     def _create_bulk(self, resource, context, request_items):
         objects = []
@@ -970,7 +1010,8 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
 
             # clean up subnets
             subnets_qry = context.session.query(models_v2.Subnet)
-            subnets_qry.filter_by(network_id=id).delete()
+            for subnet in subnets_qry.filter_by(network_id=id):
+                context.session.delete(subnet)
             context.session.delete(network)
 
     def get_network(self, context, id, fields=None):
@@ -986,6 +1027,13 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
         return self._get_collection_count(context, models_v2.Network,
                                           filters=filters)
 
+    def get_network_revision(self, context, id):
+        return self._get_revision(context, models_v2.Network, id)
+
+    def get_networks_revision(self, context, filters=None):
+        return self._get_collection_revision(context, models_v2.Network,
+                                             filters=filters)
+
     def create_subnet_bulk(self, context, subnets):
         return self._create_bulk('subnet', context, subnets)
 
@@ -1184,6 +1232,13 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
         return self._get_collection_count(context, models_v2.Subnet,
                                           filters=filters)
 
+    def get_subnet_revision(self, context, id):
+        return self._get_revision(context, models_v2.Subnet, id)
+
+    def get_subnets_revision(self, context, filters=None):
+        return self._get_collection_revision(context, models_v2.Subnet,
+                                             filters=filters)
+
     def create_port_bulk(self, context, ports):
         return self._create_bulk('port', context, ports)
 
@@ -1340,7 +1395,15 @@ class QuantumDbPluginV2(quantum_plugin_base_v2.QuantumPluginBaseV2):
 
     def get_ports(self, context, filters=None, fields=None):
         query = self._get_ports_query(context, filters)
+        query = self._apply_fields_to_query(query, models_v2.Port, fields)
         return [self._make_port_dict(c, fields) for c in query.all()]
 
     def get_ports_count(self, context, filters=None):
         return self._get_ports_query(context, filters).count()
+
+    def get_port_revision(self, context, id):
+        return self._get_revision(context, models_v2.Port, id)
+
+    def get_ports_revision(self, context, filters=None):
+        query = self._get_ports_query(context, filters)
+        return self._get_query_revision(query, models_v2.Port)
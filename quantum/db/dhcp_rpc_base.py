@@ -16,6 +16,7 @@
 from sqlalchemy.orm import exc
 
 from quantum.api.v2 import attributes
+from quantum.db import models_v2
 from quantum import manager
 from quantum.openstack.common import log as logging
 
@@ -47,6 +48,52 @@ class DhcpRpcCallbackMixin(object):
         network['ports'] = plugin.get_ports(context, filters=filters)
         return network
 
+    def get_active_networks_info(self, context, **kwargs):
+        """Retrieve and return a page of the active networks.
+
+        The networks are sorted by id and returned with their subnets and
+        ports, like get_network_info does. The page starts after the network
+        whose id is given as marker and holds at most limit networks. It is
+        returned with the marker of the next page, None after the last one:
+        a page may be short when networks are removed while it is read.
+        """
+        host = kwargs.get('host')
+        marker = kwargs.get('marker')
+        limit = kwargs.get('limit')
+        LOG.debug(_('Networks after %(marker)s requested from %(host)s'),
+                  {'marker': marker, 'host': host})
+        plugin = manager.QuantumManager.get_plugin()
+
+        # page through the primary key index rather than the plugin, which
+        # can only return all the networks at once
+        query = (context.session.query(models_v2.Network.id).
+                 filter_by(admin_state_up=True))
+        if marker:
+            query = query.filter(models_v2.Network.id > marker)
+        query = query.order_by(models_v2.Network.id).limit(limit)
+        network_ids = [network_id for network_id, in query]
+        if not network_ids:
+            return {'networks': [], 'marker': None}
+        next_marker = None
+        if limit and len(network_ids) == limit:
+            next_marker = network_ids[-1]
+
+        filters = dict(id=network_ids)
+        networks = dict((net['id'], net) for net in
+                        plugin.get_networks(context, filters=filters))
+        for network in networks.itervalues():
+            network['subnets'] = []
+            network['ports'] = []
+        filters = dict(network_id=network_ids)
+        for subnet in plugin.get_subnets(context, filters=filters):
+            networks[subnet['network_id']]['subnets'].append(subnet)
+        for port in plugin.get_ports(context, filters=filters):
+            networks[port['network_id']]['ports'].append(port)
+        return {'networks': [networks[network_id]
+                             for network_id in network_ids
+                             if network_id in networks],
+                'marker': next_marker}
+
     def get_dhcp_port(self, context, **kwargs):
         """Allocate a DHCP port for the host and return port information.
 
@@ -45,7 +45,8 @@ DEVICE_OWNER_ROUTER_GW = l3_constants.DEVICE_OWNER_ROUTER_GW
 DEVICE_OWNER_FLOATINGIP = l3_constants.DEVICE_OWNER_FLOATINGIP
 
 
-class Router(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant):
+class Router(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant,
+             models_v2.HasRevision):
     """Represents a v2 quantum router."""
     name = sa.Column(sa.String(255))
     status = sa.Column(sa.String(16))
@@ -55,12 +56,14 @@ class Router(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant):
 
 
 class ExternalNetwork(model_base.BASEV2):
+    revision_parent = ('networks', 'network_id')
     network_id = sa.Column(sa.String(36),
                            sa.ForeignKey('networks.id', ondelete="CASCADE"),
                            primary_key=True)
 
 
-class FloatingIP(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant):
+class FloatingIP(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant,
+                 models_v2.HasRevision):
     """Represents a floating IP, which may or many not be
        allocated to a tenant, and may or may not be associated with
        an internal port/ip address/router.
@@ -112,16 +115,15 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
         return router
 
     def _make_router_dict(self, router, fields=None):
-        res = {'id': router['id'],
-               'name': router['name'],
-               'tenant_id': router['tenant_id'],
-               'admin_state_up': router['admin_state_up'],
-               'status': router['status'],
-               'external_gateway_info': None}
-        if router['gw_port_id']:
-            nw_id = router.gw_port['network_id']
-            res['external_gateway_info'] = {'network_id': nw_id}
-        return self._fields(res, fields)
+        res = self._make_columns_dict(router, fields,
+                                      ('id', 'name', 'tenant_id',
+                                       'admin_state_up', 'status'))
+        if not fields or 'external_gateway_info' in fields:
+            res['external_gateway_info'] = None
+            if router['gw_port_id']:
+                nw_id = router.gw_port['network_id']
+                res['external_gateway_info'] = {'network_id': nw_id}
+        return res
 
     def create_router(self, context, router):
         r = router['router']
@@ -255,14 +257,22 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
         return self._make_router_dict(router, fields)
 
     def get_routers(self, context, filters=None, fields=None):
-        return self._get_collection(context, Router,
-                                    self._make_router_dict,
-                                    filters=filters, fields=fields)
+        return self._get_collection(
+            context, Router, self._make_router_dict,
+            filters=filters, fields=fields,
+            field_columns={'external_gateway_info': ['gw_port_id']})
 
     def get_routers_count(self, context, filters=None):
         return self._get_collection_count(context, Router,
                                           filters=filters)
 
+    def get_router_revision(self, context, id):
+        return self._get_revision(context, Router, id)
+
+    def get_routers_revision(self, context, filters=None):
+        return self._get_collection_revision(context, Router,
+                                             filters=filters)
+
     def _check_for_dup_router_subnet(self, context, router_id,
                                      network_id, subnet_id, subnet_cidr):
         try:
@@ -450,14 +460,14 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
         return floatingip
 
     def _make_floatingip_dict(self, floatingip, fields=None):
-        res = {'id': floatingip['id'],
-               'tenant_id': floatingip['tenant_id'],
-               'floating_ip_address': floatingip['floating_ip_address'],
-               'floating_network_id': floatingip['floating_network_id'],
-               'router_id': floatingip['router_id'],
-               'port_id': floatingip['fixed_port_id'],
-               'fixed_ip_address': floatingip['fixed_ip_address']}
-        return self._fields(res, fields)
+        res = self._make_columns_dict(floatingip, fields,
+                                      ('id', 'tenant_id',
+                                       'floating_ip_address',
+                                       'floating_network_id', 'router_id',
+                                       'fixed_ip_address'))
+        if not fields or 'port_id' in fields:
+            res['port_id'] = floatingip['fixed_port_id']
+        return res
 
     def _get_router_for_floatingip(self, context, internal_port,
                                    internal_subnet_id,
@@ -681,14 +691,22 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
         return self._make_floatingip_dict(floatingip, fields)
 
     def get_floatingips(self, context, filters=None, fields=None):
-        return self._get_collection(context, FloatingIP,
-                                    self._make_floatingip_dict,
-                                    filters=filters, fields=fields)
+        return self._get_collection(
+            context, FloatingIP, self._make_floatingip_dict,
+            filters=filters, fields=fields,
+            field_columns={'port_id': ['fixed_port_id']})
 
     def get_floatingips_count(self, context, filters=None):
         return self._get_collection_count(context, FloatingIP,
                                           filters=filters)
 
+    def get_floatingip_revision(self, context, id):
+        return self._get_revision(context, FloatingIP, id)
+
+    def get_floatingips_revision(self, context, filters=None):
+        return self._get_collection_revision(context, FloatingIP,
+                                             filters=filters)
+
     def prevent_l3_port_deletion(self, context, port_id):
         """ Checks to make sure a port is allowed to be deleted, raising
         an exception if this is not the case.  This should be called by
@@ -746,6 +764,18 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
             network[l3.EXTERNAL] = self._network_is_external(
                 context, network['id'])
 
+    def _extend_networks_dict_l3(self, context, networks):
+        """Extend several networks, looking up the external ones at once."""
+        net_ids = [network['id'] for network in networks]
+        if not net_ids:
+            return
+        query = context.session.query(ExternalNetwork.network_id)
+        ext_nets = set(en.network_id for en in
+                       query.filter(ExternalNetwork.network_id.in_(net_ids)))
+        for network in networks:
+            if self._check_l3_view_auth(context, network):
+                network[l3.EXTERNAL] = network['id'] in ext_nets
+
     def _process_l3_create(self, context, net_data, net_id):
         external = net_data.get(l3.EXTERNAL)
         external_set = attributes.is_attr_set(external)
@@ -783,8 +813,11 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
             if port:
                 raise l3.ExternalNetworkInUse(net_id=net_id)
 
-            context.session.query(ExternalNetwork).filter_by(
-                network_id=net_id).delete()
+            # NOTE: deleted through the session for the network to get a
+            # new revision
+            ext_net = context.session.query(ExternalNetwork).filter_by(
+                network_id=net_id).one()
+            context.session.delete(ext_net)
 
     def _filter_nets_l3(self, context, nets, filters):
         vals = filters and filters.get('router:external', [])
@@ -798,7 +831,8 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
         else:
             return [n for n in nets if n['id'] not in ext_nets]
 
-    def _get_sync_routers(self, context, router_ids=None):
+    def _get_sync_routers(self, context, router_ids=None, marker=None,
+                          limit=None):
         """Query routers and their gw ports for l3 agent.
 
         Query routers with the router_ids. The gateway ports, if any,
@@ -809,11 +843,18 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
         we will have router_ids.
         @param router_ids: the list of router ids which we want to query.
                            if it is None, all of routers will be queried.
+        @param marker: if given, only the routers whose id is greater are
+                       queried.
+        @param limit: the maximum number of routers to query.
         @return: a list of dicted routers with dicted gw_port populated if any
         """
         router_query = context.session.query(Router)
         if router_ids:
             router_query = router_query.filter(Router.id.in_(router_ids))
+        if marker:
+            router_query = router_query.filter(Router.id > marker)
+        if marker or limit:
+            router_query = router_query.order_by(Router.id).limit(limit)
         routers = router_query.all()
         gw_port_ids = []
         if not routers:
@@ -914,13 +955,20 @@ class L3_NAT_db_mixin(l3.RouterPluginBase):
                 router_interfaces = router.get(l3_constants.INTERFACE_KEY, [])
                 router_interfaces.append(interface)
                 router[l3_constants.INTERFACE_KEY] = router_interfaces
-        return routers_dict.values()
+        return routers
 
-    def get_sync_data(self, context, router_ids=None):
-        """Query routers and their related floating_ips, interfaces."""
+    def get_sync_data(self, context, router_ids=None, marker=None,
+                      limit=None):
+        """Query routers and their related floating_ips, interfaces.
+
+        The routers are sorted by id when marker or limit is given, so that
+        they can be queried page by page.
+        """
         with context.session.begin(subtransactions=True):
             routers = self._get_sync_routers(context,
-                                             router_ids)
+                                             router_ids,
+                                             marker,
+                                             limit)
             router_ids = [router['id'] for router in routers]
             floating_ips = self._get_sync_floating_ips(context, router_ids)
             interfaces = self._get_sync_interfaces(context, router_ids)
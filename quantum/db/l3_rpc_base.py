@@ -29,15 +29,18 @@ class L3RpcCallbackMixin(object):
         """Sync routers according to filters to a specific agent.
 
         @param context: contain user information
-        @param kwargs: host, or router_id
+        @param kwargs: host, or router_id, and optionally marker and limit
+                       to return a page of the routers sorted by id
         @return: a list of routers
                  with their interfaces and floating_ips
         """
         router_id = kwargs.get('router_id')
+        marker = kwargs.get('marker')
+        limit = kwargs.get('limit')
         # TODO(gongysh) we will use host in kwargs for multi host BP
         context = quantum_context.get_admin_context()
         plugin = manager.QuantumManager.get_plugin()
-        routers = plugin.get_sync_data(context, router_id)
+        routers = plugin.get_sync_data(context, router_id, marker, limit)
         LOG.debug(_("Routers returned to l3 agent:\n %s"),
                   jsonutils.dumps(routers, indent=5))
         return routers
@@ -185,9 +185,25 @@ class LoadBalancerPluginDb(LoadBalancerPluginBase):
         collection = self._apply_filters_to_query(collection, model, filters)
         return collection
 
+    def _make_columns_dict(self, resource, fields, columns):
+        return dict((column, resource[column]) for column in columns
+                    if not fields or column in fields)
+
+    def _apply_fields_to_query(self, query, model, fields):
+        if not fields:
+            return query
+        deferred = [orm.defer(prop.key)
+                    for prop in orm.class_mapper(model).iterate_properties
+                    if (isinstance(prop, orm.ColumnProperty) and
+                        prop.key not in fields and
+                        not any(column.primary_key
+                                for column in prop.columns))]
+        return query.options(*deferred)
+
     def _get_collection(self, context, model, dict_func, filters=None,
                         fields=None):
         query = self._get_collection_query(context, model, filters)
+        query = self._apply_fields_to_query(query, model, fields)
         return [dict_func(c, fields) for c in query.all()]
 
     def _get_collection_count(self, context, model, filters=None):
@@ -235,24 +251,19 @@ class LoadBalancerPluginDb(LoadBalancerPluginBase):
     ########################################################
     # VIP DB access
     def _make_vip_dict(self, vip, fields=None):
-        res = {'id': vip['id'],
-               'tenant_id': vip['tenant_id'],
-               'name': vip['name'],
-               'description': vip['description'],
-               'subnet_id': vip['subnet_id'],
-               'address': vip['address'],
-               'port': vip['port'],
-               'protocol': vip['protocol'],
-               'pool_id': vip['pool_id'],
-               'connection_limit': vip['connection_limit'],
-               'admin_state_up': vip['admin_state_up'],
-               'status': vip['status']}
-        if vip['session_persistence']:
+        res = self._make_columns_dict(vip, fields,
+                                      ('id', 'tenant_id', 'name',
+                                       'description', 'subnet_id', 'address',
+                                       'port', 'protocol', 'pool_id',
+                                       'connection_limit', 'admin_state_up',
+                                       'status'))
+        if ((not fields or 'session_persistence' in fields) and
+                vip['session_persistence']):
             res['session_persistence'] = {
                 'type': vip['session_persistence']['type'],
                 'cookie_name': vip['session_persistence']['cookie_name']
             }
-        return self._fields(res, fields)
+        return res
 
     def _update_pool_vip_info(self, context, pool_id, vip_id):
         pool_db = self._get_resource(context, Pool, pool_id)
@@ -363,25 +374,22 @@ class LoadBalancerPluginDb(LoadBalancerPluginBase):
     ########################################################
     # Pool DB access
     def _make_pool_dict(self, context, pool, fields=None):
-        res = {'id': pool['id'],
-               'tenant_id': pool['tenant_id'],
-               'name': pool['name'],
-               'description': pool['description'],
-               'subnet_id': pool['subnet_id'],
-               'protocol': pool['protocol'],
-               'vip_id': pool['vip_id'],
-               'lb_method': pool['lb_method'],
-               'admin_state_up': pool['admin_state_up'],
-               'status': pool['status']}
+        res = self._make_columns_dict(pool, fields,
+                                      ('id', 'tenant_id', 'name',
+                                       'description', 'subnet_id', 'protocol',
+                                       'vip_id', 'lb_method',
+                                       'admin_state_up', 'status'))
 
         # Get the associated members
-        res['members'] = [member['id'] for member in pool['members']]
+        if not fields or 'members' in fields:
+            res['members'] = [member['id'] for member in pool['members']]
 
         # Get the associated health_monitors
-        res['health_monitors'] = [
-            monitor['monitor_id'] for monitor in pool['monitors']]
+        if not fields or 'health_monitors' in fields:
+            res['health_monitors'] = [
+                monitor['monitor_id'] for monitor in pool['monitors']]
 
-        return self._fields(res, fields)
+        return res
 
     def _update_pool_member_info(self, context, pool_id, membersInfo):
         with context.session.begin(subtransactions=True):
@@ -464,6 +472,7 @@ class LoadBalancerPluginDb(LoadBalancerPluginBase):
     def get_pools(self, context, filters=None, fields=None):
         collection = self._model_query(context, Pool)
         collection = self._apply_filters_to_query(collection, Pool, filters)
+        collection = self._apply_fields_to_query(collection, Pool, fields)
         return [self._make_pool_dict(context, c, fields)
                 for c in collection.all()]
 
@@ -536,15 +545,10 @@ class LoadBalancerPluginDb(LoadBalancerPluginBase):
     ########################################################
     # Member DB access
     def _make_member_dict(self, member, fields=None):
-        res = {'id': member['id'],
-               'tenant_id': member['tenant_id'],
-               'pool_id': member['pool_id'],
-               'address': member['address'],
-               'port': member['port'],
-               'weight': member['weight'],
-               'admin_state_up': member['admin_state_up'],
-               'status': member['status']}
-        return self._fields(res, fields)
+        return self._make_columns_dict(member, fields,
+                                       ('id', 'tenant_id', 'pool_id',
+                                        'address', 'port', 'weight',
+                                        'admin_state_up', 'status'))
 
     def create_member(self, context, member):
         v = member['member']
@@ -597,18 +601,12 @@ class LoadBalancerPluginDb(LoadBalancerPluginBase):
     ########################################################
     # HealthMonitor DB access
     def _make_health_monitor_dict(self, health_monitor, fields=None):
-        res = {'id': health_monitor['id'],
-               'tenant_id': health_monitor['tenant_id'],
-               'type': health_monitor['type'],
-               'delay': health_monitor['delay'],
-               'timeout': health_monitor['timeout'],
-               'max_retries': health_monitor['max_retries'],
-               'http_method': health_monitor['http_method'],
-               'url_path': health_monitor['url_path'],
-               'expected_codes': health_monitor['expected_codes'],
-               'admin_state_up': health_monitor['admin_state_up'],
-               'status': health_monitor['status']}
-        return self._fields(res, fields)
+        return self._make_columns_dict(health_monitor, fields,
+                                       ('id', 'tenant_id', 'type', 'delay',
+                                        'timeout', 'max_retries',
+                                        'http_method', 'url_path',
+                                        'expected_codes', 'admin_state_up',
+                                        'status'))
 
     def create_health_monitor(self, context, health_monitor):
         v = health_monitor['health_monitor']
@@ -0,0 +1,76 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack LLC
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""resource revisions
+
+Revision ID: 1d6ee1ae5da5
+Revises: 4a1f3e5d0b8c
+Create Date: 2013-03-04 15:12:47.318526
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '1d6ee1ae5da5'
+down_revision = '4a1f3e5d0b8c'
+
+# Change to ['*'] if this migration applies to all plugins
+
+migration_for_plugins = ['*']
+
+L3_CAPABLE = [
+    'quantum.plugins.hyperv.hyperv_quantum_plugin.HyperVQuantumPlugin',
+    'quantum.plugins.linuxbridge.lb_quantum_plugin.LinuxBridgePluginV2',
+    'quantum.plugins.metaplugin.meta_quantum_plugin.MetaPluginV2',
+    'quantum.plugins.nec.nec_plugin.NECPluginV2',
+    'quantum.plugins.openvswitch.ovs_quantum_plugin.OVSQuantumPluginV2',
+    'quantum.plugins.ryu.ryu_quantum_plugin.RyuQuantumPluginV2',
+]
+
+SECURITY_GROUP_CAPABLE = [
+    'quantum.plugins.linuxbridge.lb_quantum_plugin.LinuxBridgePluginV2',
+]
+
+from alembic import op
+import sqlalchemy as sa
+
+from quantum.db import migration
+
+
+def _tables(active_plugin):
+    tables = ['networks', 'subnets', 'ports']
+    if migration.should_run(active_plugin, L3_CAPABLE):
+        tables.extend(['routers', 'floatingips'])
+    if migration.should_run(active_plugin, SECURITY_GROUP_CAPABLE):
+        tables.append('securitygroups')
+    return tables
+
+
+def upgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    for table in _tables(active_plugin):
+        op.add_column(table, sa.Column('revision', sa.BigInteger(),
+                                       nullable=False, server_default='0'))
+
+
+def downgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    for table in _tables(active_plugin):
+        op.drop_column(table, 'revision')
@@ -0,0 +1,74 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack LLC
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""segmentation_id_ranges
+
+Revision ID: 2f9e956e7532
+Revises: 1d76643bcec4
+Create Date: 2013-02-20 10:12:45.214305
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '2f9e956e7532'
+down_revision = '1d76643bcec4'
+
+# Change to ['*'] if this migration applies to all plugins
+
+migration_for_plugins = [
+    'quantum.plugins.linuxbridge.lb_quantum_plugin.LinuxBridgePluginV2',
+    'quantum.plugins.openvswitch.ovs_quantum_plugin.OVSQuantumPluginV2'
+]
+
+from alembic import op
+import sqlalchemy as sa
+
+from quantum.db import migration
+
+
+def upgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    op.create_table(
+        'segmentation_id_ranges',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('pool', sa.String(length=32), nullable=False),
+        sa.Column('physical_network', sa.String(length=64), nullable=False),
+        sa.Column('first_id', sa.Integer(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'))
+    op.create_index('ix_segmentation_id_ranges_pool',
+                    'segmentation_id_ranges', ['pool'])
+
+    # free IDs are rebuilt as ranges when the plugin synchronizes its pools
+    # at startup, only allocated IDs are kept in the plugin tables
+    if active_plugin == migration_for_plugins[0]:
+        op.execute("DELETE FROM network_states WHERE allocated = false")
+    else:
+        op.execute("DELETE FROM ovs_vlan_allocations WHERE allocated = false")
+        op.execute("DELETE FROM ovs_tunnel_allocations "
+                   "WHERE allocated = false")
+
+
+def downgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    # the plugins of the previous revision repopulate the free IDs at startup
+    op.drop_index('ix_segmentation_id_ranges_pool', 'segmentation_id_ranges')
+    op.drop_table('segmentation_id_ranges')
@@ -0,0 +1,66 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack LLC
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""NEC OFC task queue
+
+Revision ID: 3b54bf9e29f7
+Revises: 2f9e956e7532
+Create Date: 2013-02-25 14:32:08.114561
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3b54bf9e29f7'
+down_revision = '2f9e956e7532'
+
+# Change to ['*'] if this migration applies to all plugins
+
+migration_for_plugins = [
+    'quantum.plugins.nec.nec_plugin.NECPluginV2'
+]
+
+from alembic import op
+import sqlalchemy as sa
+
+from quantum.db import migration
+
+
+def upgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    op.create_table(
+        'ofctasks',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('ordering_key', sa.String(length=255), nullable=False),
+        sa.Column('method', sa.String(length=64), nullable=False),
+        sa.Column('args', sa.Text(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt', sa.DateTime(), nullable=False),
+        sa.Column('owner', sa.String(length=36), nullable=True),
+        sa.Column('claimed_until', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'))
+    op.create_index('ix_ofctasks_ordering_key', 'ofctasks',
+                    ['ordering_key'])
+
+
+def downgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    op.drop_index('ix_ofctasks_ordering_key', 'ofctasks')
+    op.drop_table('ofctasks')
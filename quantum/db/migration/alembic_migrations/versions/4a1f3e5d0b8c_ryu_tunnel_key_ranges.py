@@ -0,0 +1,70 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 OpenStack LLC
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""ryu tunnel key ranges
+
+Revision ID: 4a1f3e5d0b8c
+Revises: 3b54bf9e29f7
+Create Date: 2013-02-27 09:41:22.603718
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4a1f3e5d0b8c'
+down_revision = '3b54bf9e29f7'
+
+# Change to ['*'] if this migration applies to all plugins
+
+migration_for_plugins = [
+    'quantum.plugins.ryu.ryu_quantum_plugin.RyuQuantumPluginV2'
+]
+
+from alembic import op
+import sqlalchemy as sa
+
+from quantum.db import migration
+
+
+def upgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    # the free tunnel keys are rebuilt as ranges when the plugin starts
+    op.create_table(
+        'segmentation_id_ranges',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('pool', sa.String(length=32), nullable=False),
+        sa.Column('physical_network', sa.String(length=64), nullable=False),
+        sa.Column('first_id', sa.Integer(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'))
+    op.create_index('ix_segmentation_id_ranges_pool',
+                    'segmentation_id_ranges', ['pool'])
+    op.drop_table('tunnelkeylasts')
+
+
+def downgrade(active_plugin=None, options=None):
+    if not migration.should_run(active_plugin, migration_for_plugins):
+        return
+
+    op.create_table(
+        'tunnelkeylasts',
+        sa.Column('last_key', sa.Integer(), autoincrement=False,
+                  nullable=False),
+        sa.PrimaryKeyConstraint('last_key'))
+    op.drop_index('ix_segmentation_id_ranges_pool', 'segmentation_id_ranges')
+    op.drop_table('segmentation_id_ranges')
@@ -19,6 +19,7 @@ import sqlalchemy as sa
 from sqlalchemy import orm
 
 from quantum.db import model_base
+from quantum.db import revisions
 from quantum.openstack.common import uuidutils
 
 
@@ -35,6 +36,18 @@ class HasId(object):
                    default=uuidutils.generate_uuid)
 
 
+class HasRevision(object):
+    """Revision mixin, add to subclasses of resources having an ETag.
+
+    The revision is renewed on every update of the row, and by the changes
+    of the rows whose model has a revision_parent pointing to it.
+    """
+    revision = sa.Column(sa.BigInteger, nullable=False,
+                         default=revisions.next_revision,
+                         onupdate=revisions.next_revision,
+                         server_default='0')
+
+
 class IPAvailabilityRange(model_base.BASEV2):
     """Internal representation of available IPs for Quantum subnets.
 
@@ -61,6 +74,7 @@ class IPAvailabilityRange(model_base.BASEV2):
 
 class IPAllocationPool(model_base.BASEV2, HasId):
     """Representation of an allocation pool in a Quantum subnet."""
+    revision_parent = ('subnets', 'subnet_id')
 
     subnet_id = sa.Column(sa.String(36), sa.ForeignKey('subnets.id',
                                                        ondelete="CASCADE"),
@@ -79,6 +93,7 @@ class IPAllocationPool(model_base.BASEV2, HasId):
 class IPAllocation(model_base.BASEV2):
     """Internal representation of allocated IP addresses in a Quantum subnet.
     """
+    revision_parent = ('ports', 'port_id')
     port_id = sa.Column(sa.String(36), sa.ForeignKey('ports.id',
                                                      ondelete="CASCADE"),
                         nullable=True)
@@ -92,7 +107,7 @@ class IPAllocation(model_base.BASEV2):
     expiration = sa.Column(sa.DateTime, nullable=True)
 
 
-class Port(model_base.BASEV2, HasId, HasTenant):
+class Port(model_base.BASEV2, HasId, HasTenant, HasRevision):
     """Represents a port on a quantum v2 network."""
     name = sa.Column(sa.String(255))
     network_id = sa.Column(sa.String(36), sa.ForeignKey("networks.id"),
@@ -107,6 +122,7 @@ class Port(model_base.BASEV2, HasId, HasTenant):
 
 class DNSNameServer(model_base.BASEV2):
     """Internal representation of a DNS nameserver."""
+    revision_parent = ('subnets', 'subnet_id')
     address = sa.Column(sa.String(128), nullable=False, primary_key=True)
     subnet_id = sa.Column(sa.String(36),
                           sa.ForeignKey('subnets.id',
@@ -116,6 +132,7 @@ class DNSNameServer(model_base.BASEV2):
 
 class Route(model_base.BASEV2):
     """Represents a route for a subnet or port."""
+    revision_parent = ('subnets', 'subnet_id')
     destination = sa.Column(sa.String(64), nullable=False, primary_key=True)
     nexthop = sa.Column(sa.String(64), nullable=False, primary_key=True)
     subnet_id = sa.Column(sa.String(36),
@@ -124,12 +141,13 @@ class Route(model_base.BASEV2):
                           primary_key=True)
 
 
-class Subnet(model_base.BASEV2, HasId, HasTenant):
+class Subnet(model_base.BASEV2, HasId, HasTenant, HasRevision):
     """Represents a quantum subnet.
 
     When a subnet is created the first and last entries will be created. These
     are used for the IP allocation.
     """
+    revision_parent = ('networks', 'network_id')
     name = sa.Column(sa.String(255))
     network_id = sa.Column(sa.String(36), sa.ForeignKey('networks.id'))
     ip_version = sa.Column(sa.Integer, nullable=False)
@@ -149,7 +167,7 @@ class Subnet(model_base.BASEV2, HasId, HasTenant):
     shared = sa.Column(sa.Boolean)
 
 
-class Network(model_base.BASEV2, HasId, HasTenant):
+class Network(model_base.BASEV2, HasId, HasTenant, HasRevision):
     """Represents a v2 quantum network."""
     name = sa.Column(sa.String(255))
     ports = orm.relationship(Port, backref='networks')
@@ -0,0 +1,78 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Revisions of the resources, from which the API builds their ETags.
+
+A resource gets a new revision in the flush inserting or updating its row,
+or inserting, updating or deleting one of the rows it is built from, which
+are the models declaring a revision_parent. Revisions are taken from the
+time of the change, so the highest revision of a collection also changes
+when a resource is added to it.
+
+Rows must be changed through the session (session.delete() rather than a
+bulk query.delete()) for the flush to see them. Revisions are only
+strictly increasing within a process: with several API servers, their
+clocks have to be kept in sync, otherwise a change made by a server whose
+clock is behind may leave the highest revision of a collection unchanged.
+"""
+
+import threading
+import time
+
+from sqlalchemy.orm import attributes
+
+from quantum.db import model_base
+
+
+_lock = threading.Lock()
+_last_revision = 0
+
+
+def next_revision():
+    """Return a revision greater than all the ones returned before."""
+    global _last_revision
+    with _lock:
+        _last_revision = max(int(time.time() * 1000000), _last_revision + 1)
+        return _last_revision
+
+
+def _parents_of(obj):
+    parent = getattr(obj, 'revision_parent', None)
+    if not parent:
+        return []
+    table_name, column = parent
+    # a row moved to another parent, or detached from it (e.g. an IP
+    # allocation held after its port was updated), changes both parents
+    history = attributes.get_history(obj, column)
+    return [(table_name, parent_id) for parent_id in history.sum()
+            if parent_id]
+
+
+def after_flush(session, flush_context):
+    """Give a new revision to the parents of the rows changed by a flush."""
+    changed = list(session.new) + list(session.deleted)
+    changed.extend(obj for obj in session.dirty
+                   if session.is_modified(obj, include_collections=False))
+    parents = set()
+    for obj in changed:
+        parents.update(_parents_of(obj))
+    for table_name, parent_id in parents:
+        table = model_base.BASEV2.metadata.tables[table_name]
+        session.execute(table.update().
+                        where(table.c.id == parent_id).
+                        values(revision=next_revision()))
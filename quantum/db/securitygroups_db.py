@@ -29,7 +29,8 @@ from quantum.openstack.common import cfg
 from quantum.openstack.common import uuidutils
 
 
-class SecurityGroup(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant):
+class SecurityGroup(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant,
+                    models_v2.HasRevision):
     """Represents a v2 quantum security group."""
     name = sa.Column(sa.String(255))
     description = sa.Column(sa.String(255))
@@ -38,6 +39,7 @@ class SecurityGroup(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant):
 
 class SecurityGroupPortBinding(model_base.BASEV2):
     """Represents binding between quantum ports and security profiles"""
+    revision_parent = ('ports', 'port_id')
     port_id = sa.Column(sa.String(36),
                         sa.ForeignKey("ports.id",
                                       ondelete='CASCADE'),
@@ -50,6 +52,7 @@ class SecurityGroupPortBinding(model_base.BASEV2):
 class SecurityGroupRule(model_base.BASEV2, models_v2.HasId,
                         models_v2.HasTenant):
     """Represents a v2 quantum security group rule."""
+    revision_parent = ('securitygroups', 'security_group_id')
     external_id = sa.Column(sa.Integer)
     security_group_id = sa.Column(sa.String(36),
                                   sa.ForeignKey("securitygroups.id",
@@ -147,6 +150,13 @@ class SecurityGroupDbMixin(ext_sg.SecurityGroupPluginBase):
         return self._get_collection_count(context, SecurityGroup,
                                           filters=filters)
 
+    def get_security_group_revision(self, context, id):
+        return self._get_revision(context, SecurityGroup, id)
+
+    def get_security_groups_revision(self, context, filters=None):
+        return self._get_collection_revision(context, SecurityGroup,
+                                             filters=filters)
+
     def get_security_group(self, context, id, fields=None, tenant_id=None):
         """Tenant id is given to handle the case when we
         are creating a security group or security group rule on behalf of
@@ -194,18 +204,17 @@ class SecurityGroupDbMixin(ext_sg.SecurityGroupPluginBase):
             context.session.delete(sg)
 
     def _make_security_group_dict(self, security_group, fields=None):
-        res = {'id': security_group['id'],
-               'name': security_group['name'],
-               'tenant_id': security_group['tenant_id'],
-               'description': security_group['description']}
-        if security_group.get('external_id'):
+        res = self._make_columns_dict(security_group, fields,
+                                      ('id', 'name', 'tenant_id',
+                                       'description'))
+        if ((not fields or 'external_id' in fields) and
+                security_group.get('external_id')):
             res['external_id'] = security_group['external_id']
-        return self._fields(res, fields)
+        return res
 
     def _make_security_group_binding_dict(self, security_group, fields=None):
-        res = {'port_id': security_group['port_id'],
-               'security_group_id': security_group['security_group_id']}
-        return self._fields(res, fields)
+        return self._make_columns_dict(security_group, fields,
+                                       ('port_id', 'security_group_id'))
 
     def _create_port_security_group_binding(self, context, port_id,
                                             security_group_id):
@@ -325,19 +334,13 @@ class SecurityGroupDbMixin(ext_sg.SecurityGroupPluginBase):
         return security_group_id
 
     def _make_security_group_rule_dict(self, security_group_rule, fields=None):
-        res = {'id': security_group_rule['id'],
-               'tenant_id': security_group_rule['tenant_id'],
-               'security_group_id': security_group_rule['security_group_id'],
-               'ethertype': security_group_rule['ethertype'],
-               'direction': security_group_rule['direction'],
-               'protocol': security_group_rule['protocol'],
-               'port_range_min': security_group_rule['port_range_min'],
-               'port_range_max': security_group_rule['port_range_max'],
-               'source_ip_prefix': security_group_rule['source_ip_prefix'],
-               'source_group_id': security_group_rule['source_group_id'],
-               'external_id': security_group_rule['external_id']}
-
-        return self._fields(res, fields)
+        return self._make_columns_dict(security_group_rule, fields,
+                                       ('id', 'tenant_id',
+                                        'security_group_id', 'ethertype',
+                                        'direction', 'protocol',
+                                        'port_range_min', 'port_range_max',
+                                        'source_ip_prefix', 'source_group_id',
+                                        'external_id'))
 
     def _make_security_group_rule_filter_dict(self, security_group_rule):
         sgr = security_group_rule['security_group_rule']
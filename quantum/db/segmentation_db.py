@@ -0,0 +1,205 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Segmentation ID allocator storing the free IDs of a pool as ranges.
+
+Plugins keep one row per allocated VLAN or tunnel ID in their own tables;
+the IDs still available for allocation are kept here as [first_id, last_id]
+intervals, so the size of the tables does not depend on the size of the
+configured ranges.
+"""
+
+import bisect
+
+import sqlalchemy as sa
+
+from quantum.db import model_base
+from quantum.db import models_v2
+from quantum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+
+class SegmentationIdRange(model_base.BASEV2, models_v2.HasId):
+    """Represents a range of free segmentation IDs of a pool."""
+    __tablename__ = 'segmentation_id_ranges'
+
+    pool = sa.Column(sa.String(32), nullable=False, index=True)
+    # empty for pools which are not bound to a physical network
+    physical_network = sa.Column(sa.String(64), nullable=False, default='')
+    first_id = sa.Column(sa.Integer, nullable=False)
+    last_id = sa.Column(sa.Integer, nullable=False)
+
+    def __init__(self, pool, physical_network, first_id, last_id):
+        self.pool = pool
+        self.physical_network = physical_network
+        self.first_id = first_id
+        self.last_id = last_id
+
+    def __repr__(self):
+        return "<SegmentationIdRange(%s,%s,%d,%d)>" % (self.pool,
+                                                       self.physical_network,
+                                                       self.first_id,
+                                                       self.last_id)
+
+
+def free_ranges(ranges, allocated):
+    """Return the sorted intervals of ranges without the allocated IDs.
+
+    :param ranges: iterable of (first, last) tuples, possibly overlapping
+    :param allocated: iterable of allocated IDs
+    """
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+
+    ids = sorted(allocated)
+    free = []
+    for first, last in merged:
+        start = first
+        lo = bisect.bisect_left(ids, first)
+        hi = bisect.bisect_right(ids, last)
+        for seg_id in ids[lo:hi]:
+            if seg_id > start:
+                free.append((start, seg_id - 1))
+            start = seg_id + 1
+        if start <= last:
+            free.append((start, last))
+    return free
+
+
+def sync_ranges(session, pool, network_ranges, allocated):
+    """Rebuild the free ranges of a pool from its configured ranges.
+
+    :param network_ranges: dict mapping physical networks to lists of
+                           (first, last) tuples
+    :param allocated: dict mapping physical networks to the IDs currently
+                      allocated on them
+    """
+    with session.begin(subtransactions=True):
+        (session.query(SegmentationIdRange).
+         filter_by(pool=pool).
+         delete(synchronize_session=False))
+        rows = []
+        for physical_network, ranges in network_ranges.iteritems():
+            for first, last in free_ranges(ranges,
+                                           allocated.get(physical_network,
+                                                         ())):
+                rows.append({'pool': pool,
+                             'physical_network': physical_network,
+                             'first_id': first,
+                             'last_id': last})
+        if rows:
+            session.execute(SegmentationIdRange.__table__.insert(), rows)
+        LOG.debug(_("Synchronized %(count)d free ranges of pool %(pool)s"),
+                  {'count': len(rows), 'pool': pool})
+
+
+def _query_containing(session, pool, physical_network, seg_id):
+    return (session.query(SegmentationIdRange).
+            filter_by(pool=pool, physical_network=physical_network).
+            filter(SegmentationIdRange.first_id <= seg_id).
+            filter(SegmentationIdRange.last_id >= seg_id))
+
+
+def is_free(session, pool, physical_network, seg_id):
+    """Return whether seg_id is available for allocation in the pool."""
+    return _query_containing(session, pool, physical_network,
+                             seg_id).first() is not None
+
+
+def allocate(session, pool):
+    """Remove the lowest free ID from the pool.
+
+    Returns a (physical_network, seg_id) tuple, or None if the pool is
+    exhausted.
+    """
+    with session.begin(subtransactions=True):
+        free = (session.query(SegmentationIdRange).
+                filter_by(pool=pool).
+                order_by(SegmentationIdRange.physical_network,
+                         SegmentationIdRange.first_id).
+                with_lockmode('update').
+                first())
+        if not free:
+            return
+        seg_id = free.first_id
+        if free.first_id == free.last_id:
+            session.delete(free)
+        else:
+            free.first_id += 1
+        return (free.physical_network, seg_id)
+
+
+def allocate_specific(session, pool, physical_network, seg_id):
+    """Remove seg_id from the pool.
+
+    Returns False if seg_id was not available in the pool.
+    """
+    with session.begin(subtransactions=True):
+        free = (_query_containing(session, pool, physical_network, seg_id).
+                with_lockmode('update').
+                first())
+        if not free:
+            return False
+        if free.first_id == free.last_id:
+            session.delete(free)
+        elif seg_id == free.first_id:
+            free.first_id += 1
+        elif seg_id == free.last_id:
+            free.last_id -= 1
+        else:
+            # split the range around seg_id
+            session.add(SegmentationIdRange(pool, physical_network,
+                                            seg_id + 1, free.last_id))
+            free.last_id = seg_id - 1
+        return True
+
+
+def release(session, pool, physical_network, seg_id, ranges):
+    """Give seg_id back to the pool if it is inside the configured ranges.
+
+    Returns False if seg_id is outside the configured ranges.
+    """
+    for first, last in ranges:
+        if first <= seg_id <= last:
+            break
+    else:
+        return False
+
+    with session.begin(subtransactions=True):
+        query = (session.query(SegmentationIdRange).
+                 filter_by(pool=pool, physical_network=physical_network).
+                 with_lockmode('update'))
+        before = query.filter_by(last_id=seg_id - 1).first()
+        after = query.filter_by(first_id=seg_id + 1).first()
+        if before and after:
+            before.last_id = after.last_id
+            session.delete(after)
+        elif before:
+            before.last_id = seg_id
+        elif after:
+            after.first_id = seg_id
+        else:
+            session.add(SegmentationIdRange(pool, physical_network,
+                                            seg_id, seg_id))
+    return True
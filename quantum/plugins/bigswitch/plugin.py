@@ -48,6 +48,9 @@ import base64
 import httplib
 import json
 import socket
+import time
+
+import eventlet
 
 from quantum.common import exceptions
 from quantum.common import rpc as q_rpc
@@ -56,6 +59,7 @@ from quantum import context as qcontext
 from quantum.db import api as db
 from quantum.db import db_base_plugin_v2
 from quantum.db import dhcp_rpc_base
+from quantum.db import models_v2
 from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
 from quantum.openstack.common import rpc
@@ -71,6 +75,15 @@ restproxy_opts = [
     cfg.BoolOpt('serverssl', default=False),
     cfg.BoolOpt('syncdata', default=False),
     cfg.IntOpt('servertimeout', default=10),
+    cfg.IntOpt('serverpoolsize', default=4,
+               help=_("Maximum number of idle connections kept open to "
+                      "each server")),
+    cfg.IntOpt('serverbackoff', default=30,
+               help=_("Seconds during which an unreachable server is "
+                      "skipped")),
+    cfg.BoolOpt('concurrentgets', default=False,
+                help=_("Send GET requests to all servers at once and use "
+                       "the first successful response")),
 ]
 
 
@@ -87,6 +100,9 @@ SUCCESS_CODES = range(200, 207)
 FAILURE_CODES = [0, 301, 302, 303, 400, 401, 403, 404, 500, 501, 502, 503,
                  504, 505]
 SYNTAX_ERROR_MESSAGE = 'Syntax error in server config file, aborting plugin'
+# methods retried on a new connection when a reused one fails, the others
+# may have been applied by the controller before the failure
+RETRIED_METHODS = ('GET', 'DELETE')
 
 
 class RemoteRestError(exceptions.QuantumException):
@@ -99,9 +115,14 @@ class RemoteRestError(exceptions.QuantumException):
 
 
 class ServerProxy(object):
-    """REST server proxy to a network controller."""
+    """REST server proxy to a network controller.
+
+    Connections to the controller are kept alive and reused by later calls,
+    up to pool_size idle connections.
+    """
 
-    def __init__(self, server, port, ssl, auth, timeout, base_uri, name):
+    def __init__(self, server, port, ssl, auth, timeout, base_uri, name,
+                 pool_size=4):
         self.server = server
         self.port = port
         self.ssl = ssl
@@ -112,12 +133,56 @@ class ServerProxy(object):
         self.auth = None
         if auth:
             self.auth = 'Basic ' + base64.encodestring(auth).strip()
+        self.pool_size = pool_size
+        self.connections = []
+        # the server is skipped by the pool until this time after a failure
+        self.skip_until = 0
+
+    def is_available(self):
+        return time.time() >= self.skip_until
+
+    def mark_failed(self, backoff):
+        self.skip_until = time.time() + backoff
+
+    def mark_alive(self):
+        self.skip_until = 0
+
+    def _new_connection(self):
+        if self.ssl:
+            return httplib.HTTPSConnection(self.server, self.port,
+                                           timeout=self.timeout)
+        return httplib.HTTPConnection(self.server, self.port,
+                                      timeout=self.timeout)
+
+    def _release_connection(self, conn, response):
+        if response.will_close or len(self.connections) >= self.pool_size:
+            conn.close()
+        else:
+            self.connections.append(conn)
+
+    def close(self):
+        """Close the idle connections to the server."""
+        while self.connections:
+            self.connections.pop().close()
+
+    def _request(self, conn, action, uri, body, headers):
+        conn.request(action, uri, body, headers)
+        response = conn.getresponse()
+        respstr = response.read()
+        respdata = respstr
+        if response.status in self.success_codes:
+            try:
+                respdata = json.loads(respstr)
+            except ValueError:
+                # response was not JSON, ignore the exception
+                pass
+        self._release_connection(conn, response)
+        return (response.status, response.reason, respstr, respdata)
 
     def rest_call(self, action, resource, data, headers):
         uri = self.base_uri + resource
         body = json.dumps(data)
-        if not headers:
-            headers = {}
+        headers = dict(headers or {})
         headers['Content-type'] = 'application/json'
         headers['Accept'] = 'application/json'
         headers['QuantumProxy-Agent'] = self.name
@@ -131,38 +196,29 @@ class ServerProxy(object):
         LOG.debug(_("ServerProxy: resource=%(resource)s, data=%(data)r, "
                     "headers=%(headers)r"), locals())
 
-        conn = None
-        if self.ssl:
-            conn = httplib.HTTPSConnection(
-                self.server, self.port, timeout=self.timeout)
-            if conn is None:
-                LOG.error(_('ServerProxy: Could not establish HTTPS '
-                            'connection'))
-                return 0, None, None, None
-        else:
-            conn = httplib.HTTPConnection(
-                self.server, self.port, timeout=self.timeout)
-            if conn is None:
-                LOG.error(_('ServerProxy: Could not establish HTTP '
-                            'connection'))
-                return 0, None, None, None
-
+        reused = bool(self.connections)
+        conn = self.connections.pop() if reused else self._new_connection()
         try:
-            conn.request(action, uri, body, headers)
-            response = conn.getresponse()
-            respstr = response.read()
-            respdata = respstr
-            if response.status in self.success_codes:
-                try:
-                    respdata = json.loads(respstr)
-                except ValueError:
-                    # response was not JSON, ignore the exception
-                    pass
-            ret = (response.status, response.reason, respstr, respdata)
-        except (socket.timeout, socket.error) as e:
-            LOG.error(_('ServerProxy: %(action)s failure, %(e)r'), locals())
+            ret = self._request(conn, action, uri, body, headers)
+        except (socket.error, httplib.HTTPException) as e:
+            conn.close()
             ret = 0, None, None, None
-        conn.close()
+            if (reused and action in RETRIED_METHODS and
+                    not isinstance(e, socket.timeout)):
+                # The controller may have closed the idle connection,
+                # retry once on a new one.
+                LOG.debug(_('ServerProxy: %(action)s failure on reused '
+                            'connection, %(e)r'), locals())
+                conn = self._new_connection()
+                try:
+                    ret = self._request(conn, action, uri, body, headers)
+                except (socket.error, httplib.HTTPException) as e:
+                    conn.close()
+                    LOG.error(_('ServerProxy: %(action)s failure, %(e)r'),
+                              locals())
+            else:
+                LOG.error(_('ServerProxy: %(action)s failure, %(e)r'),
+                          locals())
         LOG.debug(_("ServerProxy: status=%(status)d, reason=%(reason)r, "
                     "ret=%(ret)s, data=%(data)r"), {'status': ret[0],
                                                     'reason': ret[1],
@@ -173,19 +229,23 @@ class ServerProxy(object):
 
 class ServerPool(object):
     def __init__(self, servers, ssl, auth, timeout=10,
-                 base_uri='/quantum/v1.0', name='QuantumRestProxy'):
+                 base_uri='/quantum/v1.0', name='QuantumRestProxy',
+                 pool_size=4, backoff=30, concurrent_gets=False):
         self.base_uri = base_uri
         self.timeout = timeout
         self.name = name
         self.auth = auth
         self.ssl = ssl
+        self.pool_size = pool_size
+        self.backoff = backoff
+        self.concurrent_gets = concurrent_gets
         self.servers = []
         for server_port in servers:
             self.servers.append(self.server_proxy_for(*server_port))
 
     def server_proxy_for(self, server, port):
         return ServerProxy(server, port, self.ssl, self.auth, self.timeout,
-                           self.base_uri, self.name)
+                           self.base_uri, self.name, self.pool_size)
 
     def server_failure(self, resp):
         """Define failure codes as required.
@@ -200,32 +260,69 @@ class ServerPool(object):
         """
         return resp[0] in SUCCESS_CODES
 
-    def rest_call(self, action, resource, data, headers):
-        failed_servers = []
-        while self.servers:
-            active_server = self.servers[0]
-            ret = active_server.rest_call(action, resource, data, headers)
-            if not self.server_failure(ret):
-                self.servers.extend(failed_servers)
-                return ret
-            else:
-                LOG.error(_('ServerProxy: %(action)s failure for servers: '
-                            '%(server)r'),
-                          {'action': action,
-                           'server': (active_server.server,
-                                      active_server.port)})
-                failed_servers.append(self.servers.pop(0))
-
-        # All servers failed, reset server list and try again next time
+    def _candidates(self):
+        """Return the servers to try, in order.
+
+        Servers which could not be reached recently are skipped until their
+        backoff period expires, unless no other server is left.
+        """
+        return ([s for s in self.servers if s.is_available()] or
+                list(self.servers))
+
+    def _handle_result(self, action, server, ret):
+        if not self.server_failure(ret):
+            server.mark_alive()
+            return True
+        LOG.error(_('ServerProxy: %(action)s failure for servers: '
+                    '%(server)r'),
+                  {'action': action, 'server': (server.server, server.port)})
+        if not ret[0]:
+            # the server could not be reached at all
+            server.mark_failed(self.backoff)
+        # the active server is sticky till next failure
+        self.servers.remove(server)
+        self.servers.append(server)
+        return False
+
+    def _all_failed(self, action, servers):
         LOG.error(_('ServerProxy: %(action)s failure for all servers: '
                     '%(server)r'),
                   {'action': action,
-                   'server': tuple((s.server,
-                                    s.port) for s in failed_servers)})
-        self.servers.extend(failed_servers)
+                   'server': tuple((s.server, s.port) for s in servers)})
         return (0, None, None, None)
 
+    def rest_call(self, action, resource, data, headers):
+        servers = self._candidates()
+        for active_server in servers:
+            ret = active_server.rest_call(action, resource, data, headers)
+            if self._handle_result(action, active_server, ret):
+                return ret
+        return self._all_failed(action, servers)
+
+    def concurrent_rest_call(self, action, resource, data, headers):
+        """Issue a call to all the available servers at once.
+
+        Only meant for idempotent calls: the first successful response is
+        returned while the other calls are left to complete.
+        """
+        servers = self._candidates()
+        results = eventlet.queue.LightQueue()
+
+        def _call(server):
+            results.put((server, server.rest_call(action, resource, data,
+                                                  headers)))
+
+        for server in servers:
+            eventlet.spawn_n(_call, server)
+        for i in xrange(len(servers)):
+            server, ret = results.get()
+            if self._handle_result(action, server, ret):
+                return ret
+        return self._all_failed(action, servers)
+
     def get(self, resource, data='', headers=None):
+        if self.concurrent_gets and len(self.servers) > 1:
+            return self.concurrent_rest_call('GET', resource, data, headers)
         return self.rest_call('GET', resource, data, headers)
 
     def put(self, resource, data, headers=None):
@@ -263,6 +360,9 @@ class QuantumRestProxyV2(db_base_plugin_v2.QuantumDbPluginV2):
         serverssl = cfg.CONF.RESTPROXY.serverssl
         syncdata = cfg.CONF.RESTPROXY.syncdata
         timeout = cfg.CONF.RESTPROXY.servertimeout
+        pool_size = cfg.CONF.RESTPROXY.serverpoolsize
+        backoff = cfg.CONF.RESTPROXY.serverbackoff
+        concurrent_gets = cfg.CONF.RESTPROXY.concurrentgets
 
         # validate config
         assert servers is not None, 'Servers not defined. Aborting plugin'
@@ -272,7 +372,9 @@ class QuantumRestProxyV2(db_base_plugin_v2.QuantumDbPluginV2):
 
         # init network ctrl connections
         self.servers = ServerPool(servers, serverssl, serverauth,
-                                  timeout)
+                                  timeout, pool_size=pool_size,
+                                  backoff=backoff,
+                                  concurrent_gets=concurrent_gets)
 
         # init dhcp support
         self.topic = topics.PLUGIN
@@ -668,56 +770,51 @@ class QuantumRestProxyV2(db_base_plugin_v2.QuantumDbPluginV2):
             LOG.error(_("QuantumRestProxyV2: Unable to update remote port: "
                         "%s"), e.message)
 
-    def _send_all_data(self):
-        """Pushes all data to network ctrl (networks/ports, ports/attachments)
-        to give the controller an option to re-sync it's persistent store
-        with quantum's current view of that data.
+    def _get_topology(self, context):
+        """Return the networks with their ports, keyed by network id.
+
+        The topology is built from three queries whatever the number of
+        networks, subnets and ports.
         """
-        admin_context = qcontext.get_admin_context()
         networks = {}
-        ports = {}
-
-        all_networks = super(QuantumRestProxyV2,
-                             self).get_networks(admin_context) or []
-        for net in all_networks:
-            networks[net.get('id')] = {
-                'id': net.get('id'),
-                'name': net.get('name'),
-                'op-status': net.get('admin_state_up'),
+        nets = context.session.query(
+            models_v2.Network.id, models_v2.Network.name,
+            models_v2.Network.admin_state_up)
+        for net in nets:
+            networks[net.id] = {
+                'id': net.id,
+                'name': net.name,
+                'op-status': net.admin_state_up,
+                'ports': [],
             }
-
-            subnets = net.get('subnets', [])
-            for subnet_id in subnets:
-                subnet = self.get_subnet(admin_context, subnet_id)
-                gateway_ip = subnet.get('gateway_ip')
-                if gateway_ip:
-                    # FIX: For backward compatibility with wire protocol
-                    networks[net.get('id')]['gateway'] = gateway_ip
-
-            ports = []
-            net_filter = {'network_id': [net.get('id')]}
-            net_ports = super(QuantumRestProxyV2,
-                              self).get_ports(admin_context,
-                                              filters=net_filter) or []
-            for port in net_ports:
-                port_details = {
-                    'id': port.get('id'),
-                    'attachment': {
-                        'id': port.get('id') + '00',
-                        'mac': port.get('mac_address'),
-                    },
-                    'state': port.get('status'),
-                    'op-status': port.get('admin_state_up'),
-                    'mac': None
-                }
-                ports.append(port_details)
-            networks[net.get('id')]['ports'] = ports
+        subnets = context.session.query(
+            models_v2.Subnet.network_id, models_v2.Subnet.gateway_ip)
+        for network_id, gateway_ip in subnets:
+            if gateway_ip and network_id in networks:
+                # FIX: For backward compatibility with wire protocol
+                networks[network_id]['gateway'] = gateway_ip
+        ports = context.session.query(
+            models_v2.Port.id, models_v2.Port.network_id,
+            models_v2.Port.mac_address, models_v2.Port.status,
+            models_v2.Port.admin_state_up)
+        for port in ports:
+            if port.network_id not in networks:
+                continue
+            networks[port.network_id]['ports'].append({
+                'id': port.id,
+                'attachment': {
+                    'id': port.id + '00',
+                    'mac': port.mac_address,
+                },
+                'state': port.status,
+                'op-status': port.admin_state_up,
+                'mac': None
+            })
+        return networks
+
+    def _put_topology(self, data):
         try:
-            resource = '/topology'
-            data = {
-                'networks': networks,
-            }
-            ret = self.servers.put(resource, data)
+            ret = self.servers.put('/topology', data)
             if not self.servers.action_success(ret):
                 raise RemoteRestError(ret[2])
             return ret
@@ -725,3 +822,12 @@ class QuantumRestProxyV2(db_base_plugin_v2.QuantumDbPluginV2):
             LOG.error(_('QuantumRestProxy: Unable to update remote network: '
                         '%s'), e.message)
             raise
+
+    def _send_all_data(self):
+        """Pushes all data to network ctrl (networks/ports, ports/attachments)
+        to give the controller an option to re-sync it's persistent store
+        with quantum's current view of that data.
+        """
+        admin_context = qcontext.get_admin_context()
+        networks = self._get_topology(admin_context)
+        return self._put_topology({'networks': networks})
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013, Big Switch Networks, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Benchmark of the QuantumRestProxy REST client against a local fake network
+ctrl, with and without persistent connections.
+
+Usage: benchmark.py [<number of calls>]
+"""
+
+import BaseHTTPServer
+import threading
+import time
+
+from quantum.plugins.bigswitch import plugin
+
+
+class FakeCtrlHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Keep-alive capable handler answering every request with 200 OK."""
+
+    protocol_version = 'HTTP/1.1'
+    # send each response in one segment, avoiding delayed ACK stalls
+    wbufsize = -1
+
+    def _handle(self):
+        length = int(self.headers.getheader('content-length') or 0)
+        self.rfile.read(length)
+        body = '{"status": "200 OK"}'
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = do_POST = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_ctrl():
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), FakeCtrlHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def run(port, calls, pool_size):
+    servers = plugin.ServerPool([('127.0.0.1', port)], False, None,
+                                pool_size=pool_size)
+    data = {'network': {'id': 'net-id', 'name': 'net'}}
+    start = time.time()
+    for i in xrange(calls):
+        ret = servers.post(plugin.NET_RESOURCE_PATH % 'tenant', data)
+        assert servers.action_success(ret), ret
+    return calls / (time.time() - start)
+
+
+if __name__ == "__main__":
+    import sys
+
+    calls = 2000
+    if len(sys.argv) > 1:
+        calls = int(sys.argv[1])
+
+    ctrl = start_fake_ctrl()
+    port = ctrl.server_address[1]
+    print "new connection per call: %8.1f ops/s" % run(port, calls, 0)
+    print "persistent connections:  %8.1f ops/s" % run(port, calls, 4)
+    ctrl.shutdown()
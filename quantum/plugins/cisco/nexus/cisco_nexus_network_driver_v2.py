@@ -27,6 +27,7 @@ import logging
 from ncclient import manager
 
 from quantum.plugins.cisco.db import network_db_v2 as cdb
+from quantum.plugins.cisco.nexus import cisco_nexus_session_pool as pool
 from quantum.plugins.cisco.nexus import cisco_nexus_snippets as snipp
 
 
@@ -38,7 +39,7 @@ class CiscoNEXUSDriver():
     Nexus Driver Main Class
     """
     def __init__(self):
-        pass
+        self.sessions = pool.NexusSessionPool(manager.connect)
 
     def nxos_connect(self, nexus_host, nexus_ssh_port, nexus_user,
                      nexus_password):
@@ -110,6 +111,17 @@ class CiscoNEXUSDriver():
         LOG.debug("NexusDriver: %s" % confstr)
         mgr.edit_config(target='running', config=confstr)
 
+    def edit_config(self, nexus_host, nexus_ssh_port, nexus_user,
+                    nexus_password, snippets):
+        """
+        Applies the configuration snippets on Nexus Switch with a single
+        edit-config, on a pooled session
+        """
+        confstr = self.create_xml_snippet(''.join(snippets))
+        LOG.debug("NexusDriver: %s" % confstr)
+        self.sessions.edit_config(nexus_host, int(nexus_ssh_port),
+                                  nexus_user, nexus_password, confstr)
+
     def create_vlan(self, vlan_name, vlan_id, nexus_host, nexus_user,
                     nexus_password, nexus_ports,
                     nexus_ssh_port, vlan_ids=None):
@@ -117,14 +129,14 @@ class CiscoNEXUSDriver():
         Creates a VLAN and Enable on trunk mode an interface on Nexus Switch
         given the VLAN ID and Name and Interface Number
         """
-        man = self.nxos_connect(nexus_host, int(nexus_ssh_port),
-                                nexus_user, nexus_password)
-        self.enable_vlan(man, vlan_id, vlan_name)
         if vlan_ids is '':
             vlan_ids = self.build_vlans_cmd()
         LOG.debug("NexusDriver VLAN IDs: %s" % vlan_ids)
+        snippets = [snipp.CMD_VLAN_CONF_SNIPPET % (vlan_id, vlan_name)]
         for ports in nexus_ports:
-            self.enable_vlan_on_trunk_int(man, ports, vlan_ids)
+            snippets.append(snipp.CMD_VLAN_INT_SNIPPET % (ports, vlan_ids))
+        self.edit_config(nexus_host, nexus_ssh_port, nexus_user,
+                         nexus_password, snippets)
 
     def delete_vlan(self, vlan_id, nexus_host, nexus_user, nexus_password,
                     nexus_ports, nexus_ssh_port):
@@ -132,11 +144,11 @@ class CiscoNEXUSDriver():
         Delete a VLAN and Disables trunk mode an interface on Nexus Switch
         given the VLAN ID and Interface Number
         """
-        man = self.nxos_connect(nexus_host, int(nexus_ssh_port),
-                                nexus_user, nexus_password)
-        self.disable_vlan(man, vlan_id)
+        snippets = [snipp.CMD_NO_VLAN_CONF_SNIPPET % vlan_id]
         for ports in nexus_ports:
-            self.disable_vlan_on_trunk_int(man, ports, vlan_id)
+            snippets.append(snipp.CMD_NO_VLAN_INT_SNIPPET % (ports, vlan_id))
+        self.edit_config(nexus_host, nexus_ssh_port, nexus_user,
+                         nexus_password, snippets)
 
     def build_vlans_cmd(self):
         """
@@ -155,19 +167,19 @@ class CiscoNEXUSDriver():
         """
         Adds a vlan from interfaces on the Nexus switch given the VLAN ID
         """
-        man = self.nxos_connect(nexus_host, int(nexus_ssh_port),
-                                nexus_user, nexus_password)
         if not vlan_ids:
             vlan_ids = self.build_vlans_cmd()
-        for ports in nexus_ports:
-            self.enable_vlan_on_trunk_int(man, ports, vlan_ids)
+        snippets = [snipp.CMD_VLAN_INT_SNIPPET % (ports, vlan_ids)
+                    for ports in nexus_ports]
+        self.edit_config(nexus_host, nexus_ssh_port, nexus_user,
+                         nexus_password, snippets)
 
     def remove_vlan_int(self, vlan_id, nexus_host, nexus_user, nexus_password,
                         nexus_ports, nexus_ssh_port):
         """
         Removes a vlan from interfaces on the Nexus switch given the VLAN ID
         """
-        man = self.nxos_connect(nexus_host, int(nexus_ssh_port),
-                                nexus_user, nexus_password)
-        for ports in nexus_ports:
-            self.disable_vlan_on_trunk_int(man, ports, vlan_id)
+        snippets = [snipp.CMD_NO_VLAN_INT_SNIPPET % (ports, vlan_id)
+                    for ports in nexus_ports]
+        self.edit_config(nexus_host, nexus_ssh_port, nexus_user,
+                         nexus_password, snippets)
@@ -108,13 +108,10 @@ class NexusPlugin(L2DevicePluginBase):
                     _nexus_ports, _nexus_ssh_port, vlan_id)
             else:
                 # Only trunk vlan on the port
-                man = self._client.nxos_connect(_nexus_ip,
-                                                int(_nexus_ssh_port),
-                                                _nexus_username,
-                                                _nexus_password)
-                self._client.enable_vlan_on_trunk_int(man,
-                                                      port_id,
-                                                      vlan_id)
+                self._client.add_vlan_int(
+                    str(vlan_id), _nexus_ip, _nexus_username,
+                    _nexus_password, _nexus_ports, _nexus_ssh_port,
+                    vlan_ids=str(vlan_id))
 
         nxos_db.add_nexusport_binding(port_id, str(vlan_id),
                                       switch_ip, instance)
@@ -0,0 +1,116 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 Cisco Systems, Inc.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+"""
+Pool of NETCONF sessions to the Nexus switches
+"""
+
+import logging
+import time
+
+
+LOG = logging.getLogger(__name__)
+
+# idle sessions kept per switch
+MAX_IDLE_SESSIONS = 2
+# seconds after which an idle session is not reused, the switch may have
+# closed it
+IDLE_TIMEOUT = 300
+
+
+class NexusSessionPool(object):
+    """
+    Keeps the NETCONF sessions to the Nexus switches open between operations,
+    so that an operation does not pay for an SSH handshake and authentication
+    """
+    def __init__(self, connect, max_idle=MAX_IDLE_SESSIONS,
+                 idle_timeout=IDLE_TIMEOUT):
+        """
+        connect is called with host, port, username and password keyword
+        arguments and returns a session, like ncclient.manager.connect
+        """
+        self.connect = connect
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        # (host, port, username) -> list of (session, time of last use)
+        self._idle = {}
+
+    def _get(self, key, password):
+        """
+        Returns an idle session to the switch, or a new one, and whether
+        it is reused
+        """
+        idle = self._idle.get(key, [])
+        now = time.time()
+        while idle:
+            session, last_used = idle.pop()
+            if session.connected and now - last_used < self.idle_timeout:
+                return session, True
+            self._close(session)
+        return self._connect(key, password), False
+
+    def _connect(self, key, password):
+        host, port, username = key
+        LOG.debug("NexusSessionPool: connecting to %s:%s" % (host, port))
+        return self.connect(host=host, port=port, username=username,
+                            password=password)
+
+    def _put(self, key, session):
+        idle = self._idle.setdefault(key, [])
+        if session.connected and len(idle) < self.max_idle:
+            idle.append((session, time.time()))
+        else:
+            self._close(session)
+
+    def _close(self, session):
+        try:
+            session.close_session()
+        except Exception:
+            LOG.debug("NexusSessionPool: error closing session, ignored")
+
+    def edit_config(self, host, port, username, password, config):
+        """
+        Applies config on the running configuration of the switch.
+        If a reused session turns out to be disconnected, the config is
+        applied on a new session.
+        """
+        key = (host, int(port), username)
+        session, reused = self._get(key, password)
+        try:
+            session.edit_config(target='running', config=config)
+        except Exception:
+            if session.connected or not reused:
+                # the switch rejected the config, or the new session failed
+                self._put(key, session)
+                raise
+            LOG.debug("NexusSessionPool: session to %s lost, reconnecting" %
+                      host)
+            self._close(session)
+            session = self._connect(key, password)
+            try:
+                session.edit_config(target='running', config=config)
+            except Exception:
+                self._put(key, session)
+                raise
+        self._put(key, session)
+
+    def close(self):
+        """
+        Closes all the idle sessions
+        """
+        for idle in self._idle.values():
+            while idle:
+                self._close(idle.pop()[0])
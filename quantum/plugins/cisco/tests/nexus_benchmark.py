@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 Cisco Systems, Inc.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+"""
+Latency benchmark of the Nexus driver VLAN operations against a fake NETCONF
+transport, with and without pooled sessions.
+
+The fake transport sleeps for the configured SSH connection and edit-config
+latencies, no switch is needed.
+
+Usage: nexus_benchmark.py [<connect ms> [<edit-config ms> [<ports>]]]
+"""
+
+import time
+
+from quantum.plugins.cisco.nexus import cisco_nexus_network_driver_v2
+
+
+class FakeSession(object):
+    """NETCONF session sleeping like a remote switch"""
+
+    def __init__(self, connect_latency, edit_latency):
+        time.sleep(connect_latency)
+        self.edit_latency = edit_latency
+        self.connected = True
+
+    def edit_config(self, target, config):
+        time.sleep(self.edit_latency)
+
+    def close_session(self):
+        self.connected = False
+
+
+def run(driver, ports, operations=20):
+    nexus_ports = ['1/%d' % i for i in range(1, ports + 1)]
+    start = time.time()
+    for vlan_id in range(100, 100 + operations):
+        driver.create_vlan('q-%d' % vlan_id, str(vlan_id), '1.1.1.1',
+                           'admin', 'password', nexus_ports, '22',
+                           vlan_ids=str(vlan_id))
+        driver.delete_vlan(str(vlan_id), '1.1.1.1', 'admin', 'password',
+                           nexus_ports, '22')
+    return (time.time() - start) * 1000 / (operations * 2)
+
+
+if __name__ == "__main__":
+    import sys
+
+    connect_ms, edit_ms, ports = 300, 20, 4
+    if len(sys.argv) > 1:
+        connect_ms = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        edit_ms = int(sys.argv[2])
+    if len(sys.argv) > 3:
+        ports = int(sys.argv[3])
+
+    def connect(**kwargs):
+        return FakeSession(connect_ms / 1000.0, edit_ms / 1000.0)
+
+    driver = cisco_nexus_network_driver_v2.CiscoNEXUSDriver()
+    driver.sessions.connect = connect
+    driver.sessions.max_idle = 0
+    print "new session per operation: %8.1f ms" % run(driver, ports)
+    driver.sessions.max_idle = 2
+    print "pooled sessions:           %8.1f ms" % run(driver, ports)
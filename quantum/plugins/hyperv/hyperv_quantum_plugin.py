@@ -147,6 +147,9 @@ class HyperVQuantumPlugin(db_base_plugin_v2.QuantumDbPluginV2,
     # bulk operations. Name mangling is used in order to ensure it
     # is qualified by class
     __native_bulk_support = True
+    # This attribute specifies whether the plugin resources are built from
+    # the database only, so that their revisions can be used as ETags
+    __native_revision_support = True
     supported_extension_aliases = ["provider", "router", "binding", "quotas"]
 
     network_view = "extension:provider_network:view"
@@ -27,8 +27,11 @@ import sys
 import time
 
 import eventlet
+from eventlet import event
+from eventlet import hubs
 import pyudev
 
+from quantum.agent.common import stats
 from quantum.agent.linux import ip_lib
 from quantum.agent.linux import utils
 from quantum.agent import rpc as agent_rpc
@@ -49,11 +52,69 @@ LOG = logging.getLogger(__name__)
 
 BRIDGE_NAME_PREFIX = "brq"
 TAP_INTERFACE_PREFIX = "tap"
+NET_FS = "/sys/class/net/"
 BRIDGE_FS = "/sys/devices/virtual/net/"
 BRIDGE_NAME_PLACEHOLDER = "bridge_name"
 BRIDGE_INTERFACES_FS = BRIDGE_FS + BRIDGE_NAME_PLACEHOLDER + "/brif/"
-DEVICE_NAME_PLACEHOLDER = "device_name"
-BRIDGE_PORT_FS_FOR_DEVICE = BRIDGE_FS + DEVICE_NAME_PLACEHOLDER + "/brport"
+
+
+class BridgeTopology(object):
+    """In-memory view of the network devices and of the quantum bridges.
+
+    The view is built in one pass over sysfs and then kept up to date by
+    the operations of the agent, so that plugging a device does not have
+    to list every bridge again.
+    """
+
+    def __init__(self, devices, bridges):
+        # names of the network devices
+        self.devices = set(devices)
+        # quantum bridge name -> names of the interfaces on it
+        self.bridges = {}
+        # interface name -> name of the quantum bridge it is on
+        self.bridge_of = {}
+        for bridge, interfaces in bridges.iteritems():
+            self.add_bridge(bridge)
+            for interface in interfaces:
+                self.add_interface(bridge, interface)
+
+    @classmethod
+    def build(cls):
+        bridges = {}
+        for bridge in os.listdir(BRIDGE_FS):
+            if not bridge.startswith(BRIDGE_NAME_PREFIX):
+                continue
+            try:
+                bridges[bridge] = os.listdir(BRIDGE_INTERFACES_FS.replace(
+                    BRIDGE_NAME_PLACEHOLDER, bridge))
+            except OSError:
+                # not a bridge, or deleted since the listing
+                pass
+        return cls(os.listdir(NET_FS), bridges)
+
+    def add_device(self, device):
+        self.devices.add(device)
+
+    def remove_device(self, device):
+        self.devices.discard(device)
+        bridge = self.bridge_of.get(device)
+        if bridge:
+            self.remove_interface(bridge, device)
+        for interface in self.bridges.pop(device, ()):
+            del self.bridge_of[interface]
+
+    def add_bridge(self, bridge):
+        self.devices.add(bridge)
+        self.bridges.setdefault(bridge, set())
+
+    def add_interface(self, bridge, interface):
+        self.bridges[bridge].add(interface)
+        self.bridge_of[interface] = bridge
+
+    def remove_interface(self, bridge, interface):
+        self.bridges.get(bridge, set()).discard(interface)
+        if self.bridge_of.get(interface) == bridge:
+            del self.bridge_of[interface]
 
 
 class LinuxBridge:
@@ -61,21 +122,53 @@ class LinuxBridge:
         self.interface_mappings = interface_mappings
         self.root_helper = root_helper
         self.ip = ip_lib.IPWrapper(self.root_helper)
+        self._topology = None
+
+    @property
+    def topology(self):
+        if self._topology is None:
+            self._topology = BridgeTopology.build()
+            LOG.debug(_("Built topology of %(devices)d devices and "
+                        "%(bridges)d bridges"),
+                      {'devices': len(self._topology.devices),
+                       'bridges': len(self._topology.bridges)})
+        return self._topology
+
+    def invalidate_topology(self):
+        """Rebuild the topology from sysfs on its next use."""
+        self._topology = None
+
+    def device_event(self, action, device):
+        """Update the topology from a udev event of a network device."""
+        if self._topology is None:
+            return
+        if action == 'add':
+            self._topology.add_device(device)
+        elif action == 'remove':
+            self._topology.remove_device(device)
 
     def device_exists(self, device):
         """Check if ethernet device exists."""
+        # devices created since the topology was built are not in it
+        if device in self.topology.devices:
+            return True
         try:
             utils.execute(['ip', 'link', 'show', 'dev', device],
                           root_helper=self.root_helper)
         except RuntimeError:
             return False
+        self.topology.add_device(device)
         return True
 
     def interface_exists_on_bridge(self, bridge, interface):
-        directory = '/sys/class/net/%s/brif' % bridge
-        for filename in os.listdir(directory):
-            if filename == interface:
-                return True
+        if self.topology.bridge_of.get(interface) != bridge:
+            return False
+        # the interface may have been deleted since it was added to the
+        # topology, e.g. the tap device of a VM which was destroyed
+        if os.path.exists(BRIDGE_INTERFACES_FS.replace(
+                BRIDGE_NAME_PLACEHOLDER, bridge) + interface):
+            return True
+        self.topology.remove_interface(bridge, interface)
         return False
 
     def get_bridge_name(self, network_id):
@@ -100,18 +193,11 @@ class LinuxBridge:
         return tap_device_name
 
     def get_all_quantum_bridges(self):
-        quantum_bridge_list = []
-        bridge_list = os.listdir(BRIDGE_FS)
-        for bridge in bridge_list:
-            if bridge.startswith(BRIDGE_NAME_PREFIX):
-                quantum_bridge_list.append(bridge)
-        return quantum_bridge_list
+        return self.topology.bridges.keys()
 
     def get_interfaces_on_bridge(self, bridge_name):
-        if self.device_exists(bridge_name):
-            bridge_interface_path = BRIDGE_INTERFACES_FS.replace(
-                BRIDGE_NAME_PLACEHOLDER, bridge_name)
-            return os.listdir(bridge_interface_path)
+        if bridge_name in self.topology.bridges:
+            return list(self.topology.bridges[bridge_name])
 
     def _get_prefixed_ip_link_devices(self, prefix):
         prefixed_devices = []
@@ -142,21 +228,16 @@ class LinuxBridge:
             return self._get_prefixed_ip_link_devices(TAP_INTERFACE_PREFIX)
 
     def get_bridge_for_tap_device(self, tap_device_name):
-        bridges = self.get_all_quantum_bridges()
-        for bridge in bridges:
-            interfaces = self.get_interfaces_on_bridge(bridge)
-            if tap_device_name in interfaces:
-                return bridge
-
-        return None
+        bridge = self.topology.bridge_of.get(tap_device_name)
+        if bridge and self.interface_exists_on_bridge(bridge,
+                                                      tap_device_name):
+            return bridge
 
     def is_device_on_bridge(self, device_name):
         if not device_name:
             return False
         else:
-            bridge_port_path = BRIDGE_PORT_FS_FOR_DEVICE.replace(
-                DEVICE_NAME_PLACEHOLDER, device_name)
-            return os.path.exists(bridge_port_path)
+            return device_name in self.topology.bridge_of
 
     def ensure_vlan_bridge(self, network_id, physical_interface, vlan_id):
         """Create a vlan and bridge unless they already exist."""
@@ -176,6 +257,9 @@ class LinuxBridge:
     def ensure_flat_bridge(self, network_id, physical_interface):
         """Create a non-vlan bridge unless it already exists."""
         bridge_name = self.get_bridge_name(network_id)
+        if self.interface_exists_on_bridge(bridge_name, physical_interface):
+            # the IP details were moved when the bridge was set up
+            return physical_interface
         ips, gateway = self.get_interface_details(physical_interface)
         self.ensure_bridge(bridge_name, physical_interface, ips, gateway)
         return physical_interface
@@ -201,6 +285,7 @@ class LinuxBridge:
             if utils.execute(['ip', 'link', 'set',
                               interface, 'up'], root_helper=self.root_helper):
                 return
+            self.topology.add_device(interface)
             LOG.debug(_("Done creating subinterface %s"), interface)
         return interface
 
@@ -237,7 +322,7 @@ class LinuxBridge:
         """
         Create a bridge unless it already exists.
         """
-        if not self.device_exists(bridge_name):
+        if bridge_name not in self.topology.bridges:
             LOG.debug(_("Starting bridge %(bridge_name)s for subinterface "
                         "%(interface)s"), locals())
             if utils.execute(['brctl', 'addbr', bridge_name],
@@ -252,6 +337,7 @@ class LinuxBridge:
             if utils.execute(['ip', 'link', 'set', bridge_name,
                               'up'], root_helper=self.root_helper):
                 return
+            self.topology.add_bridge(bridge_name)
             LOG.debug(_("Done starting bridge %(bridge_name)s for "
                         "subinterface %(interface)s"),
                       locals())
@@ -271,6 +357,7 @@ class LinuxBridge:
                 LOG.error(_("Unable to add %(interface)s to %(bridge_name)s! "
                             "Exception: %(e)s"), locals())
                 return
+            self.topology.add_interface(bridge_name, interface)
 
     def ensure_physical_in_bridge(self, network_id,
                                   physical_network,
@@ -318,6 +405,7 @@ class LinuxBridge:
             if utils.execute(['brctl', 'addif', bridge_name, tap_device_name],
                              root_helper=self.root_helper):
                 return False
+            self.topology.add_interface(bridge_name, tap_device_name)
         else:
             msg = _("%(tap_device_name)s already exists on bridge "
                     "%(bridge_name)s") % locals()
@@ -332,7 +420,7 @@ class LinuxBridge:
                                       tap_device_name)
 
     def delete_vlan_bridge(self, bridge_name):
-        if self.device_exists(bridge_name):
+        if bridge_name in self.topology.bridges:
             interfaces_on_bridge = self.get_interfaces_on_bridge(bridge_name)
             for interface in interfaces_on_bridge:
                 self.remove_interface(bridge_name, interface)
@@ -355,6 +443,7 @@ class LinuxBridge:
             if utils.execute(['brctl', 'delbr', bridge_name],
                              root_helper=self.root_helper):
                 return
+            self.topology.remove_device(bridge_name)
             LOG.debug(_("Done deleting bridge %s"), bridge_name)
 
         else:
@@ -362,14 +451,16 @@ class LinuxBridge:
                       bridge_name)
 
     def remove_interface(self, bridge_name, interface_name):
-        if self.device_exists(bridge_name):
-            if not self.is_device_on_bridge(interface_name):
+        if bridge_name in self.topology.bridges:
+            if not self.interface_exists_on_bridge(bridge_name,
+                                                   interface_name):
                 return True
             LOG.debug(_("Removing device %(interface_name)s from bridge "
                         "%(bridge_name)s"), locals())
             if utils.execute(['brctl', 'delif', bridge_name, interface_name],
                              root_helper=self.root_helper):
                 return False
+            self.topology.remove_interface(bridge_name, interface_name)
             LOG.debug(_("Done removing device %(interface_name)s from bridge "
                         "%(bridge_name)s"), locals())
             return True
@@ -387,9 +478,67 @@ class LinuxBridge:
             if utils.execute(['ip', 'link', 'delete', interface],
                              root_helper=self.root_helper):
                 return
+            self.topology.remove_device(interface)
             LOG.debug(_("Done deleting subinterface %s"), interface)
 
 
+class TapDeviceMonitor(object):
+    """Collects the udev add and remove events of the tap devices."""
+
+    def __init__(self, udev_context, device_callback=None):
+        """
+        :param device_callback: callable(action, name) called for the add
+                                and remove events of every network device
+        """
+        self.monitor = pyudev.Monitor.from_netlink(udev_context)
+        self.monitor.filter_by('net')
+        self.device_callback = device_callback
+        # tap device name -> last action, 'add' or 'remove'
+        self._events = {}
+        self._wakeup = event.Event()
+
+    def start(self):
+        self.monitor.start()
+        eventlet.spawn_n(self._run)
+
+    def _run(self):
+        while True:
+            try:
+                hubs.trampoline(self.monitor.fileno(), read=True)
+                for device in iter(lambda: self.monitor.poll(timeout=0),
+                                   None):
+                    self.handle_event(device.action, device.sys_name)
+            except Exception:
+                LOG.exception(_("Error receiving udev events"))
+                eventlet.sleep(1)
+
+    def handle_event(self, action, name):
+        if action not in ('add', 'remove'):
+            return
+        if self.device_callback:
+            self.device_callback(action, name)
+        if name.startswith(TAP_INTERFACE_PREFIX):
+            self._events[name] = action
+            if not self._wakeup.ready():
+                self._wakeup.send()
+
+    def pop_events(self):
+        """Return the events received since the last call."""
+        self._wakeup = event.Event()
+        events, self._events = self._events, {}
+        return events
+
+    def wait(self, timeout, delay):
+        """Wait up to timeout seconds for events.
+
+        Once an event is received, wait delay seconds more so that the
+        events of devices plugged together are processed as a batch.
+        """
+        with eventlet.Timeout(timeout, False):
+            self._wakeup.wait()
+            eventlet.sleep(delay)
+
+
 class LinuxBridgeRpcCallbacks(sg_rpc.SecurityGroupAgentRpcCallbackMixin):
 
     # Set RPC API version to 1.0 by default.
@@ -451,6 +600,11 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
         self.setup_linux_bridge(interface_mappings)
         self.setup_rpc(interface_mappings.values())
         self.init_firewall()
+        self.udev = pyudev.Context()
+        self.device_monitor = None
+        if cfg.CONF.AGENT.udev_events:
+            self.device_monitor = TapDeviceMonitor(
+                self.udev, self.linux_br.device_event)
 
     def setup_rpc(self, physical_interfaces):
         if physical_interfaces:
@@ -482,9 +636,6 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
         self.connection = agent_rpc.create_consumers(self.dispatcher,
                                                      self.topic,
                                                      consumers)
-        self.udev = pyudev.Context()
-        monitor = pyudev.Monitor.from_netlink(self.udev)
-        monitor.filter_by('net')
 
     def setup_linux_bridge(self, interface_mappings):
         self.linux_br = LinuxBridge(interface_mappings, self.root_helper)
@@ -504,6 +655,20 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
                 'added': added,
                 'removed': removed}
 
+    def update_devices_from_events(self, registered_devices, events):
+        added = set()
+        removed = set()
+        for device, action in events.iteritems():
+            if action == 'add' and device not in registered_devices:
+                added.add(device)
+            elif action == 'remove' and device in registered_devices:
+                removed.add(device)
+        if not added and not removed:
+            return
+        return {'current': (registered_devices - removed) | added,
+                'added': added,
+                'removed': removed}
+
     def udev_get_all_tap_devices(self):
         devices = set()
         for device in self.udev.list_devices(subsystem='net'):
@@ -531,13 +696,18 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
     def treat_devices_added(self, devices):
         resync = False
         self.prepare_devices_filter(devices)
-        for device in devices:
+        devices = list(devices)
+        try:
+            devices_details = self.plugin_rpc.get_devices_details_list(
+                self.context, devices, self.agent_id)
+        except Exception as e:
+            LOG.debug(_("Unable to get ports details for "
+                        "%(devices)s: %(e)s"), locals())
+            return True
+        for device, details in zip(devices, devices_details):
             LOG.debug(_("Port %s added"), device)
-            try:
-                details = self.plugin_rpc.get_device_details(self.context,
-                                                             device,
-                                                             self.agent_id)
-            except Exception as e:
+            if isinstance(details, Exception):
+                e = details
                 LOG.debug(_("Unable to get port details for "
                             "%(device)s: %(e)s"), locals())
                 resync = True
@@ -563,6 +733,8 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
         self.remove_devices_filter(devices)
         for device in devices:
             LOG.info(_("Attachment %s removed"), device)
+            # the device may be created again before the next rebuild
+            self.linux_br.device_event('remove', device)
             try:
                 details = self.plugin_rpc.update_device_down(self.context,
                                                              device,
@@ -581,8 +753,12 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
     def daemon_loop(self):
         sync = True
         devices = set()
+        last_scan = 0
+        last_rebuild = 0
 
         LOG.info(_("LinuxBridge Agent RPC Daemon Started!"))
+        if self.device_monitor:
+            self.device_monitor.start()
 
         while True:
             start = time.time()
@@ -590,8 +766,24 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
                 LOG.info(_("Agent out of sync with plugin!"))
                 devices.clear()
                 sync = False
-
-            device_info = self.update_devices(devices)
+                last_scan = 0
+                last_rebuild = 0
+
+            if start - last_rebuild >= cfg.CONF.AGENT.resync_interval:
+                # catch up with the changes made outside of the agent
+                self.linux_br.invalidate_topology()
+                last_rebuild = start
+
+            if (not self.device_monitor or
+                    start - last_scan >= cfg.CONF.AGENT.resync_interval):
+                # events received before the scan are reflected by it
+                if self.device_monitor:
+                    self.device_monitor.pop_events()
+                device_info = self.update_devices(devices)
+                last_scan = start
+            else:
+                device_info = self.update_devices_from_events(
+                    devices, self.device_monitor.pop_events())
 
             # notify plugin about device deltas
             if device_info:
@@ -600,11 +792,22 @@ class LinuxBridgeQuantumAgentRPC(sg_rpc.SecurityGroupAgentRpcMixin):
                 sync = self.process_network_devices(device_info)
                 devices = device_info['current']
 
-            # sleep till end of polling interval
             elapsed = (time.time() - start)
+            stats.record('agent.loop', elapsed)
+
+            if self.device_monitor and not sync:
+                # wait for events until the next full scan
+                timeout = (last_scan + cfg.CONF.AGENT.resync_interval -
+                           time.time())
+                self.device_monitor.wait(max(timeout, 0),
+                                         cfg.CONF.AGENT.udev_event_delay)
+                continue
+
+            # sleep till end of polling interval
             if (elapsed < self.polling_interval):
                 time.sleep(self.polling_interval - elapsed)
             else:
+                stats.incr('agent.loop_overruns')
                 LOG.debug(_("Loop iteration exceeded interval "
                             "(%(polling_interval)s vs. %(elapsed)s)!"),
                           {'polling_interval': self.polling_interval,
@@ -630,6 +833,7 @@ def main():
     plugin = LinuxBridgeQuantumAgentRPC(interface_mappings,
                                         polling_interval,
                                         root_helper)
+    stats.start_server()
     LOG.info(_("Agent initialized successfully, now running... "))
     plugin.daemon_loop()
     sys.exit(0)
@@ -42,6 +42,16 @@ bridge_opts = [
 agent_opts = [
     cfg.IntOpt('polling_interval', default=2),
     cfg.StrOpt('root_helper', default='sudo'),
+    cfg.BoolOpt('udev_events', default=False,
+                help="Detect tap devices from udev events instead of "
+                "polling them every polling_interval"),
+    cfg.FloatOpt('udev_event_delay', default=0.2,
+                 help="Seconds to wait for more udev events before "
+                 "processing a batch of tap devices"),
+    cfg.IntOpt('resync_interval', default=60,
+               help="Seconds between rebuilds of the bridge topology, and "
+               "between full scans of the tap devices when using udev "
+               "events"),
 ]
 
 
@@ -21,6 +21,7 @@ import quantum.db.api as db
 from quantum import manager
 from quantum.db import models_v2
 from quantum.db import securitygroups_db as sg_db
+from quantum.db import segmentation_db
 from quantum.openstack.common import log as logging
 # NOTE (e0ne): this import is needed for config init
 from quantum.plugins.linuxbridge.common import config
@@ -29,72 +30,38 @@ from quantum.plugins.linuxbridge.db import l2network_models_v2
 
 LOG = logging.getLogger(__name__)
 
+VLAN_POOL = 'lb_vlan'
+
 
 def initialize():
     db.configure_db()
 
 
 def sync_network_states(network_vlan_ranges):
-    """Synchronize network_states table with current configured VLAN ranges."""
+    """Synchronize vlan pool with current configured VLAN ranges."""
 
     session = db.get_session()
     with session.begin():
-        # get existing allocations for all physical networks
-        allocations = dict()
-        states = (session.query(l2network_models_v2.NetworkState).
-                  all())
-        for state in states:
-            if state.physical_network not in allocations:
-                allocations[state.physical_network] = set()
-            allocations[state.physical_network].add(state)
-
-        # process vlan ranges for each configured physical network
-        for physical_network, vlan_ranges in network_vlan_ranges.iteritems():
-            # determine current configured allocatable vlans for this
-            # physical network
-            vlan_ids = set()
-            for vlan_range in vlan_ranges:
-                vlan_ids |= set(xrange(vlan_range[0], vlan_range[1] + 1))
-
-            # remove from table unallocated vlans not currently allocatable
-            if physical_network in allocations:
-                for state in allocations[physical_network]:
-                    try:
-                        # see if vlan is allocatable
-                        vlan_ids.remove(state.vlan_id)
-                    except KeyError:
-                        # it's not allocatable, so check if its allocated
-                        if not state.allocated:
-                            # it's not, so remove it from table
-                            LOG.debug(_("Removing vlan %(vlan_id)s on "
-                                        "physical network %(physical_network)s"
-                                        " from pool"),
-                                      {'vlan_id': state.vlan_id,
-                                       'physical_network': physical_network})
-                            session.delete(state)
-                del allocations[physical_network]
-
-            # add missing allocatable vlans to table
-            for vlan_id in sorted(vlan_ids):
-                state = l2network_models_v2.NetworkState(physical_network,
-                                                         vlan_id)
-                session.add(state)
-
-        # remove from table unallocated vlans for any unconfigured physical
-        # networks
-        for states in allocations.itervalues():
-            for state in states:
-                if not state.allocated:
-                    LOG.debug(_("Removing vlan %(vlan_id)s on physical "
-                                "network %(physical_network)s"
-                                " from pool"),
-                              {'vlan_id': state.vlan_id,
-                               'physical_network': physical_network})
-                    session.delete(state)
+        # only allocated vlans are kept in the network_states table, free
+        # ones are tracked as ranges by the segmentation allocator
+        (session.query(l2network_models_v2.NetworkState).
+         filter_by(allocated=False).
+         delete(synchronize_session=False))
+        allocated = dict()
+        states = session.query(l2network_models_v2.NetworkState.
+                               physical_network,
+                               l2network_models_v2.NetworkState.vlan_id)
+        for physical_network, vlan_id in states:
+            allocated.setdefault(physical_network, set()).add(vlan_id)
+        segmentation_db.sync_ranges(session, VLAN_POOL, network_vlan_ranges,
+                                    allocated)
 
 
 def get_network_state(physical_network, vlan_id):
-    """Get state of specified network"""
+    """Get state of specified network
+
+    Returns None if the vlan is neither allocated nor in the pool.
+    """
 
     session = db.get_session()
     try:
@@ -104,47 +71,49 @@ def get_network_state(physical_network, vlan_id):
                  one())
         return state
     except exc.NoResultFound:
+        if segmentation_db.is_free(session, VLAN_POOL, physical_network,
+                                   vlan_id):
+            return l2network_models_v2.NetworkState(physical_network, vlan_id)
         return None
 
 
 def reserve_network(session):
     with session.begin(subtransactions=True):
-        state = (session.query(l2network_models_v2.NetworkState).
-                 filter_by(allocated=False).
-                 first())
-        if not state:
+        reserved = segmentation_db.allocate(session, VLAN_POOL)
+        if not reserved:
             raise q_exc.NoNetworkAvailable()
+        physical_network, vlan_id = reserved
         LOG.debug(_("Reserving vlan %(vlan_id)s on physical network "
-                    "%(physical_network)s from pool"),
-                  {'vlan_id': state.vlan_id,
-                   'physical_network': state.physical_network})
+                    "%(physical_network)s from pool"), locals())
+        state = l2network_models_v2.NetworkState(physical_network, vlan_id)
         state.allocated = True
-    return (state.physical_network, state.vlan_id)
+        session.add(state)
+    return (physical_network, vlan_id)
 
 
 def reserve_specific_network(session, physical_network, vlan_id):
     with session.begin(subtransactions=True):
-        try:
-            state = (session.query(l2network_models_v2.NetworkState).
-                     filter_by(physical_network=physical_network,
-                               vlan_id=vlan_id).
-                     one())
-            if state.allocated:
-                if vlan_id == constants.FLAT_VLAN_ID:
-                    raise q_exc.FlatNetworkInUse(
-                        physical_network=physical_network)
-                else:
-                    raise q_exc.VlanIdInUse(vlan_id=vlan_id,
-                                            physical_network=physical_network)
+        state = (session.query(l2network_models_v2.NetworkState).
+                 filter_by(physical_network=physical_network,
+                           vlan_id=vlan_id).
+                 first())
+        if state:
+            if vlan_id == constants.FLAT_VLAN_ID:
+                raise q_exc.FlatNetworkInUse(
+                    physical_network=physical_network)
+            else:
+                raise q_exc.VlanIdInUse(vlan_id=vlan_id,
+                                        physical_network=physical_network)
+        if segmentation_db.allocate_specific(session, VLAN_POOL,
+                                             physical_network, vlan_id):
             LOG.debug(_("Reserving specific vlan %(vlan_id)s on physical "
                         "network %(physical_network)s from pool"), locals())
-            state.allocated = True
-        except exc.NoResultFound:
+        else:
             LOG.debug(_("Reserving specific vlan %(vlan_id)s on physical "
                         "network %(physical_network)s outside pool"), locals())
-            state = l2network_models_v2.NetworkState(physical_network, vlan_id)
-            state.allocated = True
-            session.add(state)
+        state = l2network_models_v2.NetworkState(physical_network, vlan_id)
+        state.allocated = True
+        session.add(state)
 
 
 def release_network(session, physical_network, vlan_id, network_vlan_ranges):
@@ -154,20 +123,16 @@ def release_network(session, physical_network, vlan_id, network_vlan_ranges):
                      filter_by(physical_network=physical_network,
                                vlan_id=vlan_id).
                      one())
-            state.allocated = False
-            inside = False
-            for vlan_range in network_vlan_ranges.get(physical_network, []):
-                if vlan_id >= vlan_range[0] and vlan_id <= vlan_range[1]:
-                    inside = True
-                    break
-            if inside:
+            session.delete(state)
+            vlan_ranges = network_vlan_ranges.get(physical_network, [])
+            if segmentation_db.release(session, VLAN_POOL, physical_network,
+                                       vlan_id, vlan_ranges):
                 LOG.debug(_("Releasing vlan %(vlan_id)s on physical network "
                             "%(physical_network)s to pool"),
                           locals())
             else:
                 LOG.debug(_("Releasing vlan %(vlan_id)s on physical network "
                           "%(physical_network)s outside pool"), locals())
-                session.delete(state)
         except exc.NoResultFound:
             LOG.warning(_("vlan_id %(vlan_id)s on physical network "
                           "%(physical_network)s not found"), locals())
@@ -173,6 +173,9 @@ class LinuxBridgePluginV2(db_base_plugin_v2.QuantumDbPluginV2,
     # bulk operations. Name mangling is used in order to ensure it
     # is qualified by class
     __native_bulk_support = True
+    # This attribute specifies whether the plugin resources are built from
+    # the database only, so that their revisions can be used as ETags
+    __native_revision_support = True
 
     supported_extension_aliases = ["provider", "router", "binding", "quotas",
                                    "security-group"]
@@ -422,7 +425,8 @@ class LinuxBridgePluginV2(db_base_plugin_v2.QuantumDbPluginV2,
                                                                  None)
             for net in nets:
                 self._extend_network_dict_provider(context, net)
-                self._extend_network_dict_l3(context, net)
+                if not fields or 'router:external' in fields:
+                    self._extend_network_dict_l3(context, net)
 
             # TODO(rkukura): Filter on extended provider attributes.
             nets = self._filter_nets_l3(context, nets, filters)
@@ -447,8 +451,9 @@ class LinuxBridgePluginV2(db_base_plugin_v2.QuantumDbPluginV2,
         ports = super(LinuxBridgePluginV2, self).get_ports(context, filters,
                                                            fields)
         #TODO(nati) filter by security group
-        for port in ports:
-            self._extend_port_dict_security_group(context, port)
+        if not fields or ext_sg.SECURITYGROUPS in fields:
+            for port in ports:
+                self._extend_port_dict_security_group(context, port)
         return [self._fields(self._extend_port_dict_binding(context, port),
                              fields) for port in ports]
 
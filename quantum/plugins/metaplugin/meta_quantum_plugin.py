@@ -208,6 +208,7 @@ class MetaPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
         model = NetworkFlavor
         collection = collection.join(model,
                                      models_v2.Network.id == model.network_id)
+        collection = collection.add_columns(model.flavor)
         if filters:
             for key, value in filters.iteritems():
                 if key == FLAVOR_NETWORK:
@@ -216,16 +217,54 @@ class MetaPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
                     column = getattr(models_v2.Network, key, None)
                 if column:
                     collection = collection.filter(column.in_(value))
-        return [self._make_network_dict(c, fields) for c in collection.all()]
+        return [self._make_flavor_dict(self._make_network_dict(c, fields),
+                                       FLAVOR_NETWORK, flavor, fields)
+                for c, flavor in collection.all()]
 
     def get_networks(self, context, filters=None, fields=None):
-        nets = self.get_networks_with_flavor(context, filters, None)
+        nets = self.get_networks_with_flavor(context, filters,
+                                             ['id', FLAVOR_NETWORK])
         if filters:
             nets = self._filter_nets_l3(context, nets, filters)
-        nets = [self.get_network(context, net['id'], fields)
-                for net in nets]
+        nets = self._get_collection_by_flavor(context, nets, FLAVOR_NETWORK,
+                                              self._get_plugin,
+                                              'get_networks', fields)
+        if not fields or 'router:external' in fields:
+            self._extend_networks_dict_l3(context, nets)
+        if fields and not 'id' in fields:
+            for net in nets:
+                del net['id']
         return nets
 
+    def _make_flavor_dict(self, res, flavor_attr, flavor, fields=None):
+        if not fields or flavor_attr in fields:
+            res[flavor_attr] = flavor
+        return res
+
+    def _get_collection_by_flavor(self, context, resources, flavor_attr,
+                                  get_plugin, method, fields):
+        """Get the resources from their plugins, one call per flavor.
+
+        :param resources: dicts with the id and flavor of the resources, the
+                          ones returned keep their order
+        :param method: name of the plugin method getting the collection
+        """
+        ids_by_flavor = {}
+        for res in resources:
+            ids_by_flavor.setdefault(res[flavor_attr], []).append(res['id'])
+        plugin_fields = fields
+        if fields and not 'id' in fields:
+            plugin_fields = fields + ['id']
+        res_by_id = {}
+        for flavor, ids in ids_by_flavor.iteritems():
+            plugin = get_plugin(flavor)
+            for res in getattr(plugin, method)(context, filters={'id': ids},
+                                               fields=plugin_fields):
+                res_by_id[res['id']] = self._make_flavor_dict(
+                    res, flavor_attr, flavor, fields)
+        return [res_by_id[res['id']] for res in resources
+                if res['id'] in res_by_id]
+
     def _get_flavor_by_network_id(self, context, network_id):
         return meta_db_v2.get_flavor_by_network(context.session, network_id)
 
@@ -324,6 +363,7 @@ class MetaPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
         r_model = RouterFlavor
         collection = collection.join(r_model,
                                      l3_db.Router.id == r_model.router_id)
+        collection = collection.add_columns(r_model.flavor)
         if filters:
             for key, value in filters.iteritems():
                 if key == FLAVOR_ROUTER:
@@ -332,11 +372,18 @@ class MetaPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
                     column = getattr(l3_db.Router, key, None)
                 if column:
                     collection = collection.filter(column.in_(value))
-        return [self._make_router_dict(c, fields) for c in collection.all()]
+        return [self._make_flavor_dict(self._make_router_dict(c, fields),
+                                       FLAVOR_ROUTER, flavor, fields)
+                for c, flavor in collection.all()]
 
     def get_routers(self, context, filters=None, fields=None):
         routers = self.get_routers_with_flavor(context, filters,
-                                               None)
-        return [self.get_router(context, router['id'],
-                                fields)
-                for router in routers]
+                                               ['id', FLAVOR_ROUTER])
+        routers = self._get_collection_by_flavor(context, routers,
+                                                 FLAVOR_ROUTER,
+                                                 self._get_l3_plugin,
+                                                 'get_routers', fields)
+        if fields and not 'id' in fields:
+            for router in routers:
+                del router['id']
+        return routers
@@ -37,6 +37,26 @@ ofc_opts = [
     cfg.BoolOpt('use_ssl', default=False),
     cfg.StrOpt('key_file', default=None),
     cfg.StrOpt('cert_file', default=None),
+    cfg.BoolOpt('cache_ofc_ids', default=False,
+                help=_("Keep the mappings between Quantum and OFC IDs in "
+                       "memory. Only safe when a single server manages the "
+                       "OFC resources")),
+    cfg.BoolOpt('async_operations', default=False,
+                help=_("Apply operations on OFC in background workers "
+                       "instead of within the API requests")),
+    cfg.IntOpt('task_workers', default=4,
+               help=_("Number of tenants whose OFC operations are applied "
+                      "concurrently")),
+    cfg.IntOpt('task_retries', default=3,
+               help=_("Number of times a failed OFC operation is retried")),
+    cfg.IntOpt('task_retry_interval', default=2,
+               help=_("Seconds before retrying a failed OFC operation, "
+                      "doubled at each retry")),
+    cfg.IntOpt('task_poll_interval', default=10,
+               help=_("Seconds between checks for pending OFC operations")),
+    cfg.IntOpt('task_claim_timeout', default=300,
+               help=_("Seconds after which an OFC operation being applied "
+                      "by a server can be taken over by another one")),
 ]
 
 
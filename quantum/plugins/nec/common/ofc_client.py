@@ -26,6 +26,10 @@ from quantum.plugins.nec.common import exceptions as nexc
 LOG = logging.getLogger(__name__)
 
 
+# maximum number of idle keep-alive connections kept by a client
+MAX_IDLE_CONNECTIONS = 4
+
+
 class OFCClient(object):
     """A HTTP/HTTPS client for OFC Drivers"""
 
@@ -44,7 +48,8 @@ class OFCClient(object):
         self.use_ssl = use_ssl
         self.key_file = key_file
         self.cert_file = cert_file
-        self.connection = None
+        # idle connections kept open to the OFC for the next requests
+        self.connections = []
 
     def get_connection_type(self):
         """Returns the proper connection type"""
@@ -53,6 +58,41 @@ class OFCClient(object):
         else:
             return httplib.HTTPConnection
 
+    def _new_connection(self):
+        connection_type = self.get_connection_type()
+        # Open connection, handling SSL certs
+        certs = {'key_file': self.key_file, 'cert_file': self.cert_file}
+        certs = dict((x, certs[x]) for x in certs if certs[x] is not None)
+        if self.use_ssl and len(certs):
+            return connection_type(self.host, self.port, **certs)
+        else:
+            return connection_type(self.host, self.port)
+
+    def _close_idle_connections(self):
+        while self.connections:
+            self.connections.pop().close()
+
+    def _send(self, method, action, body, headers):
+        """Send a request, reusing an idle connection if possible."""
+        if self.connections:
+            conn = self.connections.pop()
+            try:
+                conn.request(method, action, body, headers)
+                return conn, conn.getresponse()
+            except (socket.error, IOError, httplib.HTTPException):
+                # the OFC may have closed the idle connections
+                LOG.debug(_("Idle connection to OFC is closed, "
+                            "reconnecting"))
+                conn.close()
+                self._close_idle_connections()
+        conn = self._new_connection()
+        try:
+            conn.request(method, action, body, headers)
+            return conn, conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+
     def do_request(self, method, action, body=None):
         LOG.debug(_("Client request: %(method)s %(action)s [%(body)s]"),
                   locals())
@@ -60,18 +100,18 @@ class OFCClient(object):
         if type(body) is dict:
             body = json.dumps(body)
         try:
-            connection_type = self.get_connection_type()
             headers = {"Content-Type": "application/json"}
-            # Open connection and send request, handling SSL certs
-            certs = {'key_file': self.key_file, 'cert_file': self.cert_file}
-            certs = dict((x, certs[x]) for x in certs if certs[x] is not None)
-            if self.use_ssl and len(certs):
-                conn = connection_type(self.host, self.port, **certs)
+            conn, res = self._send(method, action, body, headers)
+            try:
+                data = res.read()
+            except Exception:
+                conn.close()
+                raise
+            if (res.will_close or
+                    len(self.connections) >= MAX_IDLE_CONNECTIONS):
+                conn.close()
             else:
-                conn = connection_type(self.host, self.port)
-            conn.request(method, action, body, headers)
-            res = conn.getresponse()
-            data = res.read()
+                self.connections.append(conn)
             LOG.debug(_("OFC returns [%(status)s:%(data)s]"),
                       {'status': res.status,
                        'data': data})
@@ -84,7 +124,7 @@ class OFCClient(object):
             else:
                 reason = _("An operation on OFC is failed.")
                 raise nexc.OFCException(reason=reason)
-        except (socket.error, IOError), e:
+        except (socket.error, IOError, httplib.HTTPException), e:
             reason = _("Failed to connect OFC : %s") % str(e)
             LOG.error(reason)
             raise nexc.OFCException(reason=reason)
@@ -20,6 +20,7 @@ import sqlalchemy as sa
 from quantum.db import api as db
 from quantum.db import model_base
 from quantum.openstack.common import log as logging
+from quantum.openstack.common import timeutils
 # NOTE (e0ne): this import is needed for config init
 from quantum.plugins.nec.common import config
 from quantum.plugins.nec.common import exceptions as nexc
@@ -58,6 +59,11 @@ def find_ofc_item(model, quantum_id):
         return None
 
 
+def get_ofc_items(model):
+    session = db.get_session()
+    return session.query(model).all()
+
+
 def add_ofc_item(model, id, quantum_id):
     session = db.get_session()
     try:
@@ -93,6 +99,16 @@ def get_portinfo(id):
         return None
 
 
+def get_portinfos(ids):
+    """Return a dict mapping port IDs to their PortInfo."""
+    if not ids:
+        return {}
+    session = db.get_session()
+    portinfos = (session.query(nmodels.PortInfo).
+                 filter(nmodels.PortInfo.id.in_(ids)))
+    return dict((portinfo.id, portinfo) for portinfo in portinfos)
+
+
 def add_portinfo(id, datapath_id='', port_no=0, vlan_id=OFP_VLAN_NONE, mac=''):
     session = db.get_session()
     try:
@@ -117,3 +133,82 @@ def del_portinfo(id):
     except sa.orm.exc.NoResultFound:
         LOG.warning(_("del_portinfo(): NotFound portinfo for "
                       "port_id: %s"), id)
+
+
+def add_ofc_task(ordering_key, method, args, session=None):
+    """Add a task, within the transaction of session if given."""
+    session = session or db.get_session()
+    try:
+        with session.begin(subtransactions=True):
+            task = nmodels.OFCTask(ordering_key=ordering_key, method=method,
+                                   args=args, attempts=0,
+                                   next_attempt=timeutils.utcnow())
+            session.add(task)
+            session.flush()
+    except Exception as exc:
+        LOG.exception(exc)
+        raise nexc.NECDBException
+    return task
+
+
+def get_ofc_task_keys(due):
+    """Return the ordering keys of the tasks to be attempted by due."""
+    session = db.get_session()
+    query = (session.query(nmodels.OFCTask.ordering_key).
+             filter(nmodels.OFCTask.next_attempt <= due).
+             distinct())
+    return [key for key, in query]
+
+
+def get_next_ofc_task(ordering_key):
+    session = db.get_session()
+    return (session.query(nmodels.OFCTask).
+            filter_by(ordering_key=ordering_key).
+            order_by(nmodels.OFCTask.id).
+            first())
+
+
+def claim_ofc_task(id, owner, now, until):
+    """Claim a task for owner until the given time.
+
+    Returns False if the task is gone or claimed by another owner whose
+    claim has not expired.
+    """
+    session = db.get_session()
+    with session.begin(subtransactions=True):
+        count = (session.query(nmodels.OFCTask).
+                 filter(nmodels.OFCTask.id == id).
+                 filter(sa.or_(nmodels.OFCTask.owner == sa.null(),
+                               nmodels.OFCTask.owner == owner,
+                               nmodels.OFCTask.claimed_until < now)).
+                 update({'owner': owner, 'claimed_until': until},
+                        synchronize_session=False))
+    return count == 1
+
+
+def retry_ofc_task(id, next_attempt):
+    session = db.get_session()
+    with session.begin(subtransactions=True):
+        try:
+            task = (session.query(nmodels.OFCTask).
+                    filter_by(id=id).
+                    one())
+        except sa.orm.exc.NoResultFound:
+            LOG.warning(_("retry_ofc_task(): NotFound task %s"), id)
+            return
+        task.attempts += 1
+        task.next_attempt = next_attempt
+        task.owner = None
+        task.claimed_until = None
+
+
+def del_ofc_task(id):
+    session = db.get_session()
+    try:
+        task = (session.query(nmodels.OFCTask).
+                filter_by(id=id).
+                one())
+        session.delete(task)
+        session.flush()
+    except sa.orm.exc.NoResultFound:
+        LOG.warning(_("del_ofc_task(): NotFound task %s"), id)
@@ -70,3 +70,17 @@ class PacketFilter(model_base.BASEV2, models_v2.HasId, models_v2.HasTenant):
     # status
     admin_state_up = sa.Column(sa.Boolean(), nullable=False)
     status = sa.Column(sa.String(16), nullable=False)
+
+
+class OFCTask(model_base.BASEV2):
+    """Represents an operation waiting to be applied on OFC."""
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+    # tasks with the same ordering_key are applied in order of their id
+    ordering_key = sa.Column(sa.String(255), nullable=False, index=True)
+    method = sa.Column(sa.String(64), nullable=False)
+    args = sa.Column(sa.Text, nullable=False)
+    attempts = sa.Column(sa.Integer, nullable=False, default=0)
+    next_attempt = sa.Column(sa.DateTime, nullable=False)
+    # the queue applying the task, until its claim expires
+    owner = sa.Column(sa.String(36))
+    claimed_until = sa.Column(sa.DateTime)
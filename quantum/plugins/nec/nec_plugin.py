@@ -15,6 +15,9 @@
 #    under the License.
 # @author: Ryota MIBU
 
+from eventlet import semaphore
+
+from quantum.common import exceptions as q_exc
 from quantum.common import rpc as q_rpc
 from quantum.common import topics
 from quantum import context
@@ -28,6 +31,7 @@ from quantum.plugins.nec.common import exceptions as nexc
 from quantum.plugins.nec.db import api as ndb
 from quantum.plugins.nec.db import nec_plugin_base
 from quantum.plugins.nec import ofc_manager
+from quantum.plugins.nec import ofc_task_queue
 
 LOG = logging.getLogger(__name__)
 
@@ -60,9 +64,30 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
 
     supported_extension_aliases = ["router"]
 
+    # operation on OFC -> resource whose status is updated once it is applied
+    _ofc_task_resources = {'create_network': 'network',
+                           'delete_network': None,
+                           'delete_tenant': None,
+                           'create_port': 'port',
+                           'delete_port': 'port',
+                           'create_packet_filter': 'packet_filter',
+                           'delete_packet_filter': 'packet_filter'}
+
     def __init__(self):
         ndb.initialize()
         self.ofc = ofc_manager.OFCManager()
+        # serializes the creation and deletion of ofc_tenants
+        self._ofc_tenant_lock = semaphore.Semaphore()
+
+        self.ofc_tasks = None
+        if config.OFC.async_operations:
+            self.ofc_tasks = ofc_task_queue.OFCTaskQueue(
+                self._apply_ofc_task, self._fail_ofc_task,
+                workers=config.OFC.task_workers,
+                retries=config.OFC.task_retries,
+                retry_interval=config.OFC.task_retry_interval,
+                claim_timeout=config.OFC.task_claim_timeout)
+            self.ofc_tasks.start(config.OFC.task_poll_interval)
 
         self.packet_filter_enabled = (config.OFC.enable_packet_filter and
                                       self.ofc.driver.filter_supported)
@@ -87,7 +112,115 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
         obj_updater = getattr(super(NECPluginV2, self), "update_%s" % resource)
         obj_updater(context, id, request)
 
-    def activate_port_if_ready(self, context, port, network=None):
+    def _run_ofc_task(self, context, method, id, **kwargs):
+        """Apply an operation on OFC and return the new resource status.
+
+        With async_operations the resource is put in BUILD status and the
+        operation is queued, None is returned and the status is updated
+        once the operation has been applied.
+        """
+        if self.ofc_tasks:
+            # the operations of a tenant are applied one after another:
+            # they check for and create or delete its ofc_tenant
+            ordering_key = kwargs.get('tenant_id', id)
+            resource = self._ofc_task_resources[method]
+            with context.session.begin(subtransactions=True):
+                if resource:
+                    self._update_resource_status(context, resource, id,
+                                                 OperationalStatus.BUILD)
+                self.ofc_tasks.enqueue(ordering_key, method,
+                                       dict(kwargs, id=id),
+                                       session=context.session)
+            return
+        try:
+            return getattr(self, '_ofc_' + method)(id, **kwargs)
+        except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
+            reason = _("%(method)s() failed due to %(exc)s") % locals()
+            LOG.error(reason)
+            return OperationalStatus.ERROR
+
+    def _apply_ofc_task(self, method, args):
+        """Apply a queued operation and update its resource status."""
+        args = dict(args)
+        id = args.pop('id')
+        status = getattr(self, '_ofc_' + method)(id, **args)
+        self._set_ofc_task_status(method, id, status)
+
+    def _fail_ofc_task(self, method, args, exc):
+        self._set_ofc_task_status(method, args['id'],
+                                  OperationalStatus.ERROR)
+
+    def _set_ofc_task_status(self, method, id, status):
+        resource = self._ofc_task_resources[method]
+        if not resource:
+            return
+        try:
+            self._update_resource_status(context.get_admin_context(),
+                                         resource, id, status)
+        except q_exc.NotFound:
+            LOG.debug(_("%(resource)s %(id)s was deleted before %(method)s "
+                        "was applied"), locals())
+
+    # Operations on OFC, applied by _run_ofc_task(). They must be
+    # idempotent since a failed operation can be retried.
+
+    def _ofc_create_network(self, id, tenant_id, name):
+        with self._ofc_tenant_lock:
+            if not self.ofc.exists_ofc_tenant(tenant_id):
+                self.ofc.create_ofc_tenant(tenant_id)
+        if not self.ofc.exists_ofc_network(id):
+            self.ofc.create_ofc_network(tenant_id, id, name)
+        return OperationalStatus.ACTIVE
+
+    def _ofc_delete_network(self, id, tenant_id):
+        if self.ofc.exists_ofc_network(id):
+            self.ofc.delete_ofc_network(tenant_id, id)
+
+    def _ofc_delete_tenant(self, id):
+        """Delete the ofc_tenant if the tenant has no network left."""
+        with self._ofc_tenant_lock:
+            filters = dict(tenant_id=[id])
+            nets = super(NECPluginV2, self).get_networks(
+                context.get_admin_context(), filters=filters)
+            if len(nets) == 0 and self.ofc.exists_ofc_tenant(id):
+                self.ofc.delete_ofc_tenant(id)
+
+    def _ofc_create_port(self, id, tenant_id, network_id):
+        if self.ofc.exists_ofc_port(id):
+            LOG.debug(_("_ofc_create_port(): skip, "
+                        "ofc_port already exists."))
+        else:
+            self.ofc.create_ofc_port(tenant_id, network_id, id)
+        return OperationalStatus.ACTIVE
+
+    def _ofc_delete_port(self, id, tenant_id, network_id):
+        if self.ofc.exists_ofc_port(id):
+            self.ofc.delete_ofc_port(tenant_id, network_id, id)
+        else:
+            LOG.debug(_("_ofc_delete_port(): skip, ofc_port does not "
+                        "exist."))
+        return OperationalStatus.DOWN
+
+    def _ofc_create_packet_filter(self, id, tenant_id, network_id,
+                                  filter_dict):
+        if self.ofc.exists_ofc_packet_filter(id):
+            LOG.debug(_("_ofc_create_packet_filter(): skip, "
+                        "ofc_packet_filter already exists."))
+        else:
+            self.ofc.create_ofc_packet_filter(tenant_id, network_id, id,
+                                              filter_dict)
+        return OperationalStatus.ACTIVE
+
+    def _ofc_delete_packet_filter(self, id, tenant_id, network_id):
+        if self.ofc.exists_ofc_packet_filter(id):
+            self.ofc.delete_ofc_packet_filter(tenant_id, network_id, id)
+        else:
+            LOG.debug(_("_ofc_delete_packet_filter(): skip, "
+                        "ofc_packet_filter does not exist."))
+        return OperationalStatus.DOWN
+
+    def activate_port_if_ready(self, context, port, network=None,
+                               portinfos=None):
         """Activate port by creating port on OFC if ready.
 
         Activate port and packet_filters associated with the port.
@@ -95,10 +228,17 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
             * port admin_state is UP
             * network admin_state is UP
             * portinfo are available (to identify port on OFC)
+
+        When activating many ports, the caller can look up their portinfo
+        at once with ndb.get_portinfos() and pass it as portinfos.
         """
         if not network:
             network = super(NECPluginV2, self).get_network(context,
                                                            port['network_id'])
+        if portinfos is None:
+            portinfo = ndb.get_portinfo(port['id'])
+        else:
+            portinfo = portinfos.get(port['id'])
 
         port_status = OperationalStatus.ACTIVE
         if not port['admin_state_up']:
@@ -109,7 +249,7 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
             LOG.debug(_("activate_port_if_ready(): skip, "
                         "network.admin_state_up is False."))
             port_status = OperationalStatus.DOWN
-        elif not ndb.get_portinfo(port['id']):
+        elif not portinfo:
             LOG.debug(_("activate_port_if_ready(): skip, "
                         "no portinfo for this port."))
             port_status = OperationalStatus.DOWN
@@ -128,20 +268,12 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
                                                           in_port=port)
 
         if port_status in [OperationalStatus.ACTIVE]:
-            if self.ofc.exists_ofc_port(port['id']):
-                LOG.debug(_("activate_port_if_ready(): skip, "
-                            "ofc_port already exists."))
-            else:
-                try:
-                    self.ofc.create_ofc_port(port['tenant_id'],
-                                             port['network_id'],
-                                             port['id'])
-                except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-                    reason = _("create_ofc_port() failed due to %s") % exc
-                    LOG.error(reason)
-                    port_status = OperationalStatus.ERROR
-
-        if port_status is not port['status']:
+            port_status = self._run_ofc_task(context, 'create_port',
+                                             port['id'],
+                                             tenant_id=port['tenant_id'],
+                                             network_id=port['network_id'])
+
+        if port_status and port_status is not port['status']:
             self._update_resource_status(context, "port", port['id'],
                                          port_status)
 
@@ -150,21 +282,12 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
 
         Deactivate port and packet_filters associated with the port.
         """
-        port_status = OperationalStatus.DOWN
-        if self.ofc.exists_ofc_port(port['id']):
-            try:
-                self.ofc.delete_ofc_port(port['tenant_id'],
-                                         port['network_id'],
-                                         port['id'])
-            except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-                reason = _("delete_ofc_port() failed due to %s") % exc
-                LOG.error(reason)
-                port_status = OperationalStatus.ERROR
-        else:
-            LOG.debug(_("deactivate_port(): skip, ofc_port does not "
-                        "exist."))
+        port_status = self._run_ofc_task(context, 'delete_port',
+                                         port['id'],
+                                         tenant_id=port['tenant_id'],
+                                         network_id=port['network_id'])
 
-        if port_status is not port['status']:
+        if port_status and port_status is not port['status']:
             self._update_resource_status(context, "port", port['id'],
                                          port_status)
 
@@ -191,19 +314,13 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
             self._update_resource_status(context, "network", new_net['id'],
                                          OperationalStatus.BUILD)
 
-        try:
-            if not self.ofc.exists_ofc_tenant(new_net['tenant_id']):
-                self.ofc.create_ofc_tenant(new_net['tenant_id'])
-            self.ofc.create_ofc_network(new_net['tenant_id'], new_net['id'],
-                                        new_net['name'])
-        except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-            reason = _("create_network() failed due to %s") % exc
-            LOG.error(reason)
-            self._update_resource_status(context, "network", new_net['id'],
-                                         OperationalStatus.ERROR)
-        else:
+        net_status = self._run_ofc_task(context, 'create_network',
+                                        new_net['id'],
+                                        tenant_id=new_net['tenant_id'],
+                                        name=new_net['name'])
+        if net_status:
             self._update_resource_status(context, "network", new_net['id'],
-                                         OperationalStatus.ACTIVE)
+                                         net_status)
 
         return new_net
 
@@ -246,8 +363,10 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
                            admin_state_up=[True])
             ports = super(NECPluginV2, self).get_ports(context,
                                                        filters=filters)
+            portinfos = ndb.get_portinfos([port['id'] for port in ports])
             for port in ports:
-                self.activate_port_if_ready(context, port, new_net)
+                self.activate_port_if_ready(context, port, new_net,
+                                            portinfos)
             if self.packet_filter_enabled:
                 pfs = (super(NECPluginV2, self).
                        get_packet_filters(context, filters=filters))
@@ -274,14 +393,11 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
                    get_packet_filters(context, filters=filters))
 
         super(NECPluginV2, self).delete_network(context, id)
-        try:
-            self.ofc.delete_ofc_network(tenant_id, id)
-        except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-            reason = _("delete_network() failed due to %s") % exc
-            # NOTE: The OFC configuration of this network could be remained
-            #       as an orphan resource. But, it does NOT harm any other
-            #       resources, so this plugin just warns.
-            LOG.warn(reason)
+        # NOTE: If this fails, the OFC configuration of this network could
+        #       be remained as an orphan resource. But, it does NOT harm any
+        #       other resources, so this plugin just logs it.
+        self._run_ofc_task(context, 'delete_network', id,
+                           tenant_id=tenant_id)
 
         # delete all packet_filters of the network
         if self.packet_filter_enabled:
@@ -289,14 +405,7 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
                 self.delete_packet_filter(context, pf['id'])
 
         # delete unnessary ofc_tenant
-        filters = dict(tenant_id=[tenant_id])
-        nets = super(NECPluginV2, self).get_networks(context, filters=filters)
-        if len(nets) == 0:
-            try:
-                self.ofc.delete_ofc_tenant(tenant_id)
-            except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-                reason = _("delete_ofc_tenant() failed due to %s") % exc
-                LOG.warn(reason)
+        self._run_ofc_task(context, 'delete_tenant', tenant_id)
 
     def get_network(self, context, id, fields=None):
         net = super(NECPluginV2, self).get_network(context, id, None)
@@ -306,7 +415,8 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
     def get_networks(self, context, filters=None, fields=None):
         nets = super(NECPluginV2, self).get_networks(context, filters, None)
         for net in nets:
-            self._extend_network_dict_l3(context, net)
+            if not fields or 'router:external' in fields:
+                self._extend_network_dict_l3(context, net)
         nets = self._filter_nets_l3(context, nets, filters)
         return [self._fields(net, fields) for net in nets]
 
@@ -401,44 +511,23 @@ class NECPluginV2(nec_plugin_base.NECPluginV2Base, l3_db.L3_NAT_db_mixin):
             pf_status = OperationalStatus.DOWN
 
         if pf_status in [OperationalStatus.ACTIVE]:
-            if self.ofc.exists_ofc_packet_filter(packet_filter['id']):
-                LOG.debug(_("_activate_packet_filter_if_ready(): skip, "
-                            "ofc_packet_filter already exists."))
-            else:
-                try:
-                    (self.ofc.
-                     create_ofc_packet_filter(packet_filter['tenant_id'],
-                                              packet_filter['network_id'],
-                                              packet_filter['id'],
-                                              packet_filter))
-                except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-                    reason = _("create_ofc_packet_filter() failed due to "
-                               "%s") % exc
-                    LOG.error(reason)
-                    pf_status = OperationalStatus.ERROR
-
-        if pf_status is not packet_filter['status']:
+            pf_status = self._run_ofc_task(
+                context, 'create_packet_filter', packet_filter['id'],
+                tenant_id=packet_filter['tenant_id'], network_id=net_id,
+                filter_dict=packet_filter)
+
+        if pf_status and pf_status is not packet_filter['status']:
             self._update_resource_status(context, "packet_filter",
                                          packet_filter['id'], pf_status)
 
     def _deactivate_packet_filter(self, context, packet_filter):
         """Deactivate packet_filter by deleting filter from OFC if exixts."""
-        pf_status = OperationalStatus.DOWN
-        if not self.ofc.exists_ofc_packet_filter(packet_filter['id']):
-            LOG.debug(_("_deactivate_packet_filter(): skip, "
-                        "ofc_packet_filter does not exist."))
-        else:
-            try:
-                self.ofc.delete_ofc_packet_filter(packet_filter['tenant_id'],
-                                                  packet_filter['network_id'],
-                                                  packet_filter['id'])
-            except (nexc.OFCException, nexc.OFCConsistencyBroken) as exc:
-                reason = _("delete_ofc_packet_filter() failed due to "
-                           "%s") % exc
-                LOG.error(reason)
-                pf_status = OperationalStatus.ERROR
-
-        if pf_status is not packet_filter['status']:
+        pf_status = self._run_ofc_task(
+            context, 'delete_packet_filter', packet_filter['id'],
+            tenant_id=packet_filter['tenant_id'],
+            network_id=packet_filter['network_id'])
+
+        if pf_status and pf_status is not packet_filter['status']:
             self._update_resource_status(context, "packet_filter",
                                          packet_filter['id'], pf_status)
 
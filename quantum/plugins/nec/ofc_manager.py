@@ -30,6 +30,12 @@ class OFCManager(object):
     and OFC for various entities such as Tenant, Network and Filter.  A Port on
     OFC is identified by a switch ID 'datapath_id' and a port number 'port_no'
     of the switch.  An ID named as 'ofc_*' is used to identify resource on OFC.
+
+    When cache_ofc_ids is enabled, the mappings are loaded from the database
+    when the manager is created and kept in memory afterwards, so looking up a
+    known OFC ID does not query the database. Only the mappings missing from
+    the cache are looked up in the database, thus the manager must be the only
+    one deleting the mappings.
     """
     resource_map = {'ofc_tenant': nmodels.OFCTenant,
                     'ofc_network': nmodels.OFCNetwork,
@@ -38,29 +44,62 @@ class OFCManager(object):
 
     def __init__(self):
         self.driver = drivers.get_driver(config.OFC.driver)(config.OFC)
+        self._ofc_ids = None
+        if config.OFC.cache_ofc_ids:
+            self.load_ofc_ids()
+
+    def load_ofc_ids(self):
+        """Load all the mappings between Quantum and OFC IDs."""
+        ofc_ids = {}
+        for resource, model in self.resource_map.iteritems():
+            ofc_ids[resource] = dict((item.quantum_id, item.id)
+                                     for item in ndb.get_ofc_items(model))
+        # resource -> {quantum_id: ofc_id}
+        self._ofc_ids = ofc_ids
+
+    def _find_ofc_id(self, resource, quantum_id):
+        if self._ofc_ids is not None:
+            ofc_id = self._ofc_ids[resource].get(quantum_id)
+            if ofc_id:
+                return ofc_id
+        # not cached, or added by another server since the cache was loaded
+        ofc_item = ndb.find_ofc_item(self.resource_map[resource], quantum_id)
+        if not ofc_item:
+            return None
+        if self._ofc_ids is not None:
+            self._ofc_ids[resource][quantum_id] = ofc_item.id
+        return ofc_item.id
 
     def _get_ofc_id(self, resource, quantum_id):
-        model = self.resource_map[resource]
-        ofc_item = ndb.find_ofc_item(model, quantum_id)
-        if not ofc_item:
+        ofc_id = self._find_ofc_id(resource, quantum_id)
+        if not ofc_id:
             reason = _("NotFound %(resource)s for "
                        "quantum_id=%(quantum_id)s.") % locals()
             raise nexc.OFCConsistencyBroken(reason=reason)
-        return ofc_item.id
+        return ofc_id
 
     def _exists_ofc_item(self, resource, quantum_id):
-        model = self.resource_map[resource]
-        if ndb.find_ofc_item(model, quantum_id):
+        if self._find_ofc_id(resource, quantum_id):
             return True
         else:
             return False
 
+    def _add_ofc_item(self, resource, ofc_id, quantum_id):
+        ndb.add_ofc_item(self.resource_map[resource], ofc_id, quantum_id)
+        if self._ofc_ids is not None:
+            self._ofc_ids[resource][quantum_id] = ofc_id
+
+    def _del_ofc_item(self, resource, ofc_id, quantum_id):
+        ndb.del_ofc_item(self.resource_map[resource], ofc_id)
+        if self._ofc_ids is not None:
+            self._ofc_ids[resource].pop(quantum_id, None)
+
     # Tenant
 
     def create_ofc_tenant(self, tenant_id):
         desc = "ID=%s at OpenStack." % tenant_id
         ofc_tenant_id = self.driver.create_tenant(desc, tenant_id)
-        ndb.add_ofc_item(nmodels.OFCTenant, ofc_tenant_id, tenant_id)
+        self._add_ofc_item("ofc_tenant", ofc_tenant_id, tenant_id)
 
     def exists_ofc_tenant(self, tenant_id):
         return self._exists_ofc_item("ofc_tenant", tenant_id)
@@ -69,7 +108,7 @@ class OFCManager(object):
         ofc_tenant_id = self._get_ofc_id("ofc_tenant", tenant_id)
 
         self.driver.delete_tenant(ofc_tenant_id)
-        ndb.del_ofc_item(nmodels.OFCTenant, ofc_tenant_id)
+        self._del_ofc_item("ofc_tenant", ofc_tenant_id, tenant_id)
 
     # Network
 
@@ -79,7 +118,7 @@ class OFCManager(object):
         desc = "ID=%s Name=%s at Quantum." % (network_id, network_name)
         ofc_net_id = self.driver.create_network(ofc_tenant_id, desc,
                                                 network_id)
-        ndb.add_ofc_item(nmodels.OFCNetwork, ofc_net_id, network_id)
+        self._add_ofc_item("ofc_network", ofc_net_id, network_id)
 
     def update_ofc_network(self, tenant_id, network_id, network_name):
         ofc_tenant_id = self._get_ofc_id("ofc_tenant", tenant_id)
@@ -96,7 +135,7 @@ class OFCManager(object):
         ofc_net_id = self._get_ofc_id("ofc_network", network_id)
 
         self.driver.delete_network(ofc_tenant_id, ofc_net_id)
-        ndb.del_ofc_item(nmodels.OFCNetwork, ofc_net_id)
+        self._del_ofc_item("ofc_network", ofc_net_id, network_id)
 
     # Port
 
@@ -109,7 +148,7 @@ class OFCManager(object):
 
         ofc_port_id = self.driver.create_port(ofc_tenant_id, ofc_net_id,
                                               portinfo, port_id)
-        ndb.add_ofc_item(nmodels.OFCPort, ofc_port_id, port_id)
+        self._add_ofc_item("ofc_port", ofc_port_id, port_id)
 
     def exists_ofc_port(self, port_id):
         return self._exists_ofc_item("ofc_port", port_id)
@@ -120,7 +159,7 @@ class OFCManager(object):
         ofc_port_id = self._get_ofc_id("ofc_port", port_id)
 
         self.driver.delete_port(ofc_tenant_id, ofc_net_id, ofc_port_id)
-        ndb.del_ofc_item(nmodels.OFCPort, ofc_port_id)
+        self._del_ofc_item("ofc_port", ofc_port_id, port_id)
 
     # PacketFilter
 
@@ -137,7 +176,7 @@ class OFCManager(object):
 
         ofc_pf_id = self.driver.create_filter(ofc_tenant_id, ofc_net_id,
                                               filter_dict, portinfo, filter_id)
-        ndb.add_ofc_item(nmodels.OFCFilter, ofc_pf_id, filter_id)
+        self._add_ofc_item("ofc_packet_filter", ofc_pf_id, filter_id)
 
     def exists_ofc_packet_filter(self, filter_id):
         return self._exists_ofc_item("ofc_packet_filter", filter_id)
@@ -148,4 +187,4 @@ class OFCManager(object):
         ofc_pf_id = self._get_ofc_id("ofc_packet_filter", filter_id)
 
         res = self.driver.delete_filter(ofc_tenant_id, ofc_net_id, ofc_pf_id)
-        ndb.del_ofc_item(nmodels.OFCFilter, ofc_pf_id)
+        self._del_ofc_item("ofc_packet_filter", ofc_pf_id, filter_id)
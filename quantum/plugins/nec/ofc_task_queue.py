@@ -0,0 +1,155 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2013 NEC Corporation.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import eventlet
+from eventlet import event
+
+from quantum.openstack.common import jsonutils
+from quantum.openstack.common import log as logging
+from quantum.openstack.common import timeutils
+from quantum.openstack.common import uuidutils
+from quantum.plugins.nec.db import api as ndb
+
+
+LOG = logging.getLogger(__name__)
+
+
+class OFCTaskQueue(object):
+    """Persistent queue of operations applied on OFC by background workers.
+
+    Tasks are stored in the database, so the pending ones are resumed when
+    the server restarts. Tasks sharing an ordering key are applied one after
+    another in the order they were queued, tasks with different keys are
+    applied concurrently. A failed task is retried with an exponential
+    backoff before giving up, and the following tasks with the same key
+    wait for it.
+
+    Several servers can share the queue: a task is claimed in the database
+    before being applied, and is only taken over by another server once the
+    claim has expired.
+    """
+
+    def __init__(self, apply_task, fail_task, workers=4, retries=3,
+                 retry_interval=2, claim_timeout=300):
+        """
+        :param apply_task: callable(method, args) applying a task, raising
+                           an exception if it failed
+        :param fail_task: callable(method, args, exc) called when a task
+                          failed after all the retries
+        """
+        self.apply_task = apply_task
+        self.fail_task = fail_task
+        self.retries = retries
+        self.retry_interval = retry_interval
+        self.claim_timeout = claim_timeout
+        self.owner = uuidutils.generate_uuid()
+        self.pool = eventlet.GreenPool(workers)
+        # ordering keys whose tasks are being applied by a worker
+        self._busy = set()
+        self._wakeup = event.Event()
+        self._thread = None
+
+    def enqueue(self, ordering_key, method, args, session=None):
+        """Queue a task, within the transaction of session if given."""
+        ndb.add_ofc_task(ordering_key, method, jsonutils.dumps(args),
+                         session=session)
+        self._notify()
+
+    def start(self, poll_interval):
+        self._thread = eventlet.spawn(self._run, poll_interval)
+
+    def stop(self):
+        if self._thread:
+            self._thread.kill()
+            self._thread = None
+
+    def wait(self):
+        """Wait for the running workers, used by unit tests."""
+        self.pool.waitall()
+
+    def _notify(self):
+        if not self._wakeup.ready():
+            self._wakeup.send()
+
+    def _run(self, poll_interval):
+        while True:
+            try:
+                self.dispatch()
+            except Exception:
+                LOG.exception(_("Unable to dispatch OFC tasks"))
+            with eventlet.Timeout(poll_interval, False):
+                self._wakeup.wait()
+            self._wakeup = event.Event()
+
+    def dispatch(self):
+        """Start a worker for each ordering key with tasks to attempt."""
+        for key in ndb.get_ofc_task_keys(timeutils.utcnow()):
+            if key not in self._busy:
+                self._busy.add(key)
+                self.pool.spawn_n(self._process, key)
+
+    def _process(self, ordering_key):
+        try:
+            while True:
+                task = ndb.get_next_ofc_task(ordering_key)
+                now = timeutils.utcnow()
+                if not task or task.next_attempt > now:
+                    break
+                until = now + datetime.timedelta(seconds=self.claim_timeout)
+                if not ndb.claim_ofc_task(task.id, self.owner, now, until):
+                    # being applied by another server
+                    break
+                if not self._apply(task):
+                    break
+        except Exception:
+            LOG.exception(_("Unable to process OFC tasks of %s"),
+                          ordering_key)
+        finally:
+            self._busy.discard(ordering_key)
+            # tasks may have been queued while this key was busy
+            self._notify()
+
+    def _apply(self, task):
+        """Apply a task, returning False if it has to be retried later."""
+        args = dict((str(k), v)
+                    for k, v in jsonutils.loads(task.args).iteritems())
+        try:
+            self.apply_task(task.method, args)
+        except Exception as exc:
+            if task.attempts < self.retries:
+                delay = self.retry_interval * 2 ** task.attempts
+                LOG.warn(_("OFC task %(method)s of %(key)s failed, retrying "
+                           "in %(delay)d seconds: %(exc)s"),
+                         {'method': task.method, 'key': task.ordering_key,
+                          'delay': delay, 'exc': exc})
+                next_attempt = (timeutils.utcnow() +
+                                datetime.timedelta(seconds=delay))
+                ndb.retry_ofc_task(task.id, next_attempt)
+                eventlet.spawn_after(delay, self._notify)
+                return False
+            LOG.error(_("OFC task %(method)s of %(key)s failed after "
+                        "%(attempts)d attempts: %(exc)s"),
+                      {'method': task.method, 'key': task.ordering_key,
+                       'attempts': task.attempts + 1, 'exc': exc})
+            try:
+                self.fail_task(task.method, args, exc)
+            except Exception:
+                LOG.exception(_("Unable to handle the failure of OFC task "
+                                "%s"), task.method)
+        ndb.del_ofc_task(task.id)
+        return True
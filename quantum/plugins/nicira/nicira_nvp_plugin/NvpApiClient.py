@@ -37,14 +37,16 @@ class NVPApiHelper(client_eventlet.NvpApiClientEventlet):
 
     def __init__(self, api_providers, user, password, request_timeout,
                  http_timeout, retries, redirects,
-                 concurrent_connections=3, nvp_gen_timeout=-1):
+                 concurrent_connections=3, nvp_gen_timeout=-1,
+                 provider_connections=None):
         '''Constructor.
 
         :param api_providers: a list of tuples in the form:
             (host, port, is_ssl=True). Passed on to NvpClientEventlet.
         :param user: the login username.
         :param password: the login password.
-        :param concurrent_connections: the number of concurrent connections.
+        :param concurrent_connections: the number of concurrent connections
+            to each controller.
         :param request_timeout: all operations (including retries, redirects
             from unresponsive controllers, etc) should finish within this
             timeout.
@@ -53,10 +55,12 @@ class NVPApiHelper(client_eventlet.NvpApiClientEventlet):
             controller in the cluster)
         :param retries: the number of concurrent connections.
         :param redirects: the number of concurrent connections.
+        :param provider_connections: dict overriding concurrent_connections
+            for some controllers, keyed by (host, port, is_ssl) tuples.
         '''
         client_eventlet.NvpApiClientEventlet.__init__(
             self, api_providers, user, password, concurrent_connections,
-            nvp_gen_timeout)
+            nvp_gen_timeout, provider_connections=provider_connections)
 
         self._request_timeout = request_timeout
         self._http_timeout = http_timeout
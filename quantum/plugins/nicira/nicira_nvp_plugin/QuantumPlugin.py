@@ -47,6 +47,7 @@ from quantum.plugins.nicira.nicira_nvp_plugin import nicira_db
 from quantum.plugins.nicira.nicira_nvp_plugin import NvpApiClient
 from quantum.plugins.nicira.nicira_nvp_plugin import nvplib
 from quantum.plugins.nicira.nicira_nvp_plugin import nvp_cluster
+from quantum.plugins.nicira.nicira_nvp_plugin import nvp_status_cache
 from quantum.plugins.nicira.nicira_nvp_plugin.nvp_plugin_version import (
     PLUGIN_VERSION)
 
@@ -130,9 +131,14 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
             for controller_connection in c_opts['nvp_controller_connection']:
                 args = controller_connection.split(':')
                 try:
+                    # optional number of connections to this controller
+                    connections = None
+                    if len(args) > 8:
+                        connections = args.pop(8)
                     args.extend([c_opts['default_tz_uuid'],
                                  c_opts['nvp_cluster_uuid'],
-                                 c_opts['nova_zone_id']])
+                                 c_opts['nova_zone_id'],
+                                 connections])
                     cluster.add_controller(*args)
                 except Exception:
                     LOG.exception(_("Invalid connection parameters for "
@@ -144,6 +150,9 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
 
             api_providers = [(x['ip'], x['port'], True)
                              for x in cluster.controllers]
+            provider_connections = dict(
+                ((x['ip'], x['port'], True), x['concurrent_connections'])
+                for x in cluster.controllers if x['concurrent_connections'])
             cluster.api_client = NvpApiClient.NVPApiHelper(
                 api_providers, cluster.user, cluster.password,
                 request_timeout=cluster.request_timeout,
@@ -151,7 +160,8 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
                 retries=cluster.retries,
                 redirects=cluster.redirects,
                 concurrent_connections=self.nvp_opts['concurrent_connections'],
-                nvp_gen_timeout=self.nvp_opts['nvp_gen_timeout'])
+                nvp_gen_timeout=self.nvp_opts['nvp_gen_timeout'],
+                provider_connections=provider_connections)
 
             if len(self.clusters) == 0:
                 first_cluster = cluster
@@ -177,6 +187,12 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
         self._extend_fault_map()
         # Set up RPC interface for DHCP agent
         self.setup_rpc()
+        # Serve the fabric status of list operations from a cache
+        self.status_cache = None
+        if self.nvp_opts.status_cache_interval > 0:
+            self.status_cache = nvp_status_cache.NvpStatusCache(
+                self.clusters.values())
+            self.status_cache.start(self.nvp_opts.status_cache_interval)
 
     def _extend_fault_map(self):
         """ Extends the Quantum Fault Map
@@ -435,13 +451,22 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
         return self._fields(net_result, fields)
 
     def get_networks(self, context, filters=None, fields=None):
-        nvp_lswitches = []
         with context.session.begin(subtransactions=True):
             quantum_lswitches = (
                 super(NvpPluginV2, self).get_networks(context, filters))
             for net in quantum_lswitches:
                 self._extend_network_dict_provider(context, net)
 
+        if self.status_cache:
+            for quantum_lswitch in quantum_lswitches:
+                status = self.status_cache.get_network_status(
+                    quantum_lswitch['id'])
+                if status is not None:
+                    quantum_lswitch["status"] = (
+                        status and constants.NET_STATUS_ACTIVE or
+                        constants.NET_STATUS_DOWN)
+            return self._fields_list(quantum_lswitches, fields)
+
         if context.is_admin and not filters.get("tenant_id"):
             tenant_filter = ""
         elif filters.get("tenant_id"):
@@ -456,39 +481,31 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
             "/ws.v1/lswitch?fields=%s&relations=LogicalSwitchStatus%s"
             % (lswitch_filters, tenant_filter))
         try:
-            for c in self.clusters.itervalues():
-                res = nvplib.get_all_query_pages(
-                    lswitch_url_path, c)
-
-                nvp_lswitches.extend(res)
+            res = nvplib.get_all_query_pages_multi(
+                lswitch_url_path, self.clusters.itervalues())
         except Exception:
             err_msg = _("Unable to get logical switches")
             LOG.exception(err_msg)
             raise nvp_exc.NvpPluginException(err_msg=err_msg)
 
-        # TODO (Aaron) This can be optimized
+        nvp_lswitches = dict((nvp_lswitch['uuid'], nvp_lswitch)
+                             for nvp_lswitch in res)
         if filters.get("id"):
-            filtered_lswitches = []
-            for nvp_lswitch in nvp_lswitches:
-                for id in filters.get("id"):
-                    if id == nvp_lswitch['uuid']:
-                        filtered_lswitches.append(nvp_lswitch)
-            nvp_lswitches = filtered_lswitches
+            ids = set(filters["id"])
+            nvp_lswitches = dict((uuid, nvp_lswitch) for uuid, nvp_lswitch
+                                 in nvp_lswitches.iteritems() if uuid in ids)
 
         for quantum_lswitch in quantum_lswitches:
-            for nvp_lswitch in nvp_lswitches:
-                # TODO(salvatore-orlando): watch out for "extended" lswitches
-                if nvp_lswitch['uuid'] == quantum_lswitch["id"]:
-                    if (nvp_lswitch["_relations"]["LogicalSwitchStatus"]
-                            ["fabric_status"]):
-                        quantum_lswitch["status"] = constants.NET_STATUS_ACTIVE
-                    else:
-                        quantum_lswitch["status"] = constants.NET_STATUS_DOWN
-                    quantum_lswitch["name"] = nvp_lswitch["display_name"]
-                    nvp_lswitches.remove(nvp_lswitch)
-                    break
-            else:
+            # TODO(salvatore-orlando): watch out for "extended" lswitches
+            nvp_lswitch = nvp_lswitches.pop(quantum_lswitch["id"], None)
+            if not nvp_lswitch:
                 raise nvp_exc.NvpOutOfSyncException()
+            if (nvp_lswitch["_relations"]["LogicalSwitchStatus"]
+                    ["fabric_status"]):
+                quantum_lswitch["status"] = constants.NET_STATUS_ACTIVE
+            else:
+                quantum_lswitch["status"] = constants.NET_STATUS_DOWN
+            quantum_lswitch["name"] = nvp_lswitch["display_name"]
         # do not make the case in which switches are found in NVP
         # but not in Quantum catastrophic.
         if len(nvp_lswitches):
@@ -499,16 +516,18 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
         LOG.debug(_("get_networks() completed for tenant %s"),
                   context.tenant_id)
 
+        return self._fields_list(quantum_lswitches, fields)
+
+    def _fields_list(self, resources, fields):
         if fields:
             ret_fields = []
-            for quantum_lswitch in quantum_lswitches:
+            for resource in resources:
                 row = {}
                 for field in fields:
-                    row[field] = quantum_lswitch[field]
+                    row[field] = resource[field]
                 ret_fields.append(row)
             return ret_fields
-
-        return quantum_lswitches
+        return resources
 
     def update_network(self, context, id, network):
         if network["network"].get("admin_state_up"):
@@ -520,6 +539,16 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
 
     def get_ports(self, context, filters=None, fields=None):
         quantum_lports = super(NvpPluginV2, self).get_ports(context, filters)
+        if self.status_cache:
+            for quantum_lport in quantum_lports:
+                status = self.status_cache.get_port_status(
+                    quantum_lport['id'])
+                if status is not None:
+                    quantum_lport["status"] = (
+                        status and constants.PORT_STATUS_ACTIVE or
+                        constants.PORT_STATUS_DOWN)
+            return self._fields_list(quantum_lports, fields)
+
         vm_filter = ""
         tenant_filter = ""
         # This is used when calling delete_network. Quantum checks to see if
@@ -546,20 +575,17 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
 
         lport_fields_str = ("tags,admin_status_enabled,display_name,"
                             "fabric_status_up")
+        lport_query_path = (
+            "/ws.v1/lswitch/%s/lport?fields=%s&%s%stag_scope=q_port_id"
+            "&relations=LogicalPortStatus" %
+            (lswitch, lport_fields_str, vm_filter, tenant_filter))
         try:
-            for c in self.clusters.itervalues():
-                lport_query_path = (
-                    "/ws.v1/lswitch/%s/lport?fields=%s&%s%stag_scope=q_port_id"
-                    "&relations=LogicalPortStatus" %
-                    (lswitch, lport_fields_str, vm_filter, tenant_filter))
-
-                ports = nvplib.get_all_query_pages(lport_query_path, c)
-                if ports:
-                    for port in ports:
-                        for tag in port["tags"]:
-                            if tag["scope"] == "q_port_id":
-                                nvp_lports[tag["tag"]] = port
-
+            ports = nvplib.get_all_query_pages_multi(
+                lport_query_path, self.clusters.itervalues())
+            for port in ports:
+                for tag in port["tags"]:
+                    if tag["scope"] == "q_port_id":
+                        nvp_lports[tag["tag"]] = port
         except Exception:
             err_msg = _("Unable to get ports")
             LOG.exception(err_msg)
@@ -596,15 +622,7 @@ class NvpPluginV2(db_base_plugin_v2.QuantumDbPluginV2):
                           "to Quantum ports. Quantum and NVP are "
                           "potentially out of sync"), len(nvp_lports))
 
-        if fields:
-            ret_fields = []
-            for lport in lports:
-                row = {}
-                for field in fields:
-                    row[field] = lport[field]
-                ret_fields.append(row)
-            return ret_fields
-        return lports
+        return self._fields_list(lports, fields)
 
     def create_port(self, context, port):
         with context.session.begin(subtransactions=True):
@@ -35,6 +35,12 @@ LOG = logging.getLogger(__name__)
 GENERATION_ID_TIMEOUT = -1
 DEFAULT_CONCURRENT_CONNECTIONS = 3
 DEFAULT_CONNECT_TIMEOUT = 5
+# Priority of connections put at the back of the pool after a failure,
+# connections which completed a request get their provider latency in
+# seconds as priority and are therefore always picked first.
+DEMOTED_CONN_PRIORITY = 1000
+# Weight of the last request in the provider latency moving average
+LATENCY_EWMA_WEIGHT = 0.2
 
 
 class NvpApiClient(object):
@@ -60,6 +66,54 @@ class NvpApiClient(object):
         is_ssl = isinstance(http_conn, httplib.HTTPSConnection)
         return (http_conn.host, http_conn.port, is_ssl)
 
+    def _provider_connections(self, provider):
+        """Return the size of the connection pool of a provider."""
+        return self._api_provider_connections.get(
+            self._normalize_conn_params(provider),
+            self._concurrent_connections)
+
+    def _provider_stats(self, conn_or_conn_params):
+        provider = self._normalize_conn_params(conn_or_conn_params)
+        stats = self._api_provider_stats.get(provider)
+        if stats is None:
+            stats = {'requests': 0, 'errors': 0, 'latency': None,
+                     'max_latency': 0.0}
+            self._api_provider_stats[provider] = stats
+        return stats
+
+    def record_request(self, conn, elapsed, error=False):
+        """Update the latency statistics of the provider of conn."""
+        stats = self._provider_stats(conn)
+        stats['requests'] += 1
+        if error:
+            stats['errors'] += 1
+            return
+        if stats['latency'] is None:
+            stats['latency'] = elapsed
+        else:
+            stats['latency'] += LATENCY_EWMA_WEIGHT * (elapsed -
+                                                       stats['latency'])
+        stats['max_latency'] = max(stats['max_latency'], elapsed)
+
+    def _record_pool_wait(self, elapsed):
+        self._pool_wait_stats['count'] += 1
+        self._pool_wait_stats['total'] += elapsed
+        self._pool_wait_stats['max'] = max(self._pool_wait_stats['max'],
+                                           elapsed)
+
+    def get_stats(self):
+        """Return connection pool wait and per provider latency metrics."""
+        providers = {}
+        for provider, stats in self._api_provider_stats.iteritems():
+            host, port, is_ssl = provider
+            name = "%s://%s:%s" % (is_ssl and "https" or "http", host, port)
+            providers[name] = dict(stats,
+                                   connections=self._provider_connections(
+                                       provider))
+        return {'pool_wait': dict(self._pool_wait_stats),
+                'available_connections': self._conn_pool.qsize(),
+                'providers': providers}
+
     @property
     def user(self):
         return self._user
@@ -117,8 +171,10 @@ class NvpApiClient(object):
             return None
         if self._conn_pool.empty():
             LOG.debug(_("[%d] Waiting to acquire API client connection."), rid)
+        wait_start = time.time()
         priority, conn = self._conn_pool.get()
         now = time.time()
+        self._record_pool_wait(now - wait_start)
         if getattr(conn, 'last_used', now) < now - self.CONN_IDLE_TIMEOUT:
             LOG.info(_("[%(rid)d] Connection %(conn)s idle for %(sec)0.2f "
                        "seconds; reconnecting."),
@@ -180,7 +236,10 @@ class NvpApiClient(object):
             priority = self._next_conn_priority
             self._next_conn_priority += 1
         else:
-            priority = http_conn.priority
+            # favour the providers answering faster
+            priority = self._provider_stats(http_conn)['latency']
+            if priority is None:
+                priority = http_conn.priority
 
         self._conn_pool.put((priority, http_conn))
         LOG.debug(_("[%(rid)d] Released connection %(conn)s. %(qsize)d "
@@ -271,11 +330,11 @@ class NvpApiClient(object):
             for p in to_subtract:
                 self._set_provider_data(p, None)
             to_add = new_providers - self._api_providers
-            for unused_i in range(self._concurrent_connections):
-                for host, port, is_ssl in to_add:
+            for host, port, is_ssl in to_add:
+                for unused_i in range(self._provider_connections(
+                        (host, port, is_ssl))):
                     conn = self._create_connection(host, port, is_ssl)
-                    new_conns.append((self._next_conn_priority, conn))
-                    self._next_conn_priority += 1
+                    new_conns.append((0, conn))
 
             for priority, conn in new_conns:
                 self._conn_pool.put((priority, conn))
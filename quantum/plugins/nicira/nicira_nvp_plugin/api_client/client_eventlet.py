@@ -38,18 +38,22 @@ class NvpApiClientEventlet(client.NvpApiClient):
     def __init__(self, api_providers, user, password,
                  concurrent_connections=client.DEFAULT_CONCURRENT_CONNECTIONS,
                  nvp_gen_timeout=client.GENERATION_ID_TIMEOUT, use_https=True,
-                 connect_timeout=client.DEFAULT_CONNECT_TIMEOUT):
+                 connect_timeout=client.DEFAULT_CONNECT_TIMEOUT,
+                 provider_connections=None):
         '''Constructor
 
         :param api_providers: a list of tuples of the form: (host, port,
             is_ssl).
         :param user: login username.
         :param password: login password.
-        :param concurrent_connections: total number of concurrent connections.
+        :param concurrent_connections: number of concurrent connections to
+            each API provider.
         :param use_https: whether or not to use https for requests.
         :param connect_timeout: connection timeout in seconds.
         :param nvp_gen_timeout controls how long the generation id is kept
             if set to -1 the generation id is never timed out
+        :param provider_connections: dict overriding concurrent_connections
+            for some API providers, keyed by (host, port, is_ssl) tuples.
         '''
         if not api_providers:
             api_providers = []
@@ -65,15 +69,22 @@ class NvpApiClientEventlet(client.NvpApiClient):
         self._nvp_config_gen = None
         self._nvp_config_gen_ts = None
         self._nvp_gen_timeout = nvp_gen_timeout
-
-        # Connection pool is a list of queues.
+        self._api_provider_connections = dict(
+            (self._normalize_conn_params(tuple(p)), n)
+            for p, n in (provider_connections or {}).iteritems())
+        self._api_provider_stats = {}
+        self._pool_wait_stats = {'count': 0, 'total': 0.0, 'max': 0.0}
+
+        # Connection pool is a priority queue shared by all the providers.
+        # Connections to providers with no latency measurement yet come
+        # first, then connections are ordered by the latency of their
+        # provider, failed connections being put at the back.
         self._conn_pool = eventlet.queue.PriorityQueue()
-        self._next_conn_priority = 1
+        self._next_conn_priority = client.DEMOTED_CONN_PRIORITY
         for host, port, is_ssl in api_providers:
-            for i in range(concurrent_connections):
+            for i in range(self._provider_connections((host, port, is_ssl))):
                 conn = self._create_connection(host, port, is_ssl)
-                self._conn_pool.put((self._next_conn_priority, conn))
-                self._next_conn_priority += 1
+                self._conn_pool.put((0, conn))
 
     def acquire_redirect_connection(self, conn_params, auto_login=True,
                                     headers=None):
@@ -124,10 +135,11 @@ class NvpApiClientEventlet(client.NvpApiClient):
             # redirects occur during cluster upgrades, i.e. results to old
             # redirects to new, so give redirect targets highest priority
             priority = 0
-            for i in range(self._concurrent_connections):
+            connections = self._provider_connections(conn_params)
+            for i in range(connections):
                 conn = self._create_connection(*conn_params)
                 conn.priority = priority
-                if i == self._concurrent_connections - 1:
+                if i == connections - 1:
                     break
                 self._conn_pool.put((priority, conn))
             result_conn = conn
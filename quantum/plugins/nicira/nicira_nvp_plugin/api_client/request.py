@@ -97,6 +97,7 @@ class NvpApiRequest(object):
         issued_time = time.time()
         is_conn_error = False
         is_conn_service_unavail = False
+        recorded_conn = None
         try:
             redirects = 0
             while (redirects <= self._redirects):
@@ -119,6 +120,7 @@ class NvpApiRequest(object):
                     headers["X-Nvp-Wait-For-Config-Generation"] = gen
                     LOG.debug(_("Setting X-Nvp-Wait-For-Config-Generation "
                                 "request header: '%s'"), gen)
+                sent_time = time.time()
                 try:
                     conn.request(self._method, url, self._body, headers)
                 except Exception as e:
@@ -129,6 +131,11 @@ class NvpApiRequest(object):
                 response = conn.getresponse()
                 response.body = response.read()
                 response.headers = response.getheaders()
+                if response.status < 500:
+                    # server errors are recorded once, as errors, below
+                    self._api_client.record_request(conn,
+                                                    time.time() - sent_time)
+                    recorded_conn = conn
                 LOG.debug(_("[%(rid)d] Completed request '%(conn)s': "
                             "%(status)s (%(sec)0.2f seconds)"),
                           {'rid': self._rid(),
@@ -205,6 +212,9 @@ class NvpApiRequest(object):
                       'msg': msg, 'sec': time.time() - issued_time})
             self._request_error = e
             is_conn_error = True
+            if recorded_conn is not conn:
+                self._api_client.record_request(
+                    conn, time.time() - issued_time, error=True)
             return e
         finally:
             # Make sure we release the original connection provided by the
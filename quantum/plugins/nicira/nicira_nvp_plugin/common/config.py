@@ -22,7 +22,8 @@ nvp_opts = [
     cfg.IntOpt('max_lp_per_overlay_ls', default=256),
     cfg.IntOpt('concurrent_connections', default=5),
     cfg.IntOpt('nvp_gen_timeout', default=-1),
-    cfg.StrOpt('default_cluster_name')
+    cfg.StrOpt('default_cluster_name'),
+    cfg.IntOpt('status_cache_interval', default=0)
 ]
 
 cluster_opts = [
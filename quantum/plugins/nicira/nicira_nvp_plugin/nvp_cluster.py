@@ -46,7 +46,8 @@ class NVPCluster(object):
 
     def add_controller(self, ip, port, user, password, request_timeout,
                        http_timeout, retries, redirects,
-                       default_tz_uuid, uuid=None, zone=None):
+                       default_tz_uuid, uuid=None, zone=None,
+                       concurrent_connections=None):
         """Add a new set of controller parameters.
 
         :param ip: IP address of controller.
@@ -61,6 +62,8 @@ class NVPCluster(object):
         :param default_tz_uuid: default transport zone uuid.
         :param uuid: UUID of this cluster (used in MDI configs).
         :param zone: Zone of this cluster (used in MDI configs).
+        :param concurrent_connections: number of connections to this
+            controller, overriding the concurrent_connections option.
         """
 
         keys = [
@@ -71,6 +74,8 @@ class NVPCluster(object):
             'port', 'request_timeout', 'http_timeout', 'retries', 'redirects']
         for k in int_keys:
             controller_dict[k] = int(locals()[k])
+        controller_dict['concurrent_connections'] = (
+            concurrent_connections and int(concurrent_connections))
 
         self.controllers.append(controller_dict)
 
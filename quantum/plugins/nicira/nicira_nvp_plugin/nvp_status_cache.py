@@ -0,0 +1,98 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 Nicira, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+
+from quantum.openstack.common import loopingcall
+from quantum.plugins.nicira.nicira_nvp_plugin import nvplib
+
+
+LOG = logging.getLogger(__name__)
+
+LSWITCH_QUERY_PATH = ("/ws.v1/lswitch?fields=uuid,tags"
+                      "&relations=LogicalSwitchStatus")
+LPORT_QUERY_PATH = ("/ws.v1/lswitch/*/lport?fields=tags&tag_scope=q_port_id"
+                    "&relations=LogicalPortStatus")
+
+
+def _get_tag(resource, scope):
+    for tag in resource.get('tags', []):
+        if tag['scope'] == scope:
+            return tag['tag']
+
+
+class NvpStatusCache(object):
+    """Fabric status of the NVP logical switches and ports.
+
+    The cache is refreshed in the background by querying all the clusters,
+    so that list operations can be served without contacting NVP.
+    Networks and ports created after the last refresh are not in the cache.
+    """
+
+    def __init__(self, clusters):
+        self.clusters = clusters
+        # quantum network id -> fabric status of all its lswitches
+        self._networks = {}
+        # quantum port id -> fabric status of its lport
+        self._ports = {}
+        self._timer = None
+
+    def start(self, interval):
+        self._timer = loopingcall.LoopingCall(self.refresh)
+        self._timer.start(interval=interval)
+
+    def stop(self):
+        if self._timer:
+            self._timer.stop()
+            self._timer = None
+
+    def refresh(self):
+        try:
+            lswitches = nvplib.get_all_query_pages_multi(LSWITCH_QUERY_PATH,
+                                                         self.clusters)
+            lports = nvplib.get_all_query_pages_multi(LPORT_QUERY_PATH,
+                                                      self.clusters)
+        except Exception:
+            LOG.exception(_("Unable to refresh the NVP status cache"))
+            return
+
+        networks = {}
+        for lswitch in lswitches:
+            # extra lswitches of a network are tagged with its id
+            net_id = _get_tag(lswitch, 'quantum_net_id') or lswitch['uuid']
+            status = (lswitch['_relations']['LogicalSwitchStatus']
+                      ['fabric_status'])
+            networks[net_id] = networks.get(net_id, True) and status
+        ports = {}
+        for lport in lports:
+            port_id = _get_tag(lport, 'q_port_id')
+            if port_id:
+                ports[port_id] = (lport['_relations']['LogicalPortStatus']
+                                  ['fabric_status_up'])
+        self._networks = networks
+        self._ports = ports
+        LOG.debug(_("NVP status cache refreshed: %(nets)d networks, "
+                    "%(ports)d ports"),
+                  {'nets': len(networks), 'ports': len(ports)})
+
+    def get_network_status(self, network_id):
+        """Return the fabric status of a network, or None if unknown."""
+        return self._networks.get(network_id)
+
+    def get_port_status(self, port_id):
+        """Return the fabric status of a port, or None if unknown."""
+        return self._ports.get(port_id)
@@ -26,6 +26,8 @@ import itertools
 import json
 import logging
 
+import eventlet
+
 #FIXME(danwent): I'd like this file to get to the point where it has
 # no quantum-specific logic in it
 from quantum.common import constants
@@ -43,6 +45,8 @@ URI_PREFIX = "/ws.v1"
 # Resources exposed by NVP API
 LSWITCH_RESOURCE = "lswitch"
 LPORT_RESOURCE = "lport"
+# Maximum number of concurrent calls of a batch
+BATCH_POOL_SIZE = 10
 
 LOCAL_LOGGING = False
 if LOCAL_LOGGING:
@@ -142,6 +146,21 @@ def get_all_query_pages(path, c):
     return result_list
 
 
+def get_all_query_pages_multi(path, clusters):
+    """Fetch all the pages of a query from several clusters concurrently.
+
+    Pages of the same cluster are still fetched in order, as each request
+    needs the page cursor returned by the previous one.
+    """
+    clusters = list(clusters)
+    pool = eventlet.GreenPool(max(len(clusters), 1))
+    result_list = []
+    for results in pool.imap(get_all_query_pages,
+                             itertools.repeat(path), clusters):
+        result_list.extend(results)
+    return result_list
+
+
 def do_single_request(*args, **kwargs):
     """Issue a request to a specified cluster if specified via kwargs
        (cluster=<cluster>)."""
@@ -151,12 +170,36 @@ def do_single_request(*args, **kwargs):
 
 def do_multi_request(*args, **kwargs):
     """Issue a request to all clusters"""
-    results = []
     clusters = kwargs["clusters"]
     for x in clusters:
         LOG.debug(_("Issuing request to cluster: %s"), x.name)
-        rv = x.api_client.request(*args)
-        results.append(rv)
+    return batch_submit([(x.api_client.request, args, {}) for x in clusters])
+
+
+def batch_submit(calls, pool_size=BATCH_POOL_SIZE):
+    """Run independent nvplib calls concurrently.
+
+    :param calls: list of (function, args, kwargs) tuples, for instance
+        [(create_lport, (cluster, lswitch_uuid, ...), {}), ...]
+    :param pool_size: maximum number of calls running at the same time.
+    :returns: the list of the results of the calls, in the same order.
+    :raises: the exception raised by the first failed call, once all the
+        calls have completed.
+    """
+    pool = eventlet.GreenPool(pool_size)
+    threads = [pool.spawn(func, *args, **kwargs)
+               for func, args, kwargs in calls]
+    results = []
+    error = None
+    for thread in threads:
+        try:
+            results.append(thread.wait())
+        except Exception as e:
+            if error is None:
+                error = e
+            results.append(None)
+    if error is not None:
+        raise error
     return results
 
 
@@ -319,16 +362,19 @@ def delete_network(cluster, net_id, lswitch_id):
 def delete_networks(cluster, net_id, lswitch_ids):
     if net_id in _net_type_cache:
         del _net_type_cache[net_id]
-    for ls_id in lswitch_ids:
-        path = "/ws.v1/lswitch/%s" % ls_id
+    batch_submit([(_delete_lswitch, (cluster, ls_id), {})
+                  for ls_id in lswitch_ids])
 
-        try:
-            do_single_request("DELETE", path, cluster=cluster)
-        except NvpApiClient.ResourceNotFound as e:
-            LOG.error(_("Network not found, Error: %s"), str(e))
-            raise exception.NetworkNotFound(net_id=ls_id)
-        except NvpApiClient.NvpApiException as e:
-            raise exception.QuantumException()
+
+def _delete_lswitch(cluster, ls_id):
+    path = "/ws.v1/lswitch/%s" % ls_id
+    try:
+        do_single_request("DELETE", path, cluster=cluster)
+    except NvpApiClient.ResourceNotFound as e:
+        LOG.error(_("Network not found, Error: %s"), str(e))
+        raise exception.NetworkNotFound(net_id=ls_id)
+    except NvpApiClient.NvpApiException as e:
+        raise exception.QuantumException()
 
 
 def query_ports(cluster, network, relations=None, fields="*", filters=None):
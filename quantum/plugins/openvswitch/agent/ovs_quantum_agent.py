@@ -25,6 +25,7 @@ import time
 
 import eventlet
 
+from quantum.agent.common import stats
 from quantum.agent.linux import ip_lib
 from quantum.agent.linux import ovs_lib
 from quantum.agent.linux import utils
@@ -644,9 +645,11 @@ class OVSQuantumAgent(object):
 
             # sleep till end of polling interval
             elapsed = (time.time() - start)
+            stats.record('agent.loop', elapsed)
             if (elapsed < self.polling_interval):
                 time.sleep(self.polling_interval - elapsed)
             else:
+                stats.incr('agent.loop_overruns')
                 LOG.debug(_("Loop iteration exceeded interval "
                             "(%(polling_interval)s vs. %(elapsed)s)!"),
                           {'polling_interval': self.polling_interval,
@@ -698,6 +701,7 @@ def main():
     plugin = OVSQuantumAgent(**agent_config)
 
     # Start everything.
+    stats.start_server()
     LOG.info(_("Agent initialized successfully, now running... "))
     plugin.daemon_loop()
     sys.exit(0)
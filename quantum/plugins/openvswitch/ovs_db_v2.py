@@ -21,6 +21,7 @@ from sqlalchemy.orm import exc
 from quantum.common import exceptions as q_exc
 import quantum.db.api as db
 from quantum.db import models_v2
+from quantum.db import segmentation_db
 from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
 from quantum.plugins.openvswitch.common import constants
@@ -28,6 +29,9 @@ from quantum.plugins.openvswitch import ovs_models_v2
 
 LOG = logging.getLogger(__name__)
 
+VLAN_POOL = 'ovs_vlan'
+TUNNEL_POOL = 'ovs_tunnel'
+
 
 def initialize():
     db.configure_db()
@@ -54,63 +58,29 @@ def add_network_binding(session, network_id, network_type,
 
 
 def sync_vlan_allocations(network_vlan_ranges):
-    """Synchronize vlan_allocations table with configured VLAN ranges"""
+    """Synchronize vlan pool with configured VLAN ranges"""
 
     session = db.get_session()
     with session.begin():
-        # get existing allocations for all physical networks
-        allocations = dict()
-        allocs = (session.query(ovs_models_v2.VlanAllocation).
-                  all())
-        for alloc in allocs:
-            if alloc.physical_network not in allocations:
-                allocations[alloc.physical_network] = set()
-            allocations[alloc.physical_network].add(alloc)
-
-        # process vlan ranges for each configured physical network
-        for physical_network, vlan_ranges in network_vlan_ranges.iteritems():
-            # determine current configured allocatable vlans for this
-            # physical network
-            vlan_ids = set()
-            for vlan_range in vlan_ranges:
-                vlan_ids |= set(xrange(vlan_range[0], vlan_range[1] + 1))
-
-            # remove from table unallocated vlans not currently allocatable
-            if physical_network in allocations:
-                for alloc in allocations[physical_network]:
-                    try:
-                        # see if vlan is allocatable
-                        vlan_ids.remove(alloc.vlan_id)
-                    except KeyError:
-                        # it's not allocatable, so check if its allocated
-                        if not alloc.allocated:
-                            # it's not, so remove it from table
-                            LOG.debug(_("Removing vlan %(vlan_id)s on "
-                                        "physical network "
-                                        "%(physical_network)s from pool"),
-                                      {'vlan_id': alloc.vlan_id,
-                                       'physical_network': physical_network})
-                            session.delete(alloc)
-                del allocations[physical_network]
-
-            # add missing allocatable vlans to table
-            for vlan_id in sorted(vlan_ids):
-                alloc = ovs_models_v2.VlanAllocation(physical_network, vlan_id)
-                session.add(alloc)
-
-        # remove from table unallocated vlans for any unconfigured physical
-        # networks
-        for allocs in allocations.itervalues():
-            for alloc in allocs:
-                if not alloc.allocated:
-                    LOG.debug(_("Removing vlan %(vlan_id)s on physical "
-                                "network %(physical_network)s from pool"),
-                              {'vlan_id': alloc.vlan_id,
-                               'physical_network': alloc.physical_network})
-                    session.delete(alloc)
+        # only allocated vlans are kept in the vlan_allocations table, free
+        # ones are tracked as ranges by the segmentation allocator
+        (session.query(ovs_models_v2.VlanAllocation).
+         filter_by(allocated=False).
+         delete(synchronize_session=False))
+        allocated = dict()
+        allocs = session.query(ovs_models_v2.VlanAllocation.physical_network,
+                               ovs_models_v2.VlanAllocation.vlan_id)
+        for physical_network, vlan_id in allocs:
+            allocated.setdefault(physical_network, set()).add(vlan_id)
+        segmentation_db.sync_ranges(session, VLAN_POOL, network_vlan_ranges,
+                                    allocated)
 
 
 def get_vlan_allocation(physical_network, vlan_id):
+    """Get allocation state of vlan_id on physical_network.
+
+    Returns None if the vlan is neither allocated nor in the pool.
+    """
     session = db.get_session()
     try:
         alloc = (session.query(ovs_models_v2.VlanAllocation).
@@ -119,48 +89,49 @@ def get_vlan_allocation(physical_network, vlan_id):
                  one())
         return alloc
     except exc.NoResultFound:
-        return
+        if segmentation_db.is_free(session, VLAN_POOL, physical_network,
+                                   vlan_id):
+            return ovs_models_v2.VlanAllocation(physical_network, vlan_id)
 
 
 def reserve_vlan(session):
     with session.begin(subtransactions=True):
-        alloc = (session.query(ovs_models_v2.VlanAllocation).
-                 filter_by(allocated=False).
-                 first())
-        if alloc:
+        reserved = segmentation_db.allocate(session, VLAN_POOL)
+        if reserved:
+            physical_network, vlan_id = reserved
             LOG.debug(_("Reserving vlan %(vlan_id)s on physical network "
-                        "%(physical_network)s from pool"),
-                      {'vlan_id': alloc.vlan_id,
-                       'physical_network': alloc.physical_network})
+                        "%(physical_network)s from pool"), locals())
+            alloc = ovs_models_v2.VlanAllocation(physical_network, vlan_id)
             alloc.allocated = True
-            return (alloc.physical_network, alloc.vlan_id)
+            session.add(alloc)
+            return reserved
     raise q_exc.NoNetworkAvailable()
 
 
 def reserve_specific_vlan(session, physical_network, vlan_id):
     with session.begin(subtransactions=True):
-        try:
-            alloc = (session.query(ovs_models_v2.VlanAllocation).
-                     filter_by(physical_network=physical_network,
-                               vlan_id=vlan_id).
-                     one())
-            if alloc.allocated:
-                if vlan_id == constants.FLAT_VLAN_ID:
-                    raise q_exc.FlatNetworkInUse(
-                        physical_network=physical_network)
-                else:
-                    raise q_exc.VlanIdInUse(vlan_id=vlan_id,
-                                            physical_network=physical_network)
+        alloc = (session.query(ovs_models_v2.VlanAllocation).
+                 filter_by(physical_network=physical_network,
+                           vlan_id=vlan_id).
+                 first())
+        if alloc:
+            if vlan_id == constants.FLAT_VLAN_ID:
+                raise q_exc.FlatNetworkInUse(
+                    physical_network=physical_network)
+            else:
+                raise q_exc.VlanIdInUse(vlan_id=vlan_id,
+                                        physical_network=physical_network)
+        if segmentation_db.allocate_specific(session, VLAN_POOL,
+                                             physical_network, vlan_id):
             LOG.debug(_("Reserving specific vlan %(vlan_id)s on physical "
                         "network %(physical_network)s from pool"), locals())
-            alloc.allocated = True
-        except exc.NoResultFound:
+        else:
             LOG.debug(_("Reserving specific vlan %(vlan_id)s on physical "
                         "network %(physical_network)s outside pool"),
                       locals())
-            alloc = ovs_models_v2.VlanAllocation(physical_network, vlan_id)
-            alloc.allocated = True
-            session.add(alloc)
+        alloc = ovs_models_v2.VlanAllocation(physical_network, vlan_id)
+        alloc.allocated = True
+        session.add(alloc)
 
 
 def release_vlan(session, physical_network, vlan_id, network_vlan_ranges):
@@ -170,20 +141,16 @@ def release_vlan(session, physical_network, vlan_id, network_vlan_ranges):
                      filter_by(physical_network=physical_network,
                                vlan_id=vlan_id).
                      one())
-            alloc.allocated = False
-            inside = False
-            for vlan_range in network_vlan_ranges.get(physical_network, []):
-                if vlan_id >= vlan_range[0] and vlan_id <= vlan_range[1]:
-                    inside = True
-                    break
-            if not inside:
-                session.delete(alloc)
+            session.delete(alloc)
+            vlan_ranges = network_vlan_ranges.get(physical_network, [])
+            if segmentation_db.release(session, VLAN_POOL, physical_network,
+                                       vlan_id, vlan_ranges):
                 LOG.debug(_("Releasing vlan %(vlan_id)s on physical network "
-                            "%(physical_network)s outside pool"),
+                            "%(physical_network)s to pool"),
                           locals())
             else:
                 LOG.debug(_("Releasing vlan %(vlan_id)s on physical network "
-                            "%(physical_network)s to pool"),
+                            "%(physical_network)s outside pool"),
                           locals())
         except exc.NoResultFound:
             LOG.warning(_("vlan_id %(vlan_id)s on physical network "
@@ -192,43 +159,27 @@ def release_vlan(session, physical_network, vlan_id, network_vlan_ranges):
 
 
 def sync_tunnel_allocations(tunnel_id_ranges):
-    """Synchronize tunnel_allocations table with configured tunnel ranges"""
-
-    # determine current configured allocatable tunnels
-    tunnel_ids = set()
-    for tunnel_id_range in tunnel_id_ranges:
-        tun_min, tun_max = tunnel_id_range
-        if tun_max + 1 - tun_min > 1000000:
-            LOG.error(_("Skipping unreasonable tunnel ID range "
-                        "%(tun_min)s:%(tun_max)s"),
-                      locals())
-        else:
-            tunnel_ids |= set(xrange(tun_min, tun_max + 1))
+    """Synchronize tunnel pool with configured tunnel ranges"""
 
     session = db.get_session()
     with session.begin():
-        # remove from table unallocated tunnels not currently allocatable
-        allocs = (session.query(ovs_models_v2.TunnelAllocation).
-                  all())
-        for alloc in allocs:
-            try:
-                # see if tunnel is allocatable
-                tunnel_ids.remove(alloc.tunnel_id)
-            except KeyError:
-                # it's not allocatable, so check if its allocated
-                if not alloc.allocated:
-                    # it's not, so remove it from table
-                    LOG.debug(_("Removing tunnel %s from pool"),
-                              alloc.tunnel_id)
-                    session.delete(alloc)
-
-        # add missing allocatable tunnels to table
-        for tunnel_id in sorted(tunnel_ids):
-            alloc = ovs_models_v2.TunnelAllocation(tunnel_id)
-            session.add(alloc)
+        # only allocated tunnels are kept in the tunnel_allocations table
+        (session.query(ovs_models_v2.TunnelAllocation).
+         filter_by(allocated=False).
+         delete(synchronize_session=False))
+        tunnel_ids = set(
+            tunnel_id for tunnel_id, in
+            session.query(ovs_models_v2.TunnelAllocation.tunnel_id))
+        segmentation_db.sync_ranges(session, TUNNEL_POOL,
+                                    {'': tunnel_id_ranges},
+                                    {'': tunnel_ids})
 
 
 def get_tunnel_allocation(tunnel_id):
+    """Get allocation state of tunnel_id.
+
+    Returns None if the tunnel is neither allocated nor in the pool.
+    """
     session = db.get_session()
     try:
         alloc = (session.query(ovs_models_v2.TunnelAllocation).
@@ -236,37 +187,39 @@ def get_tunnel_allocation(tunnel_id):
                  one())
         return alloc
     except exc.NoResultFound:
-        return
+        if segmentation_db.is_free(session, TUNNEL_POOL, '', tunnel_id):
+            return ovs_models_v2.TunnelAllocation(tunnel_id)
 
 
 def reserve_tunnel(session):
     with session.begin(subtransactions=True):
-        alloc = (session.query(ovs_models_v2.TunnelAllocation).
-                 filter_by(allocated=False).
-                 first())
-        if alloc:
-            LOG.debug(_("Reserving tunnel %s from pool"), alloc.tunnel_id)
+        reserved = segmentation_db.allocate(session, TUNNEL_POOL)
+        if reserved:
+            tunnel_id = reserved[1]
+            LOG.debug(_("Reserving tunnel %s from pool"), tunnel_id)
+            alloc = ovs_models_v2.TunnelAllocation(tunnel_id)
             alloc.allocated = True
-            return alloc.tunnel_id
+            session.add(alloc)
+            return tunnel_id
     raise q_exc.NoNetworkAvailable()
 
 
 def reserve_specific_tunnel(session, tunnel_id):
     with session.begin(subtransactions=True):
-        try:
-            alloc = (session.query(ovs_models_v2.TunnelAllocation).
-                     filter_by(tunnel_id=tunnel_id).
-                     one())
-            if alloc.allocated:
-                raise q_exc.TunnelIdInUse(tunnel_id=tunnel_id)
+        alloc = (session.query(ovs_models_v2.TunnelAllocation).
+                 filter_by(tunnel_id=tunnel_id).
+                 first())
+        if alloc:
+            raise q_exc.TunnelIdInUse(tunnel_id=tunnel_id)
+        if segmentation_db.allocate_specific(session, TUNNEL_POOL, '',
+                                             tunnel_id):
             LOG.debug(_("Reserving specific tunnel %s from pool"), tunnel_id)
-            alloc.allocated = True
-        except exc.NoResultFound:
+        else:
             LOG.debug(_("Reserving specific tunnel %s outside pool"),
                       tunnel_id)
-            alloc = ovs_models_v2.TunnelAllocation(tunnel_id)
-            alloc.allocated = True
-            session.add(alloc)
+        alloc = ovs_models_v2.TunnelAllocation(tunnel_id)
+        alloc.allocated = True
+        session.add(alloc)
 
 
 def release_tunnel(session, tunnel_id, tunnel_id_ranges):
@@ -275,18 +228,12 @@ def release_tunnel(session, tunnel_id, tunnel_id_ranges):
             alloc = (session.query(ovs_models_v2.TunnelAllocation).
                      filter_by(tunnel_id=tunnel_id).
                      one())
-            alloc.allocated = False
-            inside = False
-            for tunnel_id_range in tunnel_id_ranges:
-                if (tunnel_id >= tunnel_id_range[0]
-                    and tunnel_id <= tunnel_id_range[1]):
-                    inside = True
-                    break
-            if not inside:
-                session.delete(alloc)
-                LOG.debug(_("Releasing tunnel %s outside pool"), tunnel_id)
-            else:
+            session.delete(alloc)
+            if segmentation_db.release(session, TUNNEL_POOL, '', tunnel_id,
+                                       tunnel_id_ranges):
                 LOG.debug(_("Releasing tunnel %s to pool"), tunnel_id)
+            else:
+                LOG.debug(_("Releasing tunnel %s outside pool"), tunnel_id)
         except exc.NoResultFound:
             LOG.warning(_("tunnel_id %s not found"), tunnel_id)
 
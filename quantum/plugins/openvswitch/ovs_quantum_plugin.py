@@ -196,6 +196,9 @@ class OVSQuantumPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
     # bulk operations. Name mangling is used in order to ensure it
     # is qualified by class
     __native_bulk_support = True
+    # This attribute specifies whether the plugin resources are built from
+    # the database only, so that their revisions can be used as ETags
+    __native_revision_support = True
     supported_extension_aliases = ["provider", "router", "binding", "quotas"]
 
     network_view = "extension:provider_network:view"
@@ -486,7 +489,8 @@ class OVSQuantumPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
                                                                 None)
             for net in nets:
                 self._extend_network_dict_provider(context, net)
-                self._extend_network_dict_l3(context, net)
+                if not fields or 'router:external' in fields:
+                    self._extend_network_dict_l3(context, net)
 
             # TODO(rkukura): Filter on extended provider attributes.
             nets = self._filter_nets_l3(context, nets, filters)
@@ -14,19 +14,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from sqlalchemy import exc as sa_exc
-from sqlalchemy import func
 from sqlalchemy.orm import exc as orm_exc
 
 from quantum.common import exceptions as q_exc
 import quantum.db.api as db
 from quantum.db import models_v2
+from quantum.db import segmentation_db
 from quantum.openstack.common import log as logging
 from quantum.plugins.ryu.db import models_v2 as ryu_models_v2
 
 
 LOG = logging.getLogger(__name__)
 
+TUNNEL_POOL = 'ryu_tunnel'
+
 
 def set_ofp_servers(hosts):
     session = db.get_session()
@@ -44,6 +45,11 @@ def network_all_tenant_list():
 
 
 class TunnelKey(object):
+    """Allocates the tunnel keys of networks.
+
+    The free keys are kept as ranges in the segmentation_id_ranges table,
+    so allocating a key is an indexed lookup of the lowest free range.
+    """
     # VLAN: 12 bits
     # GRE, VXLAN: 24bits
     # TODO(yamahata): STT: 64bits
@@ -61,126 +67,41 @@ class TunnelKey(object):
                                'tunnel_key_max: %(key_max)d. '
                                'Using default value') % {'key_min': key_min,
                                                          'key_max': key_max})
+        self._sync_ranges()
 
-    def _last_key(self, session):
-        try:
-            return session.query(ryu_models_v2.TunnelKeyLast).one()
-        except orm_exc.MultipleResultsFound:
-            max_key = session.query(
-                func.max(ryu_models_v2.TunnelKeyLast.last_key))
-            if max_key > self.key_max:
-                max_key = self.key_min
-
-            session.query(ryu_models_v2.TunnelKeyLast).delete()
-            last_key = ryu_models_v2.TunnelKeyLast(last_key=max_key)
-        except orm_exc.NoResultFound:
-            last_key = ryu_models_v2.TunnelKeyLast(last_key=self.key_min)
-
-        session.add(last_key)
-        session.flush()
-        return session.query(ryu_models_v2.TunnelKeyLast).one()
-
-    def _find_key(self, session, last_key):
-        """
-        Try to find unused tunnel key in TunnelKey table starting
-        from last_key + 1.
-        When all keys are used, raise sqlalchemy.orm.exc.NoResultFound
-        """
-        # key 0 is used for special meanings. So don't allocate 0.
-
-        # sqlite doesn't support
-        # '(select order by limit) union all (select order by limit) '
-        # 'order by limit'
-        # So do it manually
-        # new_key = session.query("new_key").from_statement(
-        #     # If last_key + 1 isn't used, it's the result
-        #     'SELECT new_key '
-        #     'FROM (SELECT :last_key + 1 AS new_key) q1 '
-        #     'WHERE NOT EXISTS '
-        #     '(SELECT 1 FROM tunnelkeys WHERE tunnel_key = :last_key + 1) '
-        #
-        #     'UNION ALL '
-        #
-        #     # if last_key + 1 used,
-        #     # find the least unused key from last_key + 1
-        #     '(SELECT t.tunnel_key + 1 AS new_key '
-        #     'FROM tunnelkeys t '
-        #     'WHERE NOT EXISTS '
-        #     '(SELECT 1 FROM tunnelkeys ti '
-        #     ' WHERE ti.tunnel_key = t.tunnel_key + 1) '
-        #     'AND t.tunnel_key >= :last_key '
-        #     'ORDER BY new_key LIMIT 1) '
-        #
-        #     'ORDER BY new_key LIMIT 1'
-        # ).params(last_key=last_key).one()
-        try:
-            new_key = session.query("new_key").from_statement(
-                # If last_key + 1 isn't used, it's the result
-                'SELECT new_key '
-                'FROM (SELECT :last_key + 1 AS new_key) q1 '
-                'WHERE NOT EXISTS '
-                '(SELECT 1 FROM tunnelkeys WHERE tunnel_key = :last_key + 1) '
-            ).params(last_key=last_key).one()
-        except orm_exc.NoResultFound:
-            new_key = session.query("new_key").from_statement(
-                # if last_key + 1 used,
-                # find the least unused key from last_key + 1
-                '(SELECT t.tunnel_key + 1 AS new_key '
-                'FROM tunnelkeys t '
-                'WHERE NOT EXISTS '
-                '(SELECT 1 FROM tunnelkeys ti '
-                ' WHERE ti.tunnel_key = t.tunnel_key + 1) '
-                'AND t.tunnel_key >= :last_key '
-                'ORDER BY new_key LIMIT 1) '
-            ).params(last_key=last_key).one()
-
-        new_key = new_key[0]  # the result is tuple.
-        LOG.debug(_("last_key %(last_key)s new_key %(new_key)s"),
-                  locals())
-        if new_key > self.key_max:
-            LOG.debug(_("No key found"))
-            raise orm_exc.NoResultFound()
-        return new_key
-
-    def _allocate(self, session, network_id):
-        last_key = self._last_key(session)
-        try:
-            new_key = self._find_key(session, last_key.last_key)
-        except orm_exc.NoResultFound:
-            new_key = self._find_key(session, self.key_min)
-
-        tunnel_key = ryu_models_v2.TunnelKey(network_id=network_id,
-                                             tunnel_key=new_key)
-        last_key.last_key = new_key
-        session.add(tunnel_key)
-        return new_key
-
-    _TRANSACTION_RETRY_MAX = 16
+    def _sync_ranges(self):
+        session = db.get_session()
+        with session.begin(subtransactions=True):
+            keys = [key for key, in
+                    session.query(ryu_models_v2.TunnelKey.tunnel_key)]
+            segmentation_db.sync_ranges(session, TUNNEL_POOL,
+                                        {'': [(self.key_min, self.key_max)]},
+                                        {'': keys})
 
     def allocate(self, session, network_id):
-        count = 0
-        while True:
-            session.begin(subtransactions=True)
-            try:
-                new_key = self._allocate(session, network_id)
-                session.commit()
-                break
-            except sa_exc.SQLAlchemyError:
-                session.rollback()
-
-            count += 1
-            if count > self._TRANSACTION_RETRY_MAX:
-                # if this happens too often, increase _TRANSACTION_RETRY_MAX
-                LOG.warn(_("Transaction retry exhausted (%d). "
-                           "Abandoned tunnel key allocation."), count)
+        with session.begin(subtransactions=True):
+            allocated = segmentation_db.allocate(session, TUNNEL_POOL)
+            if not allocated:
+                LOG.warn(_("No tunnel key available for network %s"),
+                         network_id)
                 raise q_exc.ResourceExhausted()
-
+            new_key = allocated[1]
+            tunnel_key = ryu_models_v2.TunnelKey(network_id=network_id,
+                                                 tunnel_key=new_key)
+            session.add(tunnel_key)
+        LOG.debug(_("Allocated tunnel key %(new_key)s to network "
+                    "%(network_id)s"), locals())
         return new_key
 
     def delete(self, session, network_id):
-        session.query(ryu_models_v2.TunnelKey).filter_by(
-            network_id=network_id).delete()
-        session.flush()
+        with session.begin(subtransactions=True):
+            tunnel_keys = (session.query(ryu_models_v2.TunnelKey).
+                           filter_by(network_id=network_id).all())
+            for tunnel_key in tunnel_keys:
+                segmentation_db.release(session, TUNNEL_POOL, '',
+                                        tunnel_key.tunnel_key,
+                                        [(self.key_min, self.key_max)])
+                session.delete(tunnel_key)
 
     def all_list(self):
         session = db.get_session()
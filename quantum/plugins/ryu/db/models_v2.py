@@ -33,16 +33,6 @@ class OFPServer(model_base.BASEV2):
                                           self.host_type)
 
 
-class TunnelKeyLast(model_base.BASEV2):
-    """Lastly allocated Tunnel key. The next key allocation will be started
-    from this value + 1
-    """
-    last_key = sa.Column(sa.Integer, primary_key=True)
-
-    def __repr__(self):
-        return "<TunnelKeyLast(%x)>" % self.last_key
-
-
 class TunnelKey(model_base.BASEV2):
     """Netowrk ID <-> tunnel key mapping."""
     network_id = sa.Column(sa.String(36), sa.ForeignKey("networks.id"),
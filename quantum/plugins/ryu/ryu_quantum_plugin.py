@@ -148,7 +148,8 @@ class RyuQuantumPluginV2(db_base_plugin_v2.QuantumDbPluginV2,
         nets = super(RyuQuantumPluginV2, self).get_networks(context, filters,
                                                             None)
         for net in nets:
-            self._extend_network_dict_l3(context, net)
+            if not fields or 'router:external' in fields:
+                self._extend_network_dict_l3(context, net)
         nets = self._filter_nets_l3(context, nets, filters)
 
         return [self._fields(net, fields) for net in nets]
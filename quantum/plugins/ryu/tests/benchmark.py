@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Benchmark of the Ryu tunnel key allocation for concurrent network creates
+when many networks already exist.
+
+Usage: benchmark.py [<sql_connection> [<networks> [<creates>]]]
+"""
+
+import time
+
+import eventlet
+
+from quantum.db import api as db
+from quantum.db import models_v2
+from quantum.openstack.common import cfg
+from quantum.openstack.common import uuidutils
+from quantum.plugins.ryu.db import api_v2 as db_api_v2
+from quantum.plugins.ryu.db import models_v2 as ryu_models_v2
+
+
+CONCURRENCY = 10
+# one key out of HOLE_EVERY is free, as left by deleted networks
+HOLE_EVERY = 100
+
+
+def _network(net_id):
+    return {'id': net_id, 'tenant_id': 'tenant', 'name': net_id,
+            'status': 'ACTIVE', 'admin_state_up': True, 'shared': False}
+
+
+def populate(networks):
+    net_ids = [uuidutils.generate_uuid() for i in xrange(networks)]
+    keys = [{'network_id': net_id, 'tunnel_key': key}
+            for key, net_id in enumerate(net_ids, 1) if key % HOLE_EVERY]
+    session = db.get_session()
+    with session.begin():
+        session.execute(models_v2.Network.__table__.insert(),
+                        [_network(net_id) for net_id in net_ids])
+        session.execute(ryu_models_v2.TunnelKey.__table__.insert(), keys)
+
+
+def create_network(tunnel_key):
+    session = db.get_session()
+    net_id = uuidutils.generate_uuid()
+    with session.begin():
+        session.execute(models_v2.Network.__table__.insert(),
+                        _network(net_id))
+        return tunnel_key.allocate(session, net_id)
+
+
+def run(creates):
+    start = time.time()
+    tunnel_key = db_api_v2.TunnelKey(1, 0xffffff)
+    sync_time = time.time() - start
+
+    pool = eventlet.GreenPool(CONCURRENCY)
+    start = time.time()
+    keys = list(pool.imap(create_network, [tunnel_key] * creates))
+    elapsed = time.time() - start
+    assert len(set(keys)) == creates, "duplicate tunnel keys"
+    return sync_time, creates / elapsed
+
+
+if __name__ == "__main__":
+    import sys
+
+    sql_connection = 'sqlite://'
+    networks = 50000
+    creates = 2000
+    if len(sys.argv) > 1:
+        sql_connection = sys.argv[1]
+    if len(sys.argv) > 2:
+        networks = int(sys.argv[2])
+    if len(sys.argv) > 3:
+        creates = int(sys.argv[3])
+
+    cfg.CONF.set_override('sql_connection', sql_connection, 'DATABASE')
+    db.configure_db()
+    populate(networks)
+    sync_time, rate = run(creates)
+    print "existing networks:       %8d" % networks
+    print "free range sync:         %8.3f s" % sync_time
+    print "concurrent allocations:  %8.1f ops/s" % rate
+    db.clear_db()
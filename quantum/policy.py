@@ -21,6 +21,7 @@ Policy engine for quantum.  Largely copied from nova.
 
 from quantum.api.v2 import attributes
 from quantum.common import exceptions
+from quantum.common import profiler
 import quantum.common.utils as utils
 from quantum.openstack.common import cfg
 from quantum.openstack.common import log as logging
@@ -154,6 +155,7 @@ class FieldCheck(policy.Check):
         return target_value == self.value
 
 
+@profiler.profiled(profiler.POLICY)
 def check(context, action, target, plugin=None):
     """Verifies that the action is valid on the target in this context.
 
@@ -175,6 +177,7 @@ def check(context, action, target, plugin=None):
     return policy.check(match_rule, real_target, credentials)
 
 
+@profiler.profiled(profiler.POLICY)
 def enforce(context, action, target, plugin=None):
     """Verifies that the action is valid on the target in this context.
 
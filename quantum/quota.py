@@ -17,6 +17,7 @@
 """Quotas for instances, volumes, and floating ips."""
 
 from quantum.common import exceptions
+from quantum.common import profiler
 from quantum.openstack.common import cfg
 from quantum.openstack.common import importutils
 from quantum.openstack.common import log as logging
@@ -231,6 +232,7 @@ class QuotaEngine(object):
 
         return res.count(context, *args, **kwargs)
 
+    @profiler.profiled(profiler.QUOTA)
     def limit_check(self, context, tenant_id, **values):
         """Check simple quota limits.
 
@@ -0,0 +1,647 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Benchmark of the agent hot paths against a fake kernel.
+
+The commands run by the agents through quantum.agent.linux.utils.execute
+are served in process by FakeKernel, which keeps the iptables tables, the
+network namespaces, devices and addresses, the OVS bridges and interfaces
+and the dnsmasq processes like the real commands would. The scenarios run
+the real iptables firewall driver, OVS bridge, dnsmasq driver and L3 agent
+end to end, and report for each operation its wall time, the number of
+commands which would have forked and the bytes written to iptables-restore
+and to the dnsmasq files.
+
+The firewall scenarios grow with the square of the number of ports: at
+the default scale they take tens of minutes, run the others with e.g.
+--scenarios ovs,l3,dhcp.
+
+Usage: agent.py [--ports <number>] [--rules <number>]
+                [--routers <number>] [--floating-ips <number>]
+                [--dhcp-ports <number>] [--repeats <number>]
+                [--scenarios firewall,ovs,l3,dhcp]
+"""
+
+import collections
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+import netaddr
+
+from quantum.agent.common import config
+from quantum.agent.dhcp_agent import DhcpLeaseRelay
+from quantum.agent.dhcp_agent import DictModel
+from quantum.agent import l3_agent
+from quantum.agent.linux import dhcp
+from quantum.agent.linux import external_process
+from quantum.agent.linux import interface
+from quantum.agent.linux import iptables_firewall
+from quantum.agent.linux import iptables_manager
+from quantum.agent.linux import ovs_lib
+from quantum.agent.linux import utils
+from quantum.common import config as base_config
+from quantum.common import constants as l3_constants
+from quantum.openstack.common import cfg
+from quantum.openstack.common import uuidutils
+
+
+ROOT_HELPER = 'sudo'
+SCENARIOS = ('firewall', 'ovs', 'l3', 'dhcp')
+
+BUILTIN_CHAINS = {'filter': ['INPUT', 'FORWARD', 'OUTPUT'],
+                  'nat': ['PREROUTING', 'INPUT', 'OUTPUT', 'POSTROUTING'],
+                  'mangle': ['PREROUTING', 'INPUT', 'FORWARD', 'OUTPUT',
+                             'POSTROUTING']}
+
+
+class Device(object):
+    """Network device with its link settings and addresses."""
+
+    def __init__(self, name, mac_address='00:00:00:00:00:00'):
+        self.name = name
+        self.mac_address = mac_address
+        self.mtu = 1500
+        self.state = 'DOWN'
+        # [cidr, broadcast, scope]
+        self.addresses = []
+
+    def link_line(self, index):
+        return ('%d: %s: <BROADCAST,MULTICAST,UP> mtu %s qdisc noqueue state '
+                '%s \\    link/ether %s brd ff:ff:ff:ff:ff:ff' %
+                (index, self.name, self.mtu, self.state, self.mac_address))
+
+
+class Namespace(object):
+    """Devices, routes and iptables tables of a network namespace."""
+
+    def __init__(self):
+        self.devices = collections.OrderedDict()
+        self.devices['lo'] = Device('lo')
+        self.routes = []
+        # command -> table -> lines of iptables-save
+        self.tables = {}
+        for cmd in ('iptables', 'ip6tables'):
+            self.tables[cmd] = dict(
+                (table, ['*%s' % table] +
+                 [':%s ACCEPT [0:0]' % chain for chain in chains] +
+                 ['COMMIT'])
+                for table, chains in BUILTIN_CHAINS.iteritems())
+
+    def device(self, name):
+        try:
+            return self.devices[name]
+        except KeyError:
+            raise RuntimeError('Device "%s" does not exist.' % name)
+
+
+class FakeKernel(object):
+    """In-process stand-in for the commands run by the agents.
+
+    execute() replaces quantum.agent.linux.utils.execute. It counts every
+    command, which would fork a process, by binary, and the bytes written
+    to the commands; replace_file() counts the bytes of the rewritten
+    dnsmasq files.
+    """
+
+    def __init__(self):
+        self.forks = 0
+        self.bytes_written = 0
+        self.commands = collections.defaultdict(int)
+        self.namespaces = {None: Namespace()}
+        # bridge -> port names
+        self.bridges = collections.OrderedDict()
+        # interface -> column -> value
+        self.interfaces = {}
+        self.flows = collections.defaultdict(int)
+        self.processes = {}
+        self._next_pid = 1000
+        self._replace_file = dhcp.replace_file
+
+    def execute(self, cmd, root_helper=None, process_input=None,
+                addl_env=None, check_exit_code=True, return_stderr=False):
+        self.forks += 1
+        cmd = [str(arg) for arg in cmd]
+        # the environment of the commands run in a namespace
+        while cmd and '=' in cmd[0] and not cmd[0].startswith('-'):
+            cmd = cmd[1:]
+        namespace = None
+        if cmd[:3] == ['ip', 'netns', 'exec']:
+            namespace = cmd[3]
+            cmd = cmd[4:]
+        binary = os.path.basename(cmd[0])
+        self.commands[binary] += 1
+        if process_input:
+            self.bytes_written += len(process_input)
+        handler = getattr(self, '_%s' % binary.replace('-', '_'), None)
+        output = ''
+        if handler:
+            output = handler(self._namespace(namespace), cmd[1:],
+                             process_input)
+        return return_stderr and (output, '') or output
+
+    def replace_file(self, file_name, data):
+        self.bytes_written += len(data)
+        self._replace_file(file_name, data)
+
+    def _namespace(self, name):
+        try:
+            return self.namespaces[name]
+        except KeyError:
+            raise RuntimeError('Cannot open network namespace "%s"' % name)
+
+    def _save(self, ns, args, process_input, cmd):
+        table = args[args.index('-t') + 1]
+        return '\n'.join(ns.tables[cmd][table]) + '\n'
+
+    def _restore(self, ns, args, process_input, cmd):
+        lines = None
+        for line in process_input.split('\n'):
+            if line.startswith('*'):
+                lines = [line]
+            elif line == 'COMMIT':
+                lines.append(line)
+                ns.tables[cmd][lines[0][1:]] = lines
+            elif line and not line.startswith('#'):
+                lines.append(line)
+        return ''
+
+    def _iptables_save(self, ns, args, process_input):
+        return self._save(ns, args, process_input, 'iptables')
+
+    def _iptables_restore(self, ns, args, process_input):
+        return self._restore(ns, args, process_input, 'iptables')
+
+    def _ip6tables_save(self, ns, args, process_input):
+        return self._save(ns, args, process_input, 'ip6tables')
+
+    def _ip6tables_restore(self, ns, args, process_input):
+        return self._restore(ns, args, process_input, 'ip6tables')
+
+    def _ip(self, ns, args, process_input):
+        args = list(args)
+        while args and args[0].startswith('-'):
+            args.pop(0)
+        return getattr(self, '_ip_%s' % args[0])(ns, args[1:])
+
+    def _ip_link(self, ns, args):
+        if not args or args[0] == 'list':
+            return '\n'.join(device.link_line(i + 1) for i, device
+                             in enumerate(ns.devices.itervalues())) + '\n'
+        command, name, args = args[0], args[1], args[2:]
+        if command == 'show':
+            return ns.device(name).link_line(ns.devices.keys().index(name))
+        elif command == 'add':
+            ns.devices[name] = Device(name)
+            ns.devices[args[-1]] = Device(args[-1])
+        elif command == 'delete':
+            del ns.devices[ns.device(name).name]
+        elif command == 'set':
+            device = ns.device(name)
+            while args:
+                setting = args.pop(0)
+                if setting in ('up', 'down'):
+                    device.state = setting.upper()
+                elif setting == 'address':
+                    device.mac_address = args.pop(0)
+                elif setting == 'mtu':
+                    device.mtu = args.pop(0)
+                elif setting == 'name':
+                    del ns.devices[name]
+                    device.name = args.pop(0)
+                    ns.devices[device.name] = device
+                elif setting == 'netns':
+                    del ns.devices[name]
+                    self._namespace(args.pop(0)).devices[name] = device
+        return ''
+
+    def _ip_tuntap(self, ns, args):
+        ns.devices[args[1]] = Device(args[1])
+        return ''
+
+    def _ip_addr(self, ns, args):
+        command = args[0]
+        if command in ('show', 'flush'):
+            device = ns.device(args[1])
+            if command == 'flush':
+                device.addresses = []
+                return ''
+            return ''.join('    inet %s brd %s scope %s %s\n' %
+                           (cidr, broadcast, scope, device.name)
+                           for cidr, broadcast, scope in device.addresses)
+        device = ns.device(args[args.index('dev') + 1])
+        if command == 'add':
+            device.addresses.append([args[1], args[3], args[5]])
+        elif command == 'del':
+            device.addresses = [address for address in device.addresses
+                                if address[0] != args[1]]
+        return ''
+
+    def _ip_route(self, ns, args):
+        command, route = args[0], ' '.join(args[1:])
+        if command == 'list':
+            dev = ''
+            if 'dev' in args:
+                dev = 'dev %s' % args[args.index('dev') + 1]
+            return ''.join('%s\n' % line for line in ns.routes if dev in line)
+        if command in ('add', 'append'):
+            ns.routes.append(route)
+        elif command == 'del' and route in ns.routes:
+            ns.routes.remove(route)
+        return ''
+
+    def _ip_netns(self, ns, args):
+        if args[0] == 'list':
+            return ''.join('%s\n' % name for name in self.namespaces if name)
+        elif args[0] == 'add':
+            self.namespaces[args[1]] = Namespace()
+        elif args[0] == 'delete':
+            del self.namespaces[args[1]]
+        return ''
+
+    def _ovs_vsctl(self, ns, args, process_input):
+        commands = [[]]
+        for arg in args:
+            if arg == '--':
+                commands.append([])
+            elif not arg.startswith('--'):
+                commands[-1].append(arg)
+        output = []
+        for command in commands:
+            if command:
+                handler = getattr(self, '_vsctl_%s' %
+                                  command[0].replace('-', '_'), None)
+                if handler:
+                    output.append(handler(*command[1:]))
+        return ''.join(output)
+
+    def _vsctl_add_br(self, bridge):
+        if bridge not in self.bridges:
+            self.bridges[bridge] = []
+            self.namespaces[None].devices[bridge] = Device(bridge)
+        return ''
+
+    def _vsctl_del_br(self, bridge):
+        for port in self.bridges.pop(bridge, []):
+            self._vsctl_del_port(port)
+        self.namespaces[None].devices.pop(bridge, None)
+        return ''
+
+    def _vsctl_list_br(self):
+        return ''.join('%s\n' % bridge for bridge in self.bridges)
+
+    def _vsctl_br_exists(self, bridge):
+        if bridge not in self.bridges:
+            raise RuntimeError('Exit code: 2')
+        return ''
+
+    def _vsctl_add_port(self, bridge, port):
+        if port not in self.interfaces:
+            self.bridges[bridge].append(port)
+            self.interfaces[port] = {'external_ids': collections.OrderedDict(),
+                                     'ofport': len(self.interfaces) + 1}
+            self.namespaces[None].devices[port] = Device(port)
+        return ''
+
+    def _vsctl_del_port(self, *args):
+        port = args[-1]
+        if self.interfaces.pop(port, None) is not None:
+            for ports in self.bridges.itervalues():
+                if port in ports:
+                    ports.remove(port)
+            for ns in self.namespaces.itervalues():
+                ns.devices.pop(port, None)
+        return ''
+
+    def _vsctl_list_ports(self, bridge):
+        return ''.join('%s\n' % port for port in self.bridges[bridge])
+
+    def _vsctl_set(self, table, record, *settings):
+        columns = self.interfaces[record]
+        for setting in settings:
+            key, value = setting.split('=', 1)
+            if ':' in key:
+                column, key = key.split(':', 1)
+                columns[column.replace('-', '_')][key] = value
+            else:
+                columns[key] = value
+        return ''
+
+    def _vsctl_get(self, table, record, column):
+        if table == 'Bridge':
+            return '"%016x"\n' % self.bridges.keys().index(record)
+        value = self.interfaces[record].get(column)
+        if isinstance(value, dict):
+            return '{%s}\n' % ', '.join('%s="%s"' % item
+                                        for item in value.iteritems())
+        return '%s\n' % value
+
+    def _ovs_ofctl(self, ns, args, process_input):
+        self.flows[args[1]] += 1
+        return ''
+
+    def _dnsmasq(self, ns, args, process_input):
+        pid = self._next_pid
+        self._next_pid += 1
+        self.processes[pid] = ' '.join(['dnsmasq'] + args)
+        for arg in args:
+            if arg.startswith('--pid-file='):
+                self._replace_file(arg.split('=', 1)[1], str(pid))
+        return ''
+
+    def _kill(self, ns, args, process_input):
+        pid = int(args[-1])
+        if pid not in self.processes:
+            raise RuntimeError('kill: (%d) - No such process' % pid)
+        if args[0] == '-9':
+            del self.processes[pid]
+        return ''
+
+    def _cat(self, ns, args, process_input):
+        pid = int(args[0].split('/')[2])
+        if pid not in self.processes:
+            raise RuntimeError('No such file or directory')
+        return self.processes[pid]
+
+
+class Result(object):
+    """Wall time, forks and bytes written of the operations of a scenario."""
+
+    def __init__(self):
+        self.durations = []
+        self.forks = 0
+        self.bytes_written = 0
+        self.commands = collections.defaultdict(int)
+
+    def to_dict(self):
+        ops = len(self.durations)
+        durations = sorted(self.durations)
+        return {'ops': ops,
+                'ms_per_op': sum(durations) / ops * 1000,
+                'p99_ms': durations[int(ops * 0.99)] * 1000,
+                'forks_per_op': float(self.forks) / ops,
+                'bytes_per_op': float(self.bytes_written) / ops,
+                'commands': dict(self.commands)}
+
+
+class AgentBenchmark(object):
+    """End to end scenarios of the agents against a FakeKernel.
+
+    The scenarios filter ports ports with rules security group rules each,
+    list the VIFs of ports OVS ports, process routers routers with
+    floating_ips floating IPs each and reload the allocations of a DHCP
+    network of dhcp_ports ports. The results are kept by scenario, in their
+    order.
+    """
+
+    def __init__(self, ports=500, rules=50, routers=300, floating_ips=20,
+                 dhcp_ports=4000, repeats=5):
+        self.ports = ports
+        self.rules = rules
+        self.routers = routers
+        self.floating_ips = floating_ips
+        self.dhcp_ports = dhcp_ports
+        self.repeats = repeats
+        self.kernel = FakeKernel()
+        self.results = {}
+        self.scenarios = []
+
+    def measure(self, scenario, f, *args, **kwargs):
+        """Call f, recording its cost under the scenario."""
+        if scenario not in self.results:
+            self.results[scenario] = Result()
+            self.scenarios.append(scenario)
+        result = self.results[scenario]
+        kernel = self.kernel
+        forks, written = kernel.forks, kernel.bytes_written
+        commands = dict(kernel.commands)
+        start = time.time()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            result.durations.append(time.time() - start)
+            result.forks += kernel.forks - forks
+            result.bytes_written += kernel.bytes_written - written
+            for binary, count in kernel.commands.iteritems():
+                if count != commands.get(binary, 0):
+                    result.commands[binary] += count - commands.get(binary, 0)
+
+    def _ip(self, network, index):
+        return str(netaddr.IPNetwork(network)[index])
+
+    def _mac(self, index):
+        return 'fa:16:3e:%02x:%02x:%02x' % (index >> 16 & 0xff,
+                                            index >> 8 & 0xff, index & 0xff)
+
+    def run_firewall(self):
+        manager = iptables_manager.IptablesManager(root_helper=ROOT_HELPER,
+                                                   use_ipv6=True)
+        firewall = iptables_firewall.IptablesFirewallDriver(manager)
+        rules = [{'direction': 'ingress', 'ethertype': 'IPv4',
+                  'protocol': 'tcp', 'port_range_min': 1024 + i,
+                  'port_range_max': 1024 + i,
+                  'source_ip_prefix': '10.%d.0.0/16' % (i % 256)}
+                 for i in xrange(self.rules - 1)]
+        rules.append({'direction': 'egress', 'ethertype': 'IPv4'})
+        ports = [{'device': 'tap%d' % i,
+                  'mac_address': self._mac(i),
+                  'fixed_ips': [self._ip('10.0.0.0/8', i + 2)],
+                  'security_group_rules': rules}
+                 for i in xrange(self.ports)]
+        # the devices added one by one by the agent loop
+        for port in ports:
+            self.measure('firewall.prepare_port_filter',
+                         firewall.prepare_port_filter, port)
+
+        # the rules of all the devices refreshed on a rule update, which
+        # rebuilds the chains of every port for each port: run it once
+        def refresh():
+            with firewall.defer_apply():
+                for port in ports:
+                    firewall.update_port_filter(port)
+        self.measure('firewall.refresh', refresh)
+
+    def run_ovs(self):
+        bridge = ovs_lib.OVSBridge('br-int', ROOT_HELPER)
+        bridge.reset_bridge()
+        for i in xrange(self.ports):
+            name = 'tap%d' % i
+            # as plugged by the VIF driver of nova
+            utils.execute(['ovs-vsctl', '--', '--may-exist', 'add-port',
+                           'br-int', name,
+                           '--', 'set', 'Interface', name,
+                           'external-ids:iface-id=%s' %
+                           uuidutils.generate_uuid(),
+                           'external-ids:attached-mac=%s' % self._mac(i)],
+                          root_helper=ROOT_HELPER)
+        for i in xrange(self.repeats):
+            self.measure('ovs.get_vif_port_set', bridge.get_vif_port_set)
+
+    def _router(self, index):
+        gw_ip = self._ip('172.16.0.0/12', index + 2)
+        internal = '10.%d.%d.0/24' % (index >> 8 & 0xff, index & 0xff)
+        floating_ips = [
+            {'id': uuidutils.generate_uuid(),
+             'floating_ip_address': self._ip(
+                 '192.0.0.0/8', (index + 1) * self.floating_ips * 2 + i),
+             'fixed_ip_address': self._ip(internal, i + 2),
+             'port_id': uuidutils.generate_uuid()}
+            for i in xrange(self.floating_ips)]
+        return {
+            'id': uuidutils.generate_uuid(),
+            'gw_port': {'id': uuidutils.generate_uuid(),
+                        'network_id': uuidutils.generate_uuid(),
+                        'mac_address': self._mac(index),
+                        'fixed_ips': [{'ip_address': gw_ip}],
+                        'subnet': {'cidr': '172.16.0.0/12',
+                                   'gateway_ip': '172.16.0.1'}},
+            l3_constants.INTERFACE_KEY: [
+                {'id': uuidutils.generate_uuid(),
+                 'network_id': uuidutils.generate_uuid(),
+                 'admin_state_up': True,
+                 'mac_address': self._mac(index + (1 << 20)),
+                 'fixed_ips': [{'ip_address': self._ip(internal, 1)}],
+                 'subnet': {'cidr': internal,
+                            'gateway_ip': self._ip(internal, 1)}}],
+            l3_constants.FLOATINGIP_KEY: floating_ips}
+
+    def run_l3(self, conf):
+        for bridge in (conf.ovs_integration_bridge,
+                       conf.external_network_bridge):
+            ovs_lib.OVSBridge(bridge, ROOT_HELPER).reset_bridge()
+        agent = l3_agent.L3NATAgent('perf', conf)
+        for i in xrange(self.routers):
+            router = self._router(i)
+            self.measure('l3.router_added', agent._router_added,
+                         router['id'], router)
+            self.measure('l3.process_router.new', agent.process_router,
+                         agent.router_info[router['id']])
+        for i in xrange(self.repeats):
+            for ri in agent.router_info.itervalues():
+                self.measure('l3.process_router.unchanged',
+                             agent.process_router, ri)
+        for ri in agent.router_info.values()[:self.repeats]:
+            floating_ips = ri.router[l3_constants.FLOATINGIP_KEY]
+            ri.router[l3_constants.FLOATINGIP_KEY] = floating_ips[1:]
+            self.measure('l3.process_router.floating_ip_removed',
+                         agent.process_router, ri)
+
+    def run_dhcp(self, conf):
+        cidr = '10.0.0.0/%d' % (31 - (self.dhcp_ports + self.repeats +
+                                      2).bit_length())
+        subnet_id = uuidutils.generate_uuid()
+
+        def port(index):
+            return {'id': uuidutils.generate_uuid(),
+                    'mac_address': self._mac(index),
+                    'device_owner': 'compute:nova',
+                    'fixed_ips': [{'subnet_id': subnet_id,
+                                   'ip_address': self._ip(cidr, index + 2)}]}
+
+        network = DictModel({
+            'id': uuidutils.generate_uuid(),
+            'tenant_id': 'perf',
+            'admin_state_up': True,
+            'subnets': [{'id': subnet_id, 'ip_version': 4, 'cidr': cidr,
+                         'gateway_ip': self._ip(cidr, 1),
+                         'enable_dhcp': True, 'dns_nameservers': [],
+                         'host_routes': []}],
+            'ports': [port(i) for i in xrange(self.dhcp_ports)]})
+        namespace = 'qdhcp-%s' % network.id
+        self.kernel.execute(['ip', 'netns', 'add', namespace])
+        driver = dhcp.Dnsmasq(conf, network, ROOT_HELPER,
+                              namespace=namespace)
+        driver.interface_name = 'tap-dhcp'
+        self.measure('dhcp.spawn_process', driver.spawn_process)
+        # a port created before each reload
+        for i in xrange(self.repeats):
+            network.ports.append(DictModel(port(self.dhcp_ports + i)))
+            self.measure('dhcp.reload_allocations',
+                         driver.reload_allocations)
+
+    def run(self, conf, scenarios=SCENARIOS):
+        with mock.patch.object(utils, 'execute', self.kernel.execute):
+            with mock.patch.object(dhcp, 'replace_file',
+                                   self.kernel.replace_file):
+                for scenario in scenarios:
+                    run = getattr(self, 'run_%s' % scenario)
+                    if scenario in ('l3', 'dhcp'):
+                        run(conf)
+                    else:
+                        run()
+        return dict((scenario, result.to_dict())
+                    for scenario, result in self.results.iteritems())
+
+
+def agent_conf(state_path):
+    """Return the configuration of the agents, keeping state in state_path."""
+    conf = config.setup_conf()
+    conf.register_opts(base_config.core_opts)
+    conf.register_opts(l3_agent.L3NATAgent.OPTS)
+    conf.register_opts(interface.OPTS)
+    conf.register_opts(dhcp.OPTS)
+    conf.register_opts(DhcpLeaseRelay.OPTS)
+    conf.register_opts(external_process.OPTS)
+    conf.set_override('root_helper', ROOT_HELPER)
+    conf.set_override('interface_driver',
+                      'quantum.agent.linux.interface.OVSInterfaceDriver')
+    conf.set_override('state_path', state_path)
+    return conf
+
+
+def report(scenarios, results):
+    print ('%-40s %6s %9s %9s %9s %11s' %
+           ('scenario', 'ops', 'ms/op', 'p99 ms', 'forks/op', 'bytes/op'))
+    for scenario in scenarios:
+        res = results[scenario]
+        print ('%-40s %6d %9.2f %9.2f %9.1f %11.0f' %
+               (scenario, res['ops'], res['ms_per_op'], res['p99_ms'],
+                res['forks_per_op'], res['bytes_per_op']))
+        commands = sorted(res['commands'].iteritems(),
+                          key=lambda item: (-item[1], item[0]))
+        if commands:
+            print '    %s' % ' '.join('%s=%d' % item for item in commands)
+
+
+if __name__ == "__main__":
+    import optparse
+
+    parser = optparse.OptionParser(usage=__doc__)
+    parser.add_option('--ports', type='int', default=500)
+    parser.add_option('--rules', type='int', default=50)
+    parser.add_option('--routers', type='int', default=300)
+    parser.add_option('--floating-ips', type='int', default=20)
+    parser.add_option('--dhcp-ports', type='int', default=4000)
+    parser.add_option('--repeats', type='int', default=5)
+    parser.add_option('--scenarios', default=','.join(SCENARIOS))
+    options, args = parser.parse_args()
+
+    state_path = tempfile.mkdtemp()
+    try:
+        cfg.CONF.set_override('lock_path', state_path)
+        benchmark = AgentBenchmark(options.ports, options.rules,
+                                   options.routers, options.floating_ips,
+                                   options.dhcp_ports, options.repeats)
+        results = benchmark.run(agent_conf(state_path),
+                                options.scenarios.split(','))
+        report(benchmark.scenarios, results)
+    finally:
+        shutil.rmtree(state_path)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Benchmark of the validation of bulk port creation bodies, compiling the
+attribute checks for every request or once per resource.
+
+Usage: validation.py [<number of ports per request>] [<number of requests>]
+"""
+
+import copy
+import time
+
+from quantum.api.v2 import attributes
+from quantum.api.v2 import base
+from quantum import context
+from quantum.openstack.common import uuidutils
+
+
+def bulk_body(ports):
+    network_id = uuidutils.generate_uuid()
+    subnet_id = uuidutils.generate_uuid()
+    return {'ports': [{'port': {'network_id': network_id,
+                                'name': 'port%d' % i,
+                                'admin_state_up': 'true',
+                                'fixed_ips': [{'subnet_id': subnet_id,
+                                               'ip_address': '10.0.%d.%d' %
+                                               (i / 250, i % 250 + 2)}]}}
+                      for i in xrange(ports)]}
+
+
+def run(prepare, body, requests):
+    ctx = context.Context('', 'tenant')
+    bodies = [copy.deepcopy(body) for i in xrange(requests)]
+    start = time.time()
+    for body in bodies:
+        prepare(ctx, body)
+    return requests * len(body['ports']) / (time.time() - start)
+
+
+if __name__ == "__main__":
+    import sys
+
+    ports = 1000
+    requests = 20
+    if len(sys.argv) > 1:
+        ports = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        requests = int(sys.argv[2])
+
+    attr_info = attributes.RESOURCE_ATTRIBUTE_MAP['ports']
+    body = bulk_body(ports)
+
+    def per_request(ctx, body):
+        base.Controller.prepare_request_body(ctx, body, True, 'port',
+                                             attr_info, allow_bulk=True)
+
+    res_attrs = base.ResourceAttributes(attr_info)
+
+    def compiled(ctx, body):
+        res_attrs.prepare_request_body(ctx, body, True, 'port',
+                                       allow_bulk=True)
+
+    print "compiled per request:  %8.1f ports/s" % run(per_request, body,
+                                                       requests)
+    print "compiled per resource: %8.1f ports/s" % run(compiled, body,
+                                                       requests)
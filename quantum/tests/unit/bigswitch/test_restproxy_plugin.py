@@ -16,11 +16,16 @@
 # limitations under the License.
 
 import os
+import socket
 
+import eventlet
+import mock
 from mock import patch
+import unittest2 as unittest
 
 import quantum.common.test_lib as test_lib
 from quantum.manager import QuantumManager
+from quantum.plugins.bigswitch import plugin as restproxy
 import quantum.tests.unit.test_db_plugin as test_plugin
 
 
@@ -30,6 +35,7 @@ RESTPROXY_PKG_PATH = 'quantum.plugins.bigswitch.plugin'
 class HTTPResponseMock():
     status = 200
     reason = 'OK'
+    will_close = False
 
     def __init__(self, sock, debuglevel=0, strict=0, method=None,
                  buffering=False):
@@ -110,3 +116,135 @@ class TestBigSwitchProxySync(BigSwitchProxyPluginV2TestCase):
         plugin_obj = QuantumManager.get_plugin()
         result = plugin_obj._send_all_data()
         self.assertEqual(result[0], 200)
+
+    def _sent_topologies(self, put):
+        return [args[1] for args, kwargs in put.call_args_list]
+
+    def test_send_data_topology(self):
+        plugin_obj = QuantumManager.get_plugin()
+        with self.subnet(gateway_ip='10.0.0.1') as subnet:
+            net_id = subnet['subnet']['network_id']
+            with self.port(subnet=subnet) as port:
+                with patch.object(plugin_obj.servers, 'put',
+                                  return_value=(200, 'OK', '', '')) as put:
+                    plugin_obj._send_all_data()
+        topologies = self._sent_topologies(put)
+        self.assertEqual(len(topologies), 1)
+        network = topologies[0]['networks'][net_id]
+        self.assertEqual(network['gateway'], '10.0.0.1')
+        self.assertEqual(network['op-status'], True)
+        self.assertEqual([p['id'] for p in network['ports']],
+                         [port['port']['id']])
+        self.assertEqual(network['ports'][0]['attachment']['mac'],
+                         port['port']['mac_address'])
+
+
+class TestServerProxy(unittest.TestCase):
+
+    def setUp(self):
+        self.proxy = restproxy.ServerProxy('localhost', 8800, False, None, 10,
+                                           '/quantum/v1.0', 'test',
+                                           pool_size=1)
+        conn_p = patch('httplib.HTTPConnection')
+        self.conn_cls = conn_p.start()
+        self.addCleanup(conn_p.stop)
+        self.conn_cls.return_value.getresponse.return_value = mock.Mock(
+            status=200, reason='OK', will_close=False,
+            read=mock.Mock(return_value='{"ok": true}'))
+
+    def test_connection_reused(self):
+        for i in range(3):
+            ret = self.proxy.rest_call('GET', '/networks', '', None)
+            self.assertEqual(ret[0], 200)
+            self.assertEqual(ret[3], {'ok': True})
+        self.assertEqual(self.conn_cls.call_count, 1)
+        self.assertEqual(self.conn_cls.return_value.request.call_count, 3)
+        self.assertFalse(self.conn_cls.return_value.close.called)
+
+    def test_connection_closed_when_server_closes(self):
+        response = self.conn_cls.return_value.getresponse.return_value
+        response.will_close = True
+        self.proxy.rest_call('GET', '/networks', '', None)
+        self.proxy.rest_call('GET', '/networks', '', None)
+        self.assertEqual(self.conn_cls.call_count, 2)
+        self.assertEqual(self.proxy.connections, [])
+
+    def test_stale_connection_retried(self):
+        self.proxy.rest_call('GET', '/networks', '', None)
+        stale_conn = self.conn_cls.return_value
+        stale_conn.request.side_effect = socket.error()
+        new_conn = mock.Mock()
+        new_conn.getresponse.return_value = mock.Mock(
+            status=204, reason='No Content', will_close=False,
+            read=mock.Mock(return_value=''))
+        self.conn_cls.return_value = new_conn
+        ret = self.proxy.rest_call('DELETE', '/networks/net1', '', None)
+        self.assertEqual(ret[0], 204)
+        self.assertTrue(stale_conn.close.called)
+        self.assertEqual(self.proxy.connections, [new_conn])
+
+    def test_stale_connection_not_retried_for_post(self):
+        self.proxy.rest_call('GET', '/networks', '', None)
+        stale_conn = self.conn_cls.return_value
+        stale_conn.getresponse.side_effect = socket.error()
+        self.conn_cls.return_value = mock.Mock()
+        ret = self.proxy.rest_call('POST', '/networks', {}, None)
+        self.assertEqual(ret, (0, None, None, None))
+        self.assertTrue(stale_conn.close.called)
+        self.assertFalse(self.conn_cls.return_value.request.called)
+
+    def test_new_connection_failure(self):
+        self.conn_cls.return_value.request.side_effect = socket.error()
+        ret = self.proxy.rest_call('GET', '/networks', '', None)
+        self.assertEqual(ret, (0, None, None, None))
+        self.assertEqual(self.conn_cls.call_count, 1)
+        self.assertEqual(self.proxy.connections, [])
+
+
+class TestServerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = restproxy.ServerPool([('s1', 80), ('s2', 80)], False,
+                                         None, backoff=30)
+        self.s1, self.s2 = self.pool.servers
+        self.s1.rest_call = mock.Mock(return_value=(0, None, None, None))
+        self.s2.rest_call = mock.Mock(return_value=(200, 'OK', '', ''))
+
+    def test_unreachable_server_skipped(self):
+        self.assertEqual(self.pool.post('/networks', {})[0], 200)
+        self.assertEqual(self.pool.servers, [self.s2, self.s1])
+        self.assertFalse(self.s1.is_available())
+        self.s2.rest_call.return_value = (503, 'Unavailable', '', '')
+        # s1 is in its backoff period and is not tried again
+        self.assertEqual(self.pool.post('/networks', {})[0], 0)
+        self.assertEqual(self.s1.rest_call.call_count, 1)
+        self.assertTrue(self.s2.is_available())
+
+    def test_all_servers_unavailable_tried(self):
+        self.s1.mark_failed(30)
+        self.s2.mark_failed(30)
+        self.assertEqual(self.pool.post('/networks', {})[0], 200)
+        self.assertEqual(self.s1.rest_call.call_count, 1)
+        self.assertTrue(self.s2.is_available())
+
+    def test_backoff_expires(self):
+        with patch('time.time', return_value=1000):
+            self.pool.post('/networks', {})
+        with patch('time.time', return_value=1031):
+            self.assertTrue(self.s1.is_available())
+
+    def test_concurrent_gets(self):
+        self.pool.concurrent_gets = True
+        event = eventlet.event.Event()
+
+        def slow_call(*args):
+            event.wait()
+            return (200, 'OK', '', 'slow')
+
+        self.s1.rest_call.side_effect = slow_call
+        self.s2.rest_call.return_value = (200, 'OK', '', 'fast')
+        ret = self.pool.get('/networks')
+        self.assertEqual(ret[3], 'fast')
+        event.send()
+        eventlet.sleep(0)
+        self.assertEqual(self.s1.rest_call.call_count, 1)
@@ -0,0 +1,103 @@
+# Copyright (c) 2013 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest
+
+from quantum.plugins.cisco.nexus import cisco_nexus_session_pool as pool
+
+
+NEXUS_IP_ADDRESS = '1.1.1.1'
+NEXUS_USERNAME = 'username'
+NEXUS_PASSWORD = 'password'
+NEXUS_SSH_PORT = '22'
+
+
+class TestNexusSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = []
+        self.pool = pool.NexusSessionPool(self._connect)
+
+    def _connect(self, host, port, username, password):
+        session = mock.Mock()
+        session.connected = True
+        self.sessions.append(session)
+        return session
+
+    def _edit_config(self, config='<config/>'):
+        self.pool.edit_config(NEXUS_IP_ADDRESS, NEXUS_SSH_PORT,
+                              NEXUS_USERNAME, NEXUS_PASSWORD, config)
+
+    def test_session_reused(self):
+        for i in range(3):
+            self._edit_config()
+        self.assertEqual(len(self.sessions), 1)
+        self.assertEqual(self.sessions[0].edit_config.call_count, 3)
+        self.sessions[0].edit_config.assert_called_with(target='running',
+                                                        config='<config/>')
+
+    def test_sessions_per_switch(self):
+        self._edit_config()
+        self.pool.edit_config('2.2.2.2', NEXUS_SSH_PORT, NEXUS_USERNAME,
+                              NEXUS_PASSWORD, '<config/>')
+        self._edit_config()
+        self.assertEqual(len(self.sessions), 2)
+        self.assertEqual(self.sessions[0].edit_config.call_count, 2)
+
+    def test_lost_session_reconnects(self):
+        self._edit_config()
+
+        def lose_session(**kwargs):
+            self.sessions[0].connected = False
+            raise IOError()
+
+        self.sessions[0].edit_config.side_effect = lose_session
+        self._edit_config()
+        self.assertEqual(len(self.sessions), 2)
+        self.assertTrue(self.sessions[0].close_session.called)
+        self.assertEqual(self.sessions[1].edit_config.call_count, 1)
+        self._edit_config()
+        self.assertEqual(self.sessions[1].edit_config.call_count, 2)
+
+    def test_rejected_config_not_retried(self):
+        self._edit_config()
+        self.sessions[0].edit_config.side_effect = ValueError()
+        self.assertRaises(ValueError, self._edit_config)
+        self.assertEqual(len(self.sessions), 1)
+        self.sessions[0].edit_config.side_effect = None
+        self._edit_config()
+        self.assertEqual(len(self.sessions), 1)
+
+    def test_disconnected_idle_session_not_reused(self):
+        self._edit_config()
+        self.sessions[0].connected = False
+        self._edit_config()
+        self.assertEqual(len(self.sessions), 2)
+        self.assertEqual(self.sessions[0].edit_config.call_count, 1)
+
+    def test_expired_idle_session_not_reused(self):
+        self.pool.idle_timeout = 0
+        self._edit_config()
+        self._edit_config()
+        self.assertEqual(len(self.sessions), 2)
+        self.assertTrue(self.sessions[0].close_session.called)
+
+    def test_close(self):
+        self._edit_config()
+        self.pool.close()
+        self.assertTrue(self.sessions[0].close_session.called)
+        self._edit_config()
+        self.assertEqual(len(self.sessions), 2)
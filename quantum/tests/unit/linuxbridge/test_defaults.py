@@ -33,6 +33,11 @@ class ConfigurationTest(unittest.TestCase):
                          cfg.CONF.AGENT.polling_interval)
         self.assertEqual('sudo',
                          cfg.CONF.AGENT.root_helper)
+        self.assertFalse(cfg.CONF.AGENT.udev_events)
+        self.assertEqual(0.2,
+                         cfg.CONF.AGENT.udev_event_delay)
+        self.assertEqual(60,
+                         cfg.CONF.AGENT.resync_interval)
         self.assertEqual('local',
                          cfg.CONF.VLANS.tenant_network_type)
         self.assertEqual(0,
@@ -143,6 +143,14 @@ class NetworkStatesTest(unittest2.TestCase):
         lb_db.release_network(self.session, PHYS_NET, vlan_id, VLAN_RANGES)
         self.assertIsNone(lb_db.get_network_state(PHYS_NET, vlan_id))
 
+    def test_sync_keeps_allocated_networks(self):
+        physical_network, vlan_id = lb_db.reserve_network(self.session)
+        lb_db.sync_network_states(UPDATED_VLAN_RANGES)
+        self.assertTrue(lb_db.get_network_state(physical_network,
+                                                vlan_id).allocated)
+        physical_network, vlan_id = lb_db.reserve_network(self.session)
+        self.assertEqual(vlan_id, VLAN_MIN + 5)
+
 
 class NetworkBindingsTest(test_plugin.QuantumDbPluginV2TestCase):
     def setUp(self):
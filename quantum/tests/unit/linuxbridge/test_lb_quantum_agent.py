@@ -14,6 +14,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+
 import mock
 import unittest2 as unittest
 
@@ -51,3 +53,211 @@ class TestLinuxBridge(unittest.TestCase):
             result = self.linux_bridge.ensure_physical_in_bridge(
                 'network_id', 'physnet1', 7)
         self.assertTrue(vlan_bridge_func.called)
+
+
+class TestLinuxBridgeTopology(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(cfg.CONF.reset)
+        self.linux_bridge = linuxbridge_quantum_agent.LinuxBridge(
+            {'physnet1': 'eth1'}, cfg.CONF.AGENT.root_helper)
+        self.sysfs = sysfs = {
+            linuxbridge_quantum_agent.NET_FS: ['lo', 'eth1', 'eth1.7',
+                                               'brqnet1', 'brqnet2', 'tap1'],
+            linuxbridge_quantum_agent.BRIDGE_FS: ['brqnet1', 'brqnet2',
+                                                  'virbr0', 'tap1'],
+            '/sys/devices/virtual/net/brqnet1/brif/': ['eth1.7', 'tap1'],
+            '/sys/devices/virtual/net/brqnet2/brif/': [],
+        }
+
+        def listdir(path):
+            if path not in sysfs:
+                raise OSError()
+            return sysfs[path]
+
+        def exists(path):
+            directory, name = os.path.split(path)
+            return name in sysfs.get(directory + '/', ())
+
+        def execute(cmd, root_helper):
+            if cmd[:2] == ['brctl', 'addif']:
+                brif = '/sys/devices/virtual/net/%s/brif/' % cmd[2]
+                sysfs.setdefault(brif, []).append(cmd[3])
+            return ''
+
+        with mock.patch('os.listdir', side_effect=listdir) as self.listdir:
+            self.linux_bridge.topology
+        mock.patch('os.path.exists', side_effect=exists).start()
+        self.execute = mock.patch.object(linuxbridge_quantum_agent.utils,
+                                         'execute',
+                                         side_effect=execute).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_topology_built(self):
+        self.assertEqual(['brqnet1', 'brqnet2'],
+                         sorted(self.linux_bridge.get_all_quantum_bridges()))
+        self.assertEqual('brqnet1',
+                         self.linux_bridge.get_bridge_for_tap_device('tap1'))
+        self.assertTrue(self.linux_bridge.is_device_on_bridge('eth1.7'))
+        self.assertFalse(self.linux_bridge.is_device_on_bridge('eth1'))
+        self.assertTrue(self.linux_bridge.device_exists('eth1.7'))
+        self.assertFalse(self.execute.called)
+
+    def test_device_exists_probes_unknown_device(self):
+        self.assertTrue(self.linux_bridge.device_exists('tap2'))
+        self.assertTrue(self.linux_bridge.device_exists('tap2'))
+        self.assertEqual(1, self.execute.call_count)
+
+    def test_add_tap_interface(self):
+        self.linux_bridge.device_event('add', 'tap2')
+        self.assertTrue(self.linux_bridge.add_tap_interface(
+            'net2', 'physnet1', lconst.LOCAL_VLAN_ID, 'tap2'))
+        self.execute.assert_called_once_with(
+            ['brctl', 'addif', 'brqnet2', 'tap2'],
+            root_helper=cfg.CONF.AGENT.root_helper)
+        self.assertEqual('brqnet2',
+                         self.linux_bridge.get_bridge_for_tap_device('tap2'))
+
+    def test_ensure_vlan_bridge_existing(self):
+        self.linux_bridge.ensure_vlan_bridge('net1', 'eth1', 7)
+        self.assertFalse(self.execute.called)
+
+    def test_ensure_vlan_bridge_new(self):
+        self.linux_bridge.ensure_vlan_bridge('net3', 'eth1', 8)
+        self.assertTrue(self.linux_bridge.device_exists('eth1.8'))
+        self.assertTrue(self.linux_bridge.interface_exists_on_bridge(
+            'brqnet3', 'eth1.8'))
+
+    def test_ensure_flat_bridge_existing(self):
+        self.linux_bridge.topology.add_interface('brqnet2', 'eth1')
+        self.sysfs['/sys/devices/virtual/net/brqnet2/brif/'].append('eth1')
+        with mock.patch.object(self.linux_bridge,
+                               'get_interface_details') as details:
+            self.linux_bridge.ensure_flat_bridge('net2', 'eth1')
+        self.assertFalse(details.called)
+        self.assertFalse(self.execute.called)
+
+    def test_delete_vlan_bridge(self):
+        self.linux_bridge.delete_vlan_bridge('brqnet1')
+        self.assertNotIn('brqnet1',
+                         self.linux_bridge.get_all_quantum_bridges())
+        self.assertIsNone(self.linux_bridge.get_bridge_for_tap_device('tap1'))
+        self.assertNotIn('eth1.7', self.linux_bridge.topology.devices)
+
+    def test_stale_interface_not_on_bridge(self):
+        self.sysfs['/sys/devices/virtual/net/brqnet1/brif/'].remove('tap1')
+        self.assertIsNone(self.linux_bridge.get_bridge_for_tap_device('tap1'))
+        self.assertEqual(['eth1.7'],
+                         self.linux_bridge.get_interfaces_on_bridge(
+                             'brqnet1'))
+
+    def test_delete_vlan_bridge_removed_tap(self):
+        self.sysfs['/sys/devices/virtual/net/brqnet1/brif/'].remove('tap1')
+        self.linux_bridge.delete_vlan_bridge('brqnet1')
+        for call in self.execute.call_args_list:
+            self.assertNotIn('tap1', call[0][0])
+        self.assertNotIn('brqnet1',
+                         self.linux_bridge.get_all_quantum_bridges())
+
+    def test_removed_tap_added_again(self):
+        with mock.patch.object(linuxbridge_quantum_agent.
+                               LinuxBridgeQuantumAgentRPC,
+                               '__init__', return_value=None):
+            agent = linuxbridge_quantum_agent.LinuxBridgeQuantumAgentRPC()
+        agent.linux_br = self.linux_bridge
+        agent.plugin_rpc = mock.Mock()
+        agent.plugin_rpc.update_device_down.return_value = {'exists': True}
+        agent.context = mock.Mock()
+        agent.agent_id = 'lb1'
+        self.sysfs['/sys/devices/virtual/net/brqnet1/brif/'].remove('tap1')
+        with mock.patch.object(agent, 'remove_devices_filter'):
+            self.assertFalse(agent.treat_devices_removed(['tap1']))
+        self.assertNotIn('tap1', self.linux_bridge.topology.devices)
+        self.assertIsNone(self.linux_bridge.get_bridge_for_tap_device('tap1'))
+
+        # created again before the next rebuild of the topology
+        self.assertTrue(self.linux_bridge.add_tap_interface(
+            'net1', 'physnet1', lconst.LOCAL_VLAN_ID, 'tap1'))
+        self.execute.assert_called_with(
+            ['brctl', 'addif', 'brqnet1', 'tap1'],
+            root_helper=cfg.CONF.AGENT.root_helper)
+
+    def test_device_removed_event(self):
+        self.linux_bridge.device_event('remove', 'tap1')
+        self.assertIsNone(self.linux_bridge.get_bridge_for_tap_device('tap1'))
+        self.assertEqual([], self.linux_bridge.get_interfaces_on_bridge(
+            'brqnet2'))
+        self.assertEqual(['eth1.7'],
+                         self.linux_bridge.get_interfaces_on_bridge(
+                             'brqnet1'))
+
+    def test_invalidate_topology(self):
+        self.linux_bridge.invalidate_topology()
+        with mock.patch.object(linuxbridge_quantum_agent.BridgeTopology,
+                               'build') as build:
+            self.linux_bridge.topology
+            self.linux_bridge.topology
+        build.assert_called_once_with()
+
+
+class TestTapDeviceMonitor(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch('pyudev.Monitor.from_netlink'):
+            self.monitor = linuxbridge_quantum_agent.TapDeviceMonitor(
+                mock.Mock())
+
+    def test_tap_events_collected(self):
+        self.monitor.handle_event('add', 'tap1')
+        self.monitor.handle_event('add', 'eth1')
+        self.monitor.handle_event('change', 'tap2')
+        self.monitor.handle_event('add', 'tap3')
+        self.monitor.handle_event('remove', 'tap3')
+        self.assertEqual({'tap1': 'add', 'tap3': 'remove'},
+                         self.monitor.pop_events())
+        self.assertEqual({}, self.monitor.pop_events())
+
+    def test_device_callback(self):
+        callback = mock.Mock()
+        self.monitor.device_callback = callback
+        self.monitor.handle_event('add', 'eth1.7')
+        self.monitor.handle_event('change', 'eth1.7')
+        callback.assert_called_once_with('add', 'eth1.7')
+        self.assertEqual({}, self.monitor.pop_events())
+
+    def test_wait_returns_on_event(self):
+        self.monitor.handle_event('add', 'tap1')
+        with mock.patch('eventlet.sleep') as sleep:
+            self.monitor.wait(60, 0.2)
+        sleep.assert_called_once_with(0.2)
+
+    def test_wait_timeout(self):
+        self.monitor.pop_events()
+        self.monitor.wait(0.01, 0.2)
+        self.assertEqual({}, self.monitor.pop_events())
+
+
+class TestLinuxBridgeAgent(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.object(linuxbridge_quantum_agent.
+                               LinuxBridgeQuantumAgentRPC,
+                               '__init__', return_value=None):
+            self.agent = (linuxbridge_quantum_agent.
+                          LinuxBridgeQuantumAgentRPC())
+
+    def test_update_devices_from_events(self):
+        registered = set(['tap1', 'tap2'])
+        events = {'tap2': 'remove', 'tap3': 'add', 'tap1': 'add',
+                  'tap4': 'remove'}
+        self.assertEqual({'current': set(['tap1', 'tap3']),
+                          'added': set(['tap3']),
+                          'removed': set(['tap2'])},
+                         self.agent.update_devices_from_events(registered,
+                                                               events))
+
+    def test_update_devices_from_events_no_change(self):
+        registered = set(['tap1'])
+        self.assertEqual(None,
+                         self.agent.update_devices_from_events(
+                             registered, {'tap1': 'add'}))
@@ -178,6 +178,35 @@ class MetaQuantumPluginV2Test(unittest.TestCase):
         self.plugin.delete_network(self.context, ret2['id'])
         self.plugin.delete_network(self.context, ret3['id'])
 
+    def test_get_networks_one_call_per_flavor(self):
+        flavors = ['fake1', 'fake2', 'fake1', 'proxy']
+        nets = [self.plugin.create_network(self.context,
+                                           self._fake_network(flavor))
+                for flavor in flavors]
+        plugins = self.plugin.plugins
+        with mock.patch.object(plugins['fake1'], 'get_networks',
+                               wraps=plugins['fake1'].get_networks) as get1:
+            with mock.patch.object(plugins['fake1'], 'get_network') as get:
+                db_nets = self.plugin.get_networks(self.context)
+                self.assertEqual(get1.call_count, 1)
+                self.assertFalse(get.called)
+        ids = get1.call_args[1]['filters']['id']
+        self.assertEqual(sorted(ids), sorted([nets[0]['id'], nets[2]['id']]))
+        self.assertEqual(sorted((net['id'], net['name'], net[FLAVOR_NETWORK],
+                                 net['router:external'])
+                                for net in db_nets),
+                         sorted((net['id'], net['name'], net[FLAVOR_NETWORK],
+                                 False)
+                                for net in nets))
+
+        db_nets = self.plugin.get_networks(self.context,
+                                           {FLAVOR_NETWORK: ['fake1']},
+                                           fields=['name', FLAVOR_NETWORK])
+        self.assertEqual(db_nets, [{'name': 'fake1', FLAVOR_NETWORK: 'fake1'},
+                                   {'name': 'fake1', FLAVOR_NETWORK: 'fake1'}])
+        for net in nets:
+            self.plugin.delete_network(self.context, net['id'])
+
     def test_create_delete_port(self):
         network1 = self._fake_network('fake1')
         network_ret1 = self.plugin.create_network(self.context, network1)
@@ -290,6 +319,23 @@ class MetaQuantumPluginV2Test(unittest.TestCase):
         with self.assertRaises(FlavorNotFound):
             self.plugin.get_router(self.context, router_ret1['id'])
 
+    def test_get_routers_one_call_per_flavor(self):
+        routers = [self.plugin.create_router(self.context,
+                                             self._fake_router(flavor))
+                   for flavor in ['fake1', 'fake2', 'fake2']]
+        l3_plugins = self.plugin.l3_plugins
+        with mock.patch.object(l3_plugins['fake2'], 'get_routers',
+                               wraps=l3_plugins['fake2'].get_routers) as get2:
+            db_routers = self.plugin.get_routers(self.context,
+                                                 fields=['id', FLAVOR_ROUTER])
+            self.assertEqual(get2.call_count, 1)
+        self.assertEqual(sorted(db_routers),
+                         sorted({'id': router['id'],
+                                 FLAVOR_ROUTER: router[FLAVOR_ROUTER]}
+                                for router in routers))
+        for router in routers:
+            self.plugin.delete_router(self.context, router['id'])
+
     def test_extension_method(self):
         self.assertEqual('fake1', self.plugin.fake_func())
         self.assertEqual('fake2', self.plugin.fake_func2())
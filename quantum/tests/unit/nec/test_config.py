@@ -36,3 +36,8 @@ class ConfigurationTest(unittest.TestCase):
         self.assertFalse(config.CONF.OFC.use_ssl)
         self.assertEqual(None, config.CONF.OFC.key_file)
         self.assertEqual(None, config.CONF.OFC.cert_file)
+        self.assertFalse(config.CONF.OFC.async_operations)
+        self.assertEqual(4, config.CONF.OFC.task_workers)
+        self.assertEqual(3, config.CONF.OFC.task_retries)
+        self.assertEqual(2, config.CONF.OFC.task_retry_interval)
+        self.assertEqual(10, config.CONF.OFC.task_poll_interval)
@@ -139,3 +139,14 @@ class NECPluginV2DBTest(unittest.TestCase):
         ndb.del_portinfo(i)
         portinfo_none = ndb.get_portinfo(i)
         self.assertEqual(None, portinfo_none)
+
+    def testg_get_portinfos(self):
+        """test get portinfos"""
+        i, d, p, v, m, n = self.get_portinfo_random_params()
+        i2 = uuidutils.generate_uuid()
+        ndb.add_portinfo(i, d, p, v, m)
+        ndb.add_portinfo(i2, d, p, v, m)
+        portinfos = ndb.get_portinfos([i, i2, n])
+        self.assertEqual(set([i, i2]), set(portinfos.keys()))
+        self.assertEqual(portinfos[i].datapath_id, d)
+        self.assertEqual({}, ndb.get_portinfos([]))
@@ -13,6 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import shutil
+import tempfile
+
+import mock
+
+from quantum import manager
+from quantum.plugins.nec.common import config
+from quantum.plugins.nec.common import exceptions as nexc
+from quantum.plugins.nec.db import api as ndb
 from quantum.tests.unit import test_db_plugin as test_plugin
 
 
@@ -39,3 +49,59 @@ class TestNecPortsV2(test_plugin.TestPortsV2, NecPluginV2TestCase):
 
 class TestNecNetworksV2(test_plugin.TestNetworksV2, NecPluginV2TestCase):
     pass
+
+
+class TestNecAsyncOperations(NecPluginV2TestCase):
+
+    def setUp(self):
+        driver = "quantum.tests.unit.nec.stub_ofc_driver.StubOFCDriver"
+        config.CONF.set_override('driver', driver, 'OFC')
+        config.CONF.set_override('async_operations', True, 'OFC')
+        # NOTE: the OFC task workers run in their own green threads, each
+        # getting its own connection: use a database they all share
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        config.CONF.set_override('sql_connection', 'sqlite:///%s' %
+                                 os.path.join(tempdir, 'nec.sqlite'),
+                                 'DATABASE')
+        super(TestNecAsyncOperations, self).setUp()
+        self.plugin = manager.QuantumManager.get_plugin()
+        self.addCleanup(self.plugin.ofc_tasks.stop)
+
+    def _apply_ofc_tasks(self):
+        self.plugin.ofc_tasks.dispatch()
+        self.plugin.ofc_tasks.wait()
+
+    def test_network_active_once_applied(self):
+        with mock.patch.object(self.plugin.ofc_tasks, 'dispatch'):
+            with self.network() as net:
+                net_id = net['network']['id']
+                req = self.new_show_request('networks', net_id)
+                res = self.deserialize('json', req.get_response(self.api))
+                self.assertEqual('BUILD', res['network']['status'])
+                task = ndb.get_next_ofc_task(self._tenant_id)
+                self.assertEqual('create_network', task.method)
+        self._apply_ofc_tasks()
+        self.assertEqual(None, ndb.get_next_ofc_task(self._tenant_id))
+        self.assertFalse(self.plugin.ofc.exists_ofc_network(net_id))
+        self.assertFalse(self.plugin.ofc.exists_ofc_tenant(self._tenant_id))
+
+    def test_network_status_updated(self):
+        with self.network() as net:
+            net_id = net['network']['id']
+            self._apply_ofc_tasks()
+            req = self.new_show_request('networks', net_id)
+            res = self.deserialize('json', req.get_response(self.api))
+            self.assertEqual('ACTIVE', res['network']['status'])
+            self.assertTrue(self.plugin.ofc.exists_ofc_network(net_id))
+
+    def test_network_error_after_retries(self):
+        config.CONF.set_override('task_retries', 0, 'OFC')
+        self.plugin.ofc_tasks.retries = 0
+        with mock.patch.object(self.plugin.ofc.driver, 'create_network',
+                               side_effect=nexc.OFCException(reason='x')):
+            with self.network() as net:
+                self._apply_ofc_tasks()
+                req = self.new_show_request('networks', net['network']['id'])
+                res = self.deserialize('json', req.get_response(self.api))
+                self.assertEqual('ERROR', res['network']['status'])
@@ -0,0 +1,75 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 NEC Corporation.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib
+import socket
+import unittest
+
+import mock
+
+from quantum.plugins.nec.common import exceptions as nexc
+from quantum.plugins.nec.common import ofc_client
+
+
+class OFCClientTest(unittest.TestCase):
+    """Class consisting of OFCClient unit tests"""
+
+    def setUp(self):
+        self.client = ofc_client.OFCClient()
+        self.conns = []
+        patcher = mock.patch.object(self.client, 'get_connection_type')
+        self.addCleanup(patcher.stop)
+        patcher.start().return_value = self._new_connection
+
+    def _new_connection(self, host, port):
+        conn = mock.Mock()
+        res = conn.getresponse.return_value
+        res.status = httplib.OK
+        res.read.return_value = '{"id": "ofc-id"}'
+        res.will_close = False
+        self.conns.append(conn)
+        return conn
+
+    def test_connection_reused(self):
+        for i in range(3):
+            self.assertEqual({'id': 'ofc-id'},
+                             self.client.post('/tenants', {'id': 'x'}))
+        self.assertEqual(1, len(self.conns))
+        self.assertEqual(3, self.conns[0].request.call_count)
+
+    def test_connection_closed_by_ofc_is_not_reused(self):
+        self.client.get('/tenants')
+        self.conns[0].getresponse.return_value.will_close = True
+        self.client.get('/tenants')
+        self.client.get('/tenants')
+        self.assertEqual(2, len(self.conns))
+        self.assertTrue(self.conns[0].close.called)
+
+    def test_stale_connection_reconnects(self):
+        self.client.get('/tenants')
+        self.conns[0].request.side_effect = socket.error('reset')
+        self.assertEqual({'id': 'ofc-id'}, self.client.get('/tenants'))
+        self.assertEqual(2, len(self.conns))
+        self.assertTrue(self.conns[0].close.called)
+        self.assertEqual([self.conns[1]], self.client.connections)
+
+    def test_connection_error_raises_ofc_exception(self):
+        self.client.get('/tenants')
+        self.conns[0].request.side_effect = socket.error('reset')
+        with mock.patch.object(self.client, '_new_connection') as new_conn:
+            new_conn.return_value.request.side_effect = socket.error('down')
+            self.assertRaises(nexc.OFCException, self.client.get, '/tenants')
+        self.assertEqual([], self.client.connections)
@@ -17,6 +17,8 @@
 
 import unittest
 
+import mock
+
 from quantum.openstack.common import uuidutils
 from quantum.plugins.nec.common import config
 from quantum.plugins.nec.db import api as ndb
@@ -158,3 +160,49 @@ class OFCManagerTest(unittest.TestCase):
         self.assertTrue(ndb.find_ofc_item(nmodels.OFCFilter, f))
         self.ofc.delete_ofc_packet_filter(t, n, f)
         self.assertFalse(ndb.find_ofc_item(nmodels.OFCFilter, f))
+
+    def _cached_ofc_manager(self):
+        config.CONF.set_override('cache_ofc_ids', True, 'OFC')
+        self.addCleanup(config.CONF.clear_override, 'cache_ofc_ids', 'OFC')
+        return ofc_manager.OFCManager()
+
+    def testm_mappings_loaded_at_startup(self):
+        """test mappings are loaded when the cache is enabled"""
+        t, n, p, f, none = self.get_random_params()
+        ndb.add_ofc_item(nmodels.OFCTenant, "ofc-" + t, t)
+        ndb.add_ofc_item(nmodels.OFCNetwork, "ofc-" + n, n)
+        ofc = self._cached_ofc_manager()
+        with mock.patch.object(ndb, 'find_ofc_item') as find_ofc_item:
+            self.assertTrue(ofc.exists_ofc_tenant(t))
+            self.assertTrue(ofc.exists_ofc_network(n))
+        self.assertFalse(find_ofc_item.called)
+
+    def testn_mappings_lookup_without_db_query(self):
+        """test cached mappings are looked up in memory"""
+        t, n, p, f, none = self.get_random_params()
+        ofc = self._cached_ofc_manager()
+        ofc.create_ofc_tenant(t)
+        ofc.create_ofc_network(t, n)
+        with mock.patch.object(ndb, 'find_ofc_item') as find_ofc_item:
+            self.assertTrue(ofc.exists_ofc_network(n))
+            ofc.update_ofc_network(t, n, 'name')
+        self.assertFalse(find_ofc_item.called)
+
+    def testo_mappings_missing_from_cache(self):
+        """test mappings added by another server are found in the db"""
+        t, n, p, f, none = self.get_random_params()
+        ofc = self._cached_ofc_manager()
+        self.assertFalse(ofc.exists_ofc_tenant(t))
+        # the tenant is created by another server
+        ndb.add_ofc_item(nmodels.OFCTenant, "ofc-" + t, t)
+        self.assertTrue(ofc.exists_ofc_tenant(t))
+        ofc.create_ofc_network(t, n)
+        self.assertTrue(ofc.exists_ofc_network(n))
+
+    def testp_mappings_not_cached_by_default(self):
+        """test mappings are looked up in the db without the cache"""
+        t, n, p, f, none = self.get_random_params()
+        self.ofc.create_ofc_tenant(t)
+        # the tenant is deleted by another server
+        ndb.del_ofc_item(nmodels.OFCTenant, "ofc-" + t[:-4])
+        self.assertFalse(self.ofc.exists_ofc_tenant(t))
@@ -0,0 +1,161 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2013 NEC Corporation.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import eventlet
+
+from quantum.db import api as db
+from quantum.openstack.common import cfg
+from quantum.openstack.common import timeutils
+from quantum.plugins.nec.common import exceptions as nexc
+from quantum.plugins.nec.db import api as ndb
+from quantum.plugins.nec import ofc_task_queue
+
+
+class OFCTaskQueueTest(unittest.TestCase):
+    """Class consisting of OFCTaskQueue unit tests"""
+
+    def setUp(self):
+        # NOTE: the workers run in their own green threads, each getting
+        # its own connection: an in-memory database would not be shared
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        cfg.CONF.set_override('sql_connection', 'sqlite:///%s' %
+                              os.path.join(tempdir, 'ofc.sqlite'),
+                              'DATABASE')
+        self.addCleanup(cfg.CONF.clear_override, 'sql_connection',
+                        'DATABASE')
+        ndb.initialize()
+        self.applied = []
+        self.failed = []
+        self.errors = {}
+        self.queue = ofc_task_queue.OFCTaskQueue(self.apply_task,
+                                                 self.fail_task,
+                                                 retries=2, retry_interval=0)
+
+    def tearDown(self):
+        self.queue.stop()
+        ndb.clear_db()
+
+    def apply_task(self, method, args):
+        # yield to let the tasks of other keys run concurrently
+        eventlet.sleep(0)
+        if self.errors.get(args['id']):
+            self.errors[args['id']] -= 1
+            raise nexc.OFCException(reason='error')
+        self.applied.append((method, args['id']))
+
+    def fail_task(self, method, args, exc):
+        self.failed.append((method, args['id']))
+
+    def run_queue(self):
+        for i in range(10):
+            self.queue.dispatch()
+            self.queue.wait()
+
+    def test_tasks_applied_in_order_per_key(self):
+        for i in range(3):
+            self.queue.enqueue('net1', 'create_port', {'id': 'a%d' % i})
+            self.queue.enqueue('net2', 'create_port', {'id': 'b%d' % i})
+        self.run_queue()
+        self.assertEqual([('create_port', 'a0'), ('create_port', 'a1'),
+                          ('create_port', 'a2')],
+                         [t for t in self.applied if t[1][0] == 'a'])
+        self.assertEqual([('create_port', 'b0'), ('create_port', 'b1'),
+                          ('create_port', 'b2')],
+                         [t for t in self.applied if t[1][0] == 'b'])
+        # the keys were processed concurrently
+        self.assertNotEqual(self.applied[:3], sorted(self.applied[:3]))
+        self.assertEqual(None, ndb.get_next_ofc_task('net1'))
+
+    def test_failed_task_is_retried_before_next_tasks(self):
+        self.errors['p1'] = 2
+        self.queue.enqueue('net1', 'create_port', {'id': 'p1'})
+        self.queue.enqueue('net1', 'create_port', {'id': 'p2'})
+        self.queue.dispatch()
+        self.queue.wait()
+        self.assertEqual([], self.applied)
+        task = ndb.get_next_ofc_task('net1')
+        self.assertEqual(1, task.attempts)
+
+        self.run_queue()
+        self.assertEqual([('create_port', 'p1'), ('create_port', 'p2')],
+                         self.applied)
+        self.assertEqual([], self.failed)
+
+    def test_task_failed_after_retries(self):
+        self.errors['p1'] = 3
+        self.queue.enqueue('net1', 'delete_port', {'id': 'p1'})
+        self.queue.enqueue('net1', 'delete_port', {'id': 'p2'})
+        self.run_queue()
+        self.assertEqual([('delete_port', 'p1')], self.failed)
+        self.assertEqual([('delete_port', 'p2')], self.applied)
+        self.assertEqual(None, ndb.get_next_ofc_task('net1'))
+
+    def test_pending_tasks_resumed_by_new_queue(self):
+        self.queue.enqueue('net1', 'create_network', {'id': 'net1'})
+        queue = ofc_task_queue.OFCTaskQueue(self.apply_task, self.fail_task)
+        queue.dispatch()
+        queue.wait()
+        self.assertEqual([('create_network', 'net1')], self.applied)
+
+    def test_started_queue_applies_new_tasks(self):
+        self.queue.start(poll_interval=60)
+        self.queue.enqueue('net1', 'create_network', {'id': 'net1'})
+        for i in range(10):
+            if self.applied:
+                break
+            eventlet.sleep(0.01)
+        self.assertEqual([('create_network', 'net1')], self.applied)
+
+    def test_task_claimed_by_another_server(self):
+        self.queue.enqueue('net1', 'create_network', {'id': 'net1'})
+        task = ndb.get_next_ofc_task('net1')
+        now = timeutils.utcnow()
+        self.assertTrue(ndb.claim_ofc_task(
+            task.id, 'other', now, now + datetime.timedelta(seconds=60)))
+        self.run_queue()
+        self.assertEqual([], self.applied)
+
+        # the other server died, its claim expired
+        self.assertTrue(ndb.claim_ofc_task(
+            task.id, 'other', now, now - datetime.timedelta(seconds=1)))
+        self.run_queue()
+        self.assertEqual([('create_network', 'net1')], self.applied)
+
+    def test_task_claimed_once(self):
+        self.queue.enqueue('net1', 'create_network', {'id': 'net1'})
+        task = ndb.get_next_ofc_task('net1')
+        now = timeutils.utcnow()
+        until = now + datetime.timedelta(seconds=60)
+        self.assertTrue(ndb.claim_ofc_task(task.id, 'server1', now, until))
+        self.assertFalse(ndb.claim_ofc_task(task.id, 'server2', now, until))
+
+    def test_task_queued_in_caller_transaction(self):
+        session = db.get_session()
+        try:
+            with session.begin():
+                self.queue.enqueue('net1', 'create_network', {'id': 'net1'},
+                                   session=session)
+                raise nexc.NECDBException()
+        except nexc.NECDBException:
+            pass
+        self.assertEqual(None, ndb.get_next_ofc_task('net1'))
@@ -0,0 +1,120 @@
+# Copyright (C) 2013 Nicira Networks, Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib
+import unittest
+
+import mock
+
+from quantum.plugins.nicira.nicira_nvp_plugin.api_client import (
+    client as nac,
+    client_eventlet as nace,
+    request_eventlet as nare,
+)
+
+
+PROVIDER_1 = ("10.0.0.1", 443, True)
+PROVIDER_2 = ("10.0.0.2", 443, True)
+
+
+class NvpApiClientEventletTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = nace.NvpApiClientEventlet(
+            [PROVIDER_1, PROVIDER_2], "admin", "admin",
+            concurrent_connections=2,
+            provider_connections={PROVIDER_2: 3})
+
+    def _acquire_all(self):
+        conns = []
+        while not self.client._conn_pool.empty():
+            conns.append(self.client.acquire_connection(auto_login=False))
+        return conns
+
+    def test_pool_sized_per_provider(self):
+        conns = self._acquire_all()
+        providers = [nac.NvpApiClient._conn_params(c) for c in conns]
+        self.assertEqual(providers.count(PROVIDER_1), 2)
+        self.assertEqual(providers.count(PROVIDER_2), 3)
+
+    def test_redirect_provider_uses_default_pool_size(self):
+        self.assertEqual(
+            self.client._provider_connections(("10.0.0.3", 443, True)), 2)
+
+    def test_faster_provider_is_preferred(self):
+        conns = self._acquire_all()
+        for conn in conns:
+            provider = nac.NvpApiClient._conn_params(conn)
+            self.client.record_request(
+                conn, provider == PROVIDER_1 and 0.5 or 0.1)
+        for conn in conns:
+            self.client.release_connection(conn)
+        conn = self.client.acquire_connection(auto_login=False)
+        self.assertEqual(nac.NvpApiClient._conn_params(conn), PROVIDER_2)
+
+    def test_failed_connection_is_demoted(self):
+        conns = self._acquire_all()
+        for conn in conns:
+            self.client.record_request(conn, 0.1)
+            self.client.release_connection(
+                conn, bad_state=nac.NvpApiClient._conn_params(conn) ==
+                PROVIDER_2)
+        for i in range(2):
+            conn = self.client.acquire_connection(auto_login=False)
+            self.assertEqual(nac.NvpApiClient._conn_params(conn), PROVIDER_1)
+
+    def test_stats(self):
+        conn = self.client.acquire_connection(auto_login=False)
+        self.client.record_request(conn, 0.2)
+        self.client.record_request(conn, 0.4)
+        self.client.record_request(conn, 1.0, error=True)
+        stats = self.client.get_stats()
+        self.assertEqual(stats['pool_wait']['count'], 1)
+        self.assertEqual(stats['available_connections'], 4)
+        host, port, is_ssl = nac.NvpApiClient._conn_params(conn)
+        provider = stats['providers']['https://%s:%s' % (host, port)]
+        self.assertEqual(provider['requests'], 3)
+        self.assertEqual(provider['errors'], 1)
+        self.assertAlmostEqual(provider['latency'],
+                               0.2 + nac.LATENCY_EWMA_WEIGHT * 0.2)
+        self.assertEqual(provider['max_latency'], 0.4)
+
+    def test_server_error_does_not_improve_latency(self):
+        conns = self._acquire_all()
+        for conn in conns:
+            provider = nac.NvpApiClient._conn_params(conn)
+            self.client.record_request(
+                conn, provider == PROVIDER_1 and 0.1 or 0.5)
+        conn = [c for c in conns
+                if nac.NvpApiClient._conn_params(c) == PROVIDER_2][0]
+        response = mock.Mock(status=httplib.SERVICE_UNAVAILABLE)
+        response.getheaders.return_value = []
+        response.getheader.return_value = None
+        conn.sock = mock.Mock()
+        conn.request = mock.Mock()
+        conn.getresponse = mock.Mock(return_value=response)
+        req = nare.NvpApiRequestEventlet(self.client, "/ws.v1/_debug")
+        with mock.patch.object(self.client, 'acquire_connection',
+                               return_value=conn):
+            req._issue_request()
+        conns.remove(conn)
+        for c in conns:
+            self.client.release_connection(c)
+        stats = self.client._provider_stats(PROVIDER_2)
+        self.assertEqual(stats['latency'], 0.5)
+        self.assertEqual(stats['requests'], 4)
+        self.assertEqual(stats['errors'], 1)
+        for i in range(2):
+            conn = self.client.acquire_connection(auto_login=False)
+            self.assertEqual(nac.NvpApiClient._conn_params(conn), PROVIDER_1)
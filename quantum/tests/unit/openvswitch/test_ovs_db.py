@@ -17,6 +17,7 @@ import unittest2
 
 from quantum.common import exceptions as q_exc
 from quantum.db import api as db
+from quantum.db import segmentation_db
 from quantum.plugins.openvswitch import ovs_db_v2
 from quantum.tests.unit import test_db_plugin as test_plugin
 
@@ -254,6 +255,35 @@ class TunnelAllocationsTest(unittest2.TestCase):
         ovs_db_v2.release_tunnel(self.session, tunnel_id, TUNNEL_RANGES)
         self.assertIsNone(ovs_db_v2.get_tunnel_allocation(tunnel_id))
 
+    def test_sync_large_tunnel_range(self):
+        ovs_db_v2.sync_tunnel_allocations([(1, 2 ** 24 - 1)])
+        self.assertEqual(self.session.query(
+            segmentation_db.SegmentationIdRange).count(), 1)
+        self.assertFalse(ovs_db_v2.get_tunnel_allocation(2 ** 24 - 1).
+                         allocated)
+        self.assertIsNone(ovs_db_v2.get_tunnel_allocation(2 ** 24))
+        self.assertEqual(ovs_db_v2.reserve_tunnel(self.session), 1)
+
+    def test_sync_keeps_allocated_tunnels(self):
+        tunnel_id = ovs_db_v2.reserve_tunnel(self.session)
+        ovs_db_v2.sync_tunnel_allocations(UPDATED_TUNNEL_RANGES)
+        self.assertTrue(ovs_db_v2.get_tunnel_allocation(tunnel_id).allocated)
+        ovs_db_v2.release_tunnel(self.session, tunnel_id,
+                                 UPDATED_TUNNEL_RANGES)
+        self.assertIsNone(ovs_db_v2.get_tunnel_allocation(tunnel_id))
+
+    def test_specific_tunnels_split_and_merge_ranges(self):
+        query = self.session.query(segmentation_db.SegmentationIdRange)
+        for tunnel_id in (TUN_MIN + 3, TUN_MIN + 5, TUN_MIN + 4):
+            ovs_db_v2.reserve_specific_tunnel(self.session, tunnel_id)
+        self.assertEqual(query.count(), 2)
+        ovs_db_v2.release_tunnel(self.session, TUN_MIN + 3, TUNNEL_RANGES)
+        ovs_db_v2.release_tunnel(self.session, TUN_MIN + 5, TUNNEL_RANGES)
+        self.assertEqual(query.count(), 2)
+        ovs_db_v2.release_tunnel(self.session, TUN_MIN + 4, TUNNEL_RANGES)
+        self.assertEqual([(r.first_id, r.last_id) for r in query],
+                         [(TUN_MIN, TUN_MAX)])
+
 
 class NetworkBindingsTest(test_plugin.QuantumDbPluginV2TestCase):
     def setUp(self):
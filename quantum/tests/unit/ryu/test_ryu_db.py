@@ -18,6 +18,7 @@
 from contextlib import nested
 import operator
 
+from quantum.common import exceptions as q_exc
 from quantum.db import api as db
 from quantum.openstack.common import cfg
 # NOTE: this import is needed for correct plugin code work
@@ -75,3 +76,39 @@ class RyuDBTest(test_plugin.QuantumDbPluginV2TestCase):
 
                 tunnel_key.delete(session, network_id1)
                 self.assertEqual(tunnel_key.all_list(), [])
+
+    def test_key_reused_after_delete(self):
+        tunnel_key = db_api_v2.TunnelKey(1, 3)
+        session = db.get_session()
+        with nested(self.network('network-0'),
+                    self.network('network-1'),
+                    self.network('network-2')
+                    ) as (network_0, network_1, network_2):
+            network_ids = [net['network']['id']
+                           for net in (network_0, network_1, network_2)]
+            keys = [tunnel_key.allocate(session, net_id)
+                    for net_id in network_ids]
+            self.assertEqual(keys, [1, 2, 3])
+            self.assertRaises(q_exc.ResourceExhausted,
+                              tunnel_key.allocate, session, network_ids[0])
+
+            tunnel_key.delete(session, network_ids[1])
+            self.assertEqual(tunnel_key.allocate(session, network_ids[1]), 2)
+
+            for net_id in network_ids:
+                tunnel_key.delete(session, net_id)
+
+    def test_allocated_keys_synced_at_startup(self):
+        session = db.get_session()
+        with nested(self.network('network-0'),
+                    self.network('network-1')
+                    ) as (network_0, network_1):
+            network_id0 = network_0['network']['id']
+            network_id1 = network_1['network']['id']
+            key0 = db_api_v2.TunnelKey(1, 3).allocate(session, network_id0)
+            key1 = db_api_v2.TunnelKey(1, 3).allocate(session, network_id1)
+            self.assertEqual((key0, key1), (1, 2))
+
+            tunnel_key = db_api_v2.TunnelKey(1, 3)
+            tunnel_key.delete(session, network_id0)
+            tunnel_key.delete(session, network_id1)
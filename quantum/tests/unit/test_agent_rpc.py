@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import sys
 import unittest
 
 import mock
@@ -22,6 +23,7 @@ import mock
 from quantum.agent import rpc
 from quantum.openstack.common import cfg
 from quantum.openstack.common import context
+from quantum.openstack.common.rpc import common as rpc_common
 
 
 class AgentRPCPluginApi(unittest.TestCase):
@@ -47,6 +49,63 @@ class AgentRPCPluginApi(unittest.TestCase):
     def test_tunnel_sync(self):
         self._test_rpc_call('tunnel_sync')
 
+    def test_get_devices_details_list(self):
+        agent = rpc.PluginApi('fake_topic')
+        ctxt = context.RequestContext('fake_user', 'fake_project')
+        with mock.patch('quantum.openstack.common.rpc.call') as rpc_call:
+            rpc_call.return_value = [{'result': 'foo'}, {'result': 'bar'}]
+            actual_val = agent.get_devices_details_list(
+                ctxt, ['dev1', 'dev2'], 'fake_agent_id')
+        self.assertEqual(actual_val, ['foo', 'bar'])
+        self.assertEqual(rpc_call.call_count, 1)
+        msg = rpc_call.call_args[0][2]
+        self.assertEqual(msg['method'], 'batch_call')
+        self.assertEqual([c['args']['device'] for c in msg['args']['calls']],
+                         ['dev1', 'dev2'])
+        self.assertEqual([c['version'] for c in msg['args']['calls']],
+                         ['1.0', '1.0'])
+
+
+class AgentRPCBatchCall(unittest.TestCase):
+    def setUp(self):
+        self.agent = rpc.PluginApi('fake_topic')
+        self.ctxt = context.RequestContext('fake_user', 'fake_project')
+        self.msgs = [self.agent.make_msg('foo', arg=1),
+                     self.agent.make_msg('bar', arg=2)]
+
+    def test_batch_call_empty(self):
+        with mock.patch('quantum.openstack.common.rpc.call') as rpc_call:
+            self.assertEqual(self.agent.batch_call(self.ctxt, []), [])
+        self.assertFalse(rpc_call.called)
+
+    def test_batch_call_returns_failures(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            failure = rpc_common.serialize_remote_exception(
+                sys.exc_info(), log_failure=False)
+        with mock.patch('quantum.openstack.common.rpc.call') as rpc_call:
+            rpc_call.return_value = [{'result': 'foo'},
+                                     {'failure': failure}]
+            results = self.agent.batch_call(self.ctxt, self.msgs)
+        self.assertEqual(results[0], 'foo')
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_batch_call_falls_back_to_serial_calls(self):
+        def fake_call(ctxt, topic, msg, timeout):
+            if msg['method'] == 'batch_call':
+                raise AttributeError("No such RPC function 'batch_call'")
+            elif msg['method'] == 'bar':
+                raise ValueError('boom')
+            return msg['args']['arg']
+
+        with mock.patch('quantum.openstack.common.rpc.call') as rpc_call:
+            rpc_call.side_effect = fake_call
+            results = self.agent.batch_call(self.ctxt, self.msgs)
+        self.assertEqual(rpc_call.call_count, 3)
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], ValueError)
+
 
 class AgentRPCMethods(unittest.TestCase):
     def test_create_consumers(self):
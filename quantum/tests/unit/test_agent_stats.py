@@ -0,0 +1,117 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import socket
+import tempfile
+
+import eventlet
+import mock
+import unittest2 as unittest
+
+from quantum.agent.common import stats
+from quantum.agent.linux import iptables_manager
+from quantum.agent.linux import utils
+from quantum.openstack.common import jsonutils
+from quantum.openstack.common.rpc import proxy
+
+
+class TestStats(unittest.TestCase):
+    def test_timer(self):
+        timer = stats.Timer()
+        for duration in (0.0005, 0.001, 0.05, 0.07, 30):
+            timer.record(duration)
+        res = timer.to_dict()
+        self.assertAlmostEqual(res.pop('total'), 30.1215)
+        self.assertEqual(res,
+                         {'count': 5,
+                          'max': 30,
+                          'buckets': {'<=0.001': 2, '<=0.01': 0,
+                                      '<=0.1': 2, '<=1': 0, '<=10': 0,
+                                      '>10': 1}})
+
+    def test_stats(self):
+        agent_stats = stats.Stats()
+        agent_stats.record('op', 0.5)
+        with agent_stats.timed('op'):
+            pass
+        agent_stats.incr('counter')
+        agent_stats.incr('counter', 2)
+        res = agent_stats.to_dict()
+        self.assertEqual(res['timers']['op']['count'], 2)
+        self.assertEqual(res['counters'], {'counter': 3})
+
+
+class TestStatsServer(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+    def test_serve_stats(self):
+        path = os.path.join(self.tempdir, 'agent', 'stats')
+        agent_stats = stats.Stats()
+        agent_stats.incr('counter')
+        stats.StatsServer(path, agent_stats).start()
+
+        client = eventlet.connect(path, family=socket.AF_UNIX)
+        data = ''
+        while True:
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        self.assertEqual(jsonutils.loads(data), agent_stats.to_dict())
+
+    def test_start_server_disabled(self):
+        conf = mock.Mock(stats_socket='')
+        with mock.patch.object(stats, 'StatsServer') as server:
+            stats.start_server(conf)
+            self.assertFalse(server.called)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.stats = stats.Stats()
+        stats_p = mock.patch.multiple(stats, record=self.stats.record,
+                                      incr=self.stats.incr,
+                                      timed=self.stats.timed)
+        stats_p.start()
+        self.addCleanup(stats_p.stop)
+
+    def test_execute(self):
+        utils.execute(['true'])
+        utils.execute(['/bin/true'], root_helper='env')
+        self.assertEqual(self.stats.timers['execute.true'].count, 2)
+
+    def test_rpc_call(self):
+        stats.install()
+        rpc_proxy = proxy.RpcProxy('topic', '1.0')
+        with mock.patch('quantum.openstack.common.rpc.call') as call:
+            rpc_proxy.call('ctxt', rpc_proxy.make_msg('get_info'))
+            self.assertTrue(call.called)
+        self.assertEqual(self.stats.timers['rpc.get_info'].count, 1)
+
+    def test_iptables_apply(self):
+        iptables = iptables_manager.IptablesManager(root_helper='sudo')
+        iptables.ipv4['filter'].add_rule('INPUT', '-j ACCEPT')
+        rules = sum(len(table.rules) for table in iptables.ipv4.values())
+        with mock.patch.object(iptables, 'execute', return_value=''):
+            iptables.apply()
+        self.assertEqual(self.stats.timers['iptables.apply'].count, 1)
+        self.assertEqual(self.stats.counters['iptables.rules_applied'],
+                         rules)
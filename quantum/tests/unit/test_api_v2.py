@@ -312,6 +312,17 @@ class JSONV2TestCase(APIv2TestBase):
         tenant_id = _uuid()
         self._test_list(tenant_id + "bad", tenant_id)
 
+    def test_list_policy_error(self):
+        tenant_id = _uuid()
+        env = {'quantum.context': context.Context('', tenant_id)}
+        instance = self.plugin.return_value
+        instance.get_networks.return_value = [{'tenant_id': tenant_id}]
+        with mock.patch('quantum.policy.check', side_effect=KeyError('rule')):
+            res = self.api.get(_get_path('networks'), extra_environ=env,
+                               expect_errors=True)
+        self.assertEqual(res.status_int, exc.HTTPInternalServerError.code)
+        self.assertTrue('QuantumError' in res.json)
+
     def test_create(self):
         net_id = _uuid()
         data = {'network': {'name': 'net1', 'admin_state_up': True,
@@ -734,7 +745,7 @@ class V2Views(unittest.TestCase):
 
 class NotificationTest(APIv2TestBase):
     def _resource_op_notifier(self, opname, resource, expected_errors=False,
-                              notification_level='INFO'):
+                              notification_level='INFO', start_event=True):
         initial_input = {resource: {'name': 'myname'}}
         instance = self.plugin.return_value
         instance.get_networks.return_value = initial_input
@@ -757,15 +768,17 @@ class NotificationTest(APIv2TestBase):
                     expect_errors=expected_errors)
                 expected_code = exc.HTTPNoContent.code
             expected = [mock.call(mock.ANY,
-                                  'network.' + cfg.CONF.host,
-                                  resource + "." + opname + ".start",
-                                  notification_level,
-                                  mock.ANY),
-                        mock.call(mock.ANY,
                                   'network.' + cfg.CONF.host,
                                   resource + "." + opname + ".end",
                                   notification_level,
                                   mock.ANY)]
+            if start_event:
+                expected.insert(0, mock.call(mock.ANY,
+                                             'network.' + cfg.CONF.host,
+                                             resource + "." + opname +
+                                             ".start",
+                                             notification_level,
+                                             mock.ANY))
             self.assertEqual(expected, mynotifier.call_args_list)
         self.assertEqual(res.status_int, expected_code)
 
@@ -783,6 +796,18 @@ class NotificationTest(APIv2TestBase):
         self._resource_op_notifier('create', 'network',
                                    notification_level='DEBUG')
 
+    def test_network_create_notifier_without_start_event(self):
+        cfg.CONF.set_override('notify_start_events', False)
+        self._resource_op_notifier('create', 'network', start_event=False)
+
+    def test_network_update_notifier_without_start_event(self):
+        cfg.CONF.set_override('notify_start_events', False)
+        self._resource_op_notifier('update', 'network', start_event=False)
+
+    def test_network_delete_notifier_without_start_event(self):
+        cfg.CONF.set_override('notify_start_events', False)
+        self._resource_op_notifier('delete', 'network', start_event=False)
+
 
 class QuotaTest(APIv2TestBase):
     def test_create_network_quota(self):
@@ -980,6 +1005,55 @@ class FiltersTestCase(unittest.TestCase):
         self.assertDictEqual(actual_val, expect_val)
 
 
+class ResourceAttributesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.attr_info = {
+            'id': {'allow_post': False, 'allow_put': False,
+                   'validate': {'type:uuid': None}},
+            'name': {'allow_post': True, 'allow_put': True,
+                     'validate': {'type:regex': '^[a-z]*$'},
+                     'default': ''},
+            'size': {'allow_post': True, 'allow_put': False,
+                     'convert_to': attributes.convert_to_int,
+                     'validate': {'type:range': [1, 10]}},
+            'tenant_id': {'allow_post': True, 'allow_put': False,
+                          'required_by_policy': True}}
+        self.context = context.Context('', 'tenant')
+
+    def test_validators_compiled_once(self):
+        with mock.patch.object(attributes, 'compile_validator',
+                               wraps=attributes.compile_validator) as compile:
+            res_attrs = base.ResourceAttributes(self.attr_info)
+            self.assertEqual(compile.call_count, 3)
+            for i in range(3):
+                res_attrs.prepare_request_body(
+                    self.context, {'fake': {'size': '2'}}, True, 'fake')
+            self.assertEqual(compile.call_count, 3)
+
+    def test_prepare_bulk_body(self):
+        res_attrs = base.ResourceAttributes(self.attr_info)
+        body = {'fakes': [{'fake': {'size': '2'}},
+                          {'name': 'foo', 'size': 3}]}
+        body = res_attrs.prepare_request_body(self.context, body, True,
+                                              'fake', allow_bulk=True)
+        self.assertEqual(body['fakes'],
+                         [{'fake': {'name': '', 'size': 2,
+                                    'tenant_id': 'tenant'}},
+                          {'fake': {'name': 'foo', 'size': 3,
+                                    'tenant_id': 'tenant'}}])
+
+    def test_prepare_body_invalid(self):
+        res_attrs = base.ResourceAttributes(self.attr_info)
+        for body, is_create in (({'fake': {}}, True),
+                                ({'fake': {'id': _uuid(), 'size': 2}}, True),
+                                ({'fake': {'size': 11}}, True),
+                                ({'fake': {'size': 2, 'name': 'A'}}, True),
+                                ({'fake': {'size': 2}}, False)):
+            self.assertRaises(exc.HTTPBadRequest,
+                              res_attrs.prepare_request_body,
+                              self.context, body, is_create, 'fake')
+
+
 class CreateResourceTestCase(unittest.TestCase):
     def test_resource_creation(self):
         resource = base.create_resource('fakes', 'fake', None, {})
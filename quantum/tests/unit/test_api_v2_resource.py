@@ -26,7 +26,10 @@ import webtest
 
 from quantum.api.v2 import resource as wsgi_resource
 from quantum.common import exceptions as q_exc
+from quantum.common import profiler
 from quantum import context
+from quantum.openstack.common import jsonutils as json
+from quantum import wsgi
 
 
 class RequestTestCase(unittest.TestCase):
@@ -99,6 +102,55 @@ class ResourceTestCase(unittest.TestCase):
         res = resource.get('', extra_environ=environ, expect_errors=True)
         self.assertEqual(res.status_int, 200)
 
+    def _test_collection_stream(self, fmt, items, serializers=None):
+        controller = mock.MagicMock()
+        controller.index = lambda request: {'things': items}
+
+        resource = webtest.TestApp(wsgi_resource.Resource(
+            controller, serializers=serializers))
+
+        environ = {'wsgiorg.routing_args': (None, {'action': 'index',
+                                                   'format': fmt})}
+        res = resource.get('', extra_environ=environ)
+        self.assertEqual(res.status_int, 200)
+        return res
+
+    def test_collection_stream_json(self):
+        items = [{'id': str(i), 'name': 'thing%d' % i} for i in range(3)]
+        res = self._test_collection_stream('json', items)
+        self.assertEqual(res.body, json.dumps({'things': items}))
+
+    def test_collection_stream_json_empty(self):
+        res = self._test_collection_stream('json', [])
+        self.assertEqual(res.body, json.dumps({'things': []}))
+
+    def test_collection_stream_xml(self):
+        items = [{'id': str(i), 'name': 'thing%d' % i} for i in range(3)]
+        res = self._test_collection_stream('xml', items)
+        serializer = wsgi.XMLDictSerializer()
+        self.assertEqual(res.body, serializer({'things': items}))
+
+    def test_collection_stream_xml_empty(self):
+        res = self._test_collection_stream('xml', [])
+        serializer = wsgi.XMLDictSerializer()
+        self.assertEqual(res.body, serializer({'things': []}))
+
+    def test_collection_stream_custom_serializer(self):
+        items = [{'id': '1'}]
+        serializer = mock.Mock(spec=['__call__'], return_value='things')
+        res = self._test_collection_stream(
+            'json', items, serializers={'application/json': serializer})
+        serializer.assert_called_once_with({'things': items})
+        self.assertEqual(res.body, 'things')
+
+    def test_collection_stream_profiled(self):
+        profile = profiler.start()
+        try:
+            self._test_collection_stream('json', [{'id': '1'}])
+        finally:
+            profiler.stop(profile)
+        self.assertEqual(profile.spans[profiler.SERIALIZATION][0], 1)
+
     def test_status_204(self):
         controller = mock.MagicMock()
         controller.test = lambda request: {'foo': 'bar'}
@@ -128,3 +180,17 @@ class ResourceTestCase(unittest.TestCase):
         res = resource.post('', params='{"key": "val"}',
                             extra_environ=environ, expect_errors=True)
         self.assertEqual(res.status_int, 200)
+
+
+class SerializerTestCase(unittest.TestCase):
+    def test_buffer_chunks(self):
+        chunks = list(wsgi.buffer_chunks(['ab', 'c', 'de', 'f'], size=3))
+        self.assertEqual(chunks, ['abc', 'def'])
+
+    def test_xml_collection_with_metadata(self):
+        metadata = {'plurals': {'things': 'thing'},
+                    'attributes': {'thing': ['id']}}
+        serializer = wsgi.XMLDictSerializer(metadata, 'http://ns')
+        items = [{'id': 'a', 'tags': ['x', 'y']}, {'id': 'b', 'tags': []}]
+        body = ''.join(serializer.serialize_collection('things', iter(items)))
+        self.assertEqual(body, serializer({'things': items}))
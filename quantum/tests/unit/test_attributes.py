@@ -15,6 +15,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import re
+
+import mock
 import unittest2
 
 from quantum.api.v2 import attributes
@@ -364,6 +367,19 @@ class TestAttributes(unittest2.TestCase):
         msg = attributes._validate_regex(data, pattern)
         self.assertIsNone(msg)
 
+    def test_compile_validator_regex(self):
+        with mock.patch('re.compile', wraps=re.compile) as re_compile:
+            validator = attributes.compile_validator('type:regex', '[hc]at')
+            self.assertIsNone(validator('hat'))
+            self.assertIsNone(validator('cat'))
+            self.assertEqual(validator('bat'), "'bat' is not a valid input")
+        re_compile.assert_called_once_with('[hc]at')
+
+    def test_compile_validator(self):
+        validator = attributes.compile_validator('type:range', [1, 10])
+        self.assertIsNone(validator(5))
+        self.assertEqual(validator(11), "'11' is not in range 1 through 10")
+
     def test_validate_uuid(self):
         msg = attributes._validate_uuid('garbage')
         self.assertEqual(msg, "'garbage' is not a valid UUID")
@@ -0,0 +1,97 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+import unittest2 as unittest
+
+from quantum.common import buffered_notifier
+from quantum.openstack.common import cfg
+
+
+def _message(i):
+    return {'message_id': i, 'event_type': 'network.create.end'}
+
+
+class TestNotificationBuffer(unittest.TestCase):
+    def setUp(self):
+        self.driver = mock.Mock()
+        self.addCleanup(buffered_notifier._reset_buffer)
+
+    def _buffer(self, size=10, batch_size=2,
+                policy=buffered_notifier.DROP_OLDEST):
+        return buffered_notifier.NotificationBuffer([self.driver], size,
+                                                    batch_size, policy)
+
+    def _published(self):
+        return [args[1]['message_id']
+                for args, kwargs in self.driver.notify.call_args_list]
+
+    def test_publish_in_background(self):
+        buf = self._buffer()
+        for i in range(5):
+            buf.put('ctxt', _message(i))
+        self.assertFalse(self.driver.notify.called)
+        eventlet.sleep(0)
+        # only the first batch is published before yielding
+        self.assertEqual(self._published(), [0, 1])
+        while len(buf):
+            eventlet.sleep(0)
+        self.assertEqual(self._published(), range(5))
+        buf.put('ctxt', _message(5))
+        eventlet.sleep(0)
+        self.assertEqual(self._published(), range(6))
+
+    def test_drop_oldest(self):
+        buf = self._buffer(size=2)
+        for i in range(3):
+            buf.put('ctxt', _message(i))
+        self.assertEqual(buf.dropped, 1)
+        buf.flush()
+        self.assertEqual(self._published(), [1, 2])
+
+    def test_drop_newest(self):
+        buf = self._buffer(size=2, policy=buffered_notifier.DROP_NEWEST)
+        for i in range(3):
+            buf.put('ctxt', _message(i))
+        self.assertEqual(buf.dropped, 1)
+        buf.flush()
+        self.assertEqual(self._published(), [0, 1])
+
+    def test_invalid_policy(self):
+        self.assertRaises(ValueError, self._buffer, policy='drop_random')
+
+    def test_driver_failure_does_not_stop_publishing(self):
+        self.driver.notify.side_effect = [Exception(), None]
+        buf = self._buffer()
+        buf.put('ctxt', _message(0))
+        buf.put('ctxt', _message(1))
+        buf.flush()
+        self.assertEqual(self._published(), [0, 1])
+        self.assertEqual(len(buf), 0)
+
+    def test_notify_and_flush(self):
+        cfg.CONF.set_override('buffered_notification_driver',
+                              ['quantum.openstack.common.notifier.'
+                               'no_op_notifier'])
+        self.addCleanup(cfg.CONF.reset)
+        with mock.patch('quantum.openstack.common.notifier.no_op_notifier.'
+                        'notify') as notify:
+            buffered_notifier.notify('ctxt', _message(0))
+            self.assertFalse(notify.called)
+            buffered_notifier.flush()
+            notify.assert_called_once_with('ctxt', _message(0))
@@ -0,0 +1,171 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import unittest2 as unittest
+import webob.dec
+import webtest
+
+from quantum.api import profiling
+from quantum.common import profiler
+from quantum.db import api as db
+from quantum.db import models_v2
+from quantum.openstack.common.notifier import api as notifier_api
+from quantum.openstack.common.rpc import proxy
+
+
+@profiler.profiled('fake')
+def _fake_call(fail=False):
+    if fail:
+        raise ValueError()
+    return 'result'
+
+
+def _undo_install(test):
+    """Undo the wrapping done by profiler.install() when test ends."""
+    test.addCleanup(setattr, profiler, '_installed', profiler._installed)
+    for method in ('call', 'multicall', 'cast', 'fanout_cast',
+                   'cast_to_server', 'fanout_cast_to_server'):
+        test.addCleanup(setattr, proxy.RpcProxy, method,
+                        proxy.RpcProxy.__dict__[method])
+    test.addCleanup(setattr, notifier_api, 'notify', notifier_api.notify)
+
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        profile = profiler.current()
+        if profile:
+            profiler.stop(profile)
+        super(TestProfiler, self).tearDown()
+
+    def test_not_profiled(self):
+        self.assertIsNone(profiler.current())
+        self.assertEqual(_fake_call(), 'result')
+        with profiler.span('fake'):
+            pass
+        self.assertIsNone(profiler.current())
+
+    def test_profiled_calls(self):
+        profile = profiler.start()
+        self.assertIs(profiler.current(), profile)
+        self.assertEqual(_fake_call(), 'result')
+        self.assertRaises(ValueError, _fake_call, True)
+        with profiler.span('other'):
+            pass
+        profiler.stop(profile)
+        self.assertIsNone(profiler.current())
+        self.assertEqual(sorted(profile.spans), ['fake', 'other'])
+        self.assertEqual(profile.spans['fake'][0], 2)
+        self.assertEqual(profile.spans['other'][0], 1)
+        self.assertTrue(profile.duration >= profile.spans['fake'][1])
+
+    def test_str(self):
+        profile = profiler.Profile()
+        profile.add('db', 0.5)
+        profile.add('db', 0.25)
+        profile.add('policy', 0.125)
+        profile.duration = 1
+        self.assertEqual(str(profile),
+                         'total=1.0000; db=2/0.7500; policy=1/0.1250')
+
+    def test_iter_span(self):
+        self.assertEqual(list(profiler.iter_span('fake', 'ab')), ['a', 'b'])
+        profile = profiler.start()
+        self.assertEqual(list(profiler.iter_span('fake', 'ab')), ['a', 'b'])
+        profiler.stop(profile)
+        self.assertEqual(profile.spans['fake'][0], 1)
+
+    def test_sql_statements(self):
+        db.configure_db()
+        self.addCleanup(db.clear_db)
+        session = db.get_session()
+        profile = profiler.start()
+        session.query(models_v2.Network).all()
+        session.query(models_v2.Port).count()
+        profiler.stop(profile)
+        self.assertEqual(profile.spans['db'][0], 2)
+
+    def test_install_wraps_rpc_calls(self):
+        _undo_install(self)
+        profiler.install()
+        rpc_proxy = proxy.RpcProxy('topic', '1.0')
+        profile = profiler.start()
+        with mock.patch('quantum.openstack.common.rpc.cast') as cast:
+            rpc_proxy.cast('ctxt', rpc_proxy.make_msg('method'))
+            self.assertTrue(cast.called)
+        self.assertEqual(profile.spans['rpc'][0], 1)
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+    def setUp(self):
+        super(TestProfilingMiddleware, self).setUp()
+        _undo_install(self)
+        self.profile = None
+
+        def body():
+            _fake_call()
+            yield 'a'
+            yield 'b'
+
+        @webob.dec.wsgify
+        def app(req):
+            _fake_call()
+            self.profile = profiler.current()
+            return webob.Response(app_iter=body())
+
+        self.app = app
+
+    def _middleware(self, **kwargs):
+        return webtest.TestApp(profiling.ProfilingMiddleware(self.app,
+                                                             **kwargs))
+
+    def test_headers(self):
+        res = self._middleware(headers='true').get('/')
+        self.assertEqual(res.body, 'ab')
+        profile = self.profile
+        self.assertEqual(res.headers[profiling.PROFILE_HEADER], str(profile))
+        self.assertEqual(profile.spans['fake'][0], 2)
+        self.assertIsNone(profiler.current())
+
+    def test_no_headers_by_default(self):
+        res = self._middleware().get('/')
+        self.assertFalse(profiling.PROFILE_HEADER in res.headers)
+        self.assertEqual(res.body, 'ab')
+        # the streamed body is profiled while it is sent
+        self.assertEqual(self.profile.spans['fake'][0], 2)
+        self.assertIsNotNone(self.profile.duration)
+        self.assertIsNone(profiler.current())
+
+    def test_body_not_read_before_sent(self):
+        middleware = profiling.ProfilingMiddleware(self.app)
+        response = webob.Request.blank('/').get_response(middleware)
+        self.assertEqual(self.profile.spans['fake'][0], 1)
+        self.assertIsNone(profiler.current())
+        self.assertEqual(response.body, 'ab')
+        self.assertEqual(self.profile.spans['fake'][0], 2)
+
+    def test_sampling_off(self):
+        res = self._middleware(sample_rate='0', headers='true').get('/')
+        self.assertFalse(profiling.PROFILE_HEADER in res.headers)
+        self.assertIsNone(self.profile)
+
+    def test_slow_request_logged(self):
+        with mock.patch.object(profiling.LOG, 'info') as info:
+            self._middleware(slow_request_threshold='60').get('/')
+            self._middleware(slow_request_threshold='0').get('/')
+        self.assertEqual(info.call_count, 1)
+        self.assertEqual(info.call_args[0][1]['profile'], self.profile)
@@ -0,0 +1,159 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+import unittest2 as unittest
+
+from quantum.common import rpc as q_rpc
+from quantum import context as q_context
+from quantum.openstack.common import cfg
+
+
+class FakeCallbacks(object):
+    RPC_API_VERSION = '1.1'
+
+    def __init__(self):
+        self.calls = []
+
+    def echo(self, rpc_context, **kwargs):
+        self.calls.append(('echo', kwargs))
+        return kwargs['value']
+
+    def fail(self, rpc_context, **kwargs):
+        self.calls.append(('fail', kwargs))
+        raise ValueError('boom')
+
+    def wait(self, rpc_context, **kwargs):
+        kwargs['event'].wait()
+
+    def whoami(self, rpc_context, **kwargs):
+        return (isinstance(rpc_context, q_context.Context),
+                rpc_context.tenant_id)
+
+
+class TestPluginRpcDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.callbacks = FakeCallbacks()
+        self.dispatcher = q_rpc.PluginRpcDispatcher([self.callbacks])
+        self.ctxt = q_context.Context('fake_user', 'fake_project')
+
+    def _make_call(self, method, version=None, **kwargs):
+        call = {'method': method, 'args': kwargs}
+        if version:
+            call['version'] = version
+        return call
+
+    def test_dispatch_converts_context(self):
+        self.assertEqual(self.dispatcher.dispatch(self.ctxt, '1.0', 'whoami'),
+                         (True, 'fake_project'))
+
+    def test_dispatch_batch_in_order(self):
+        calls = [self._make_call('echo', value=1),
+                 self._make_call('echo', '1.1', value=2)]
+        replies = self.dispatcher.dispatch(self.ctxt, '1.0',
+                                           q_rpc.BATCH_CALL, calls=calls)
+        self.assertEqual(replies, [{'result': 1}, {'result': 2}])
+        self.assertEqual(self.callbacks.calls,
+                         [('echo', {'value': 1}), ('echo', {'value': 2})])
+
+    def test_dispatch_batch_failure_does_not_abort(self):
+        calls = [self._make_call('fail'),
+                 self._make_call('echo', '2.0', value=1),
+                 self._make_call('echo', value=2)]
+        replies = self.dispatcher.dispatch(self.ctxt, '1.0',
+                                           q_rpc.BATCH_CALL, calls=calls)
+        self.assertEqual(len(replies), 3)
+        self.assertIn('failure', replies[0])
+        self.assertIn('ValueError', replies[0]['failure'])
+        self.assertIn('UnsupportedRpcVersion', replies[1]['failure'])
+        self.assertEqual(replies[2], {'result': 2})
+
+    def test_dispatch_batch_context(self):
+        replies = self.dispatcher.dispatch(self.ctxt, '1.0', q_rpc.BATCH_CALL,
+                                           calls=[self._make_call('whoami')])
+        self.assertEqual(replies, [{'result': (True, 'fake_project')}])
+
+
+class TestPluginRpcDispatcherLimits(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(cfg.CONF.reset)
+        self.callbacks = FakeCallbacks()
+        self.ctxt = q_context.Context('fake_user', 'fake_project')
+
+    def _spawn_waiters(self, dispatcher, method, count):
+        event = eventlet.event.Event()
+        threads = [eventlet.spawn(dispatcher.dispatch, self.ctxt, '1.0',
+                                  method, event=event)
+                   for i in range(count)]
+        eventlet.sleep(0)
+        return event, threads
+
+    def _release(self, event, threads):
+        event.send()
+        for thread in threads:
+            thread.wait()
+
+    def test_max_concurrency(self):
+        cfg.CONF.set_override('rpc_dispatch_max_concurrency', 2)
+        dispatcher = q_rpc.PluginRpcDispatcher([self.callbacks])
+        event, threads = self._spawn_waiters(dispatcher, 'wait', 3)
+        self.assertEqual(dispatcher.stats.in_flight, 2)
+        self.assertEqual(dispatcher.stats.waiting, 1)
+        self._release(event, threads)
+        stats = dispatcher.stats.to_dict()
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['waiting'], 0)
+        self.assertEqual(stats['methods']['wait']['calls'], 3)
+
+    def test_method_limits(self):
+        cfg.CONF.set_override('rpc_dispatch_method_limits', ['wait:1'])
+        dispatcher = q_rpc.PluginRpcDispatcher([self.callbacks])
+        event, threads = self._spawn_waiters(dispatcher, 'wait', 2)
+        self.assertEqual(dispatcher.stats.in_flight, 2)
+        self.assertEqual(dispatcher.stats.waiting, 1)
+        # other methods are not affected by the limit
+        self.assertEqual(dispatcher.dispatch(self.ctxt, '1.0', 'echo',
+                                             value=1), 1)
+        self._release(event, threads)
+        self.assertEqual(dispatcher.stats.waiting, 0)
+
+    def test_unlimited_by_default(self):
+        dispatcher = q_rpc.PluginRpcDispatcher([self.callbacks])
+        event, threads = self._spawn_waiters(dispatcher, 'wait', 5)
+        self.assertEqual(dispatcher.stats.in_flight, 5)
+        self.assertEqual(dispatcher.stats.waiting, 0)
+        self._release(event, threads)
+
+    def test_stats_record_failures(self):
+        dispatcher = q_rpc.PluginRpcDispatcher([self.callbacks])
+        self.assertRaises(ValueError, dispatcher.dispatch, self.ctxt, '1.0',
+                          'fail')
+        dispatcher.dispatch(self.ctxt, '1.0', q_rpc.BATCH_CALL,
+                            calls=[{'method': 'echo', 'args': {'value': 1}}])
+        methods = dispatcher.stats.to_dict()['methods']
+        self.assertEqual(methods['fail']['calls'], 1)
+        self.assertEqual(methods['echo']['calls'], 1)
+        self.assertNotIn(q_rpc.BATCH_CALL, methods)
+
+    def test_report_stats(self):
+        cfg.CONF.set_override('rpc_dispatch_report_interval', 10)
+        with mock.patch('quantum.openstack.common.loopingcall.'
+                        'LoopingCall') as looping_call:
+            dispatcher = q_rpc.PluginRpcDispatcher([self.callbacks])
+        looping_call.assert_called_once_with(dispatcher._report_stats)
+        looping_call.return_value.start.assert_called_once_with(interval=10)
@@ -41,6 +41,7 @@ from quantum.db import models_v2
 from quantum.manager import QuantumManager
 from quantum.openstack.common import cfg
 from quantum.openstack.common import timeutils
+from quantum.openstack.common import uuidutils
 from quantum.tests.unit import test_extensions
 from quantum.tests.unit.testlib_api import create_request
 from quantum.wsgi import Serializer, JSONDeserializer
@@ -766,6 +767,27 @@ class TestPortsV2(QuantumDbPluginV2TestCase):
                                self.port()) as ports:
             self._test_list_resources('port', ports)
 
+    def test_list_ports_with_fields_loads_requested_columns(self):
+        plugin = QuantumManager.get_plugin()
+        ctx = context.get_admin_context()
+        statements = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.port() as port:
+            # the engine and its listeners are dropped by tearDown
+            sa.event.listen(ctx.session.get_bind(), 'before_cursor_execute',
+                            _record)
+            ports = plugin.get_ports(ctx, filters={},
+                                     fields=['id', 'device_id'])
+            self.assertEqual(ports, [{'id': port['port']['id'],
+                                      'device_id': ''}])
+            sql = ' '.join(statements)
+            self.assertIn('ports.device_id', sql)
+            self.assertNotIn('ports.mac_address', sql)
+            self.assertNotIn('ipallocations', sql)
+
     def test_list_ports_filtered_by_fixed_ip(self):
         # for this test we need to enable overlapping ips
         cfg.CONF.set_default('allow_overlapping_ips', True)
@@ -2880,6 +2902,101 @@ class TestSubnetsV2(QuantumDbPluginV2TestCase):
         self.assertEqual(res.status_int, 204)
 
 
+class TestRevisions(QuantumDbPluginV2TestCase):
+
+    def setUp(self):
+        super(TestRevisions, self).setUp(plugin=DB_PLUGIN_KLASS)
+
+    def _get_etag(self, req, etag=None, expected_code=webob.exc.HTTPOk.code):
+        if etag:
+            req.headers['If-None-Match'] = '"%s"' % etag
+        res = req.get_response(self.api)
+        self.assertEqual(res.status_int, expected_code)
+        self.assertTrue(res.etag)
+        return res.etag
+
+    def test_show_network_not_modified(self):
+        with self.network() as net:
+            net_id = net['network']['id']
+            etag = self._get_etag(self.new_show_request('networks', net_id))
+            new_etag = self._get_etag(self.new_show_request('networks',
+                                                            net_id),
+                                      etag,
+                                      webob.exc.HTTPNotModified.code)
+            self.assertEqual(new_etag, etag)
+            self._update('networks', net_id, {'network': {'name': 'net2'}})
+            new_etag = self._get_etag(self.new_show_request('networks',
+                                                            net_id),
+                                      etag)
+            self.assertNotEqual(new_etag, etag)
+
+    def test_show_network_etag_depends_on_fields(self):
+        with self.network() as net:
+            req = self.new_show_request('networks', net['network']['id'])
+            etag = self._get_etag(req)
+            req = self._req('GET', 'networks', id=net['network']['id'],
+                            params='fields=name')
+            self.assertNotEqual(self._get_etag(req, etag), etag)
+
+    def test_network_etag_changes_with_subnets(self):
+        with self.network() as net:
+            req = self.new_show_request('networks', net['network']['id'])
+            etag = self._get_etag(req)
+            with self.subnet(network=net):
+                req = self.new_show_request('networks', net['network']['id'])
+                self.assertNotEqual(self._get_etag(req, etag), etag)
+
+    def test_port_etag_changes_with_fixed_ips(self):
+        with self.subnet() as subnet:
+            with self.port(subnet=subnet) as port:
+                req = self.new_show_request('ports', port['port']['id'])
+                etag = self._get_etag(req)
+                data = {'port': {'fixed_ips': [{'subnet_id':
+                                                subnet['subnet']['id'],
+                                                'ip_address': "10.0.0.10"}]}}
+                req = self.new_update_request('ports', data,
+                                              port['port']['id'])
+                req.get_response(self.api)
+                req = self.new_show_request('ports', port['port']['id'])
+                self.assertNotEqual(self._get_etag(req, etag), etag)
+
+    def test_port_etag_changes_with_removed_fixed_ip(self):
+        with self.subnet() as subnet:
+            fixed_ips = [{'subnet_id': subnet['subnet']['id'],
+                          'ip_address': '10.0.0.5'},
+                         {'subnet_id': subnet['subnet']['id'],
+                          'ip_address': '10.0.0.6'}]
+            with self.port(subnet=subnet, fixed_ips=fixed_ips) as port:
+                req = self.new_show_request('ports', port['port']['id'])
+                etag = self._get_etag(req)
+                data = {'port': {'fixed_ips': fixed_ips[:1]}}
+                req = self.new_update_request('ports', data,
+                                              port['port']['id'])
+                req.get_response(self.api)
+                req = self.new_show_request('ports', port['port']['id'])
+                self.assertNotEqual(self._get_etag(req, etag), etag)
+
+    def test_list_networks_not_modified(self):
+        with self.network():
+            etag = self._get_etag(self.new_list_request('networks'))
+            self._get_etag(self.new_list_request('networks'), etag,
+                           webob.exc.HTTPNotModified.code)
+            with self.network():
+                new_etag = self._get_etag(self.new_list_request('networks'),
+                                          etag)
+                self.assertNotEqual(new_etag, etag)
+            self.assertNotEqual(
+                self._get_etag(self.new_list_request('networks'), new_etag),
+                new_etag)
+
+    def test_show_network_not_found(self):
+        req = self.new_show_request('networks',
+                                    uuidutils.generate_uuid())
+        req.headers['If-None-Match'] = '*'
+        res = req.get_response(self.api)
+        self.assertEqual(res.status_int, webob.exc.HTTPNotFound.code)
+
+
 class DbModelTestCase(unittest2.TestCase):
     """ DB model tests """
     def test_repr(self):
@@ -2889,7 +3006,7 @@ class DbModelTestCase(unittest2.TestCase):
         actual_repr_output = repr(network)
         exp_start_with = "<quantum.db.models_v2.Network"
         exp_middle = "[object at %x]" % id(network)
-        exp_end_with = (" {tenant_id=None, id=None, "
+        exp_end_with = (" {tenant_id=None, id=None, revision=None, "
                         "name='net_net', status='OK', "
                         "admin_state_up=True, shared=None}>")
         final_exp = exp_start_with + exp_middle + exp_end_with
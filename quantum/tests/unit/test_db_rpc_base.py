@@ -63,6 +63,76 @@ class TestDhcpRpcCallackMixin(unittest.TestCase):
         self.assertEqual(retval['subnets'], subnet_retval)
         self.assertEqual(retval['ports'], port_retval)
 
+    def test_get_active_networks_info(self):
+        context = mock.Mock()
+        query = context.session.query.return_value.filter_by.return_value
+        query = query.filter.return_value.order_by.return_value
+        query.limit.return_value = [('a',), ('b',)]
+        self.plugin.get_networks.return_value = [dict(id='b'), dict(id='a')]
+        self.plugin.get_subnets.return_value = [dict(id='s1',
+                                                     network_id='a')]
+        self.plugin.get_ports.return_value = [dict(id='p1', network_id='b'),
+                                              dict(id='p2', network_id='b')]
+
+        page = self.callbacks.get_active_networks_info(
+            context, host='host', marker='0', limit=2)
+        networks = page['networks']
+
+        query.limit.assert_called_once_with(2)
+        self.assertEqual('b', page['marker'])
+        self.assertEqual(['a', 'b'], [net['id'] for net in networks])
+        self.assertEqual(['s1'], [s['id'] for s in networks[0]['subnets']])
+        self.assertEqual([], networks[1]['subnets'])
+        self.assertEqual([], networks[0]['ports'])
+        self.assertEqual(['p1', 'p2'],
+                         [p['id'] for p in networks[1]['ports']])
+        self.plugin.assert_has_calls(
+            [mock.call.get_networks(context, filters=dict(id=['a', 'b'])),
+             mock.call.get_subnets(context,
+                                   filters=dict(network_id=['a', 'b'])),
+             mock.call.get_ports(context,
+                                 filters=dict(network_id=['a', 'b']))])
+
+    def test_get_active_networks_info_last_page(self):
+        context = mock.Mock()
+        query = context.session.query.return_value.filter_by.return_value
+        query.order_by.return_value.limit.return_value = []
+
+        page = self.callbacks.get_active_networks_info(context,
+                                                       host='host',
+                                                       limit=2)
+        self.assertEqual({'networks': [], 'marker': None}, page)
+        self.assertFalse(self.plugin.get_networks.called)
+
+    def test_get_active_networks_info_removed_network(self):
+        context = mock.Mock()
+        query = context.session.query.return_value.filter_by.return_value
+        query.order_by.return_value.limit.return_value = [('a',), ('b',)]
+        # b was deleted after its id was paged over
+        self.plugin.get_networks.return_value = [dict(id='a')]
+        self.plugin.get_subnets.return_value = []
+        self.plugin.get_ports.return_value = []
+
+        page = self.callbacks.get_active_networks_info(context,
+                                                       host='host',
+                                                       limit=2)
+        self.assertEqual(['a'], [net['id'] for net in page['networks']])
+        self.assertEqual('b', page['marker'])
+
+    def test_get_active_networks_info_short_page(self):
+        context = mock.Mock()
+        query = context.session.query.return_value.filter_by.return_value
+        query.order_by.return_value.limit.return_value = [('a',)]
+        self.plugin.get_networks.return_value = [dict(id='a')]
+        self.plugin.get_subnets.return_value = []
+        self.plugin.get_ports.return_value = []
+
+        page = self.callbacks.get_active_networks_info(context,
+                                                       host='host',
+                                                       limit=2)
+        self.assertEqual(['a'], [net['id'] for net in page['networks']])
+        self.assertIsNone(page['marker'])
+
     def _test_get_dhcp_port_helper(self, port_retval, other_expectations=[],
                                    update_port=None, create_port=None):
         subnets_retval = [dict(id='a', enable_dhcp=True),
@@ -0,0 +1,41 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest2
+
+from quantum.db import segmentation_db
+
+
+class FreeRangesTest(unittest2.TestCase):
+    def test_no_allocations(self):
+        self.assertEqual(segmentation_db.free_ranges([(1, 10)], []),
+                         [(1, 10)])
+
+    def test_overlapping_ranges_are_merged(self):
+        self.assertEqual(
+            segmentation_db.free_ranges([(20, 30), (1, 10), (5, 19)], []),
+            [(1, 30)])
+
+    def test_allocated_ids_are_removed(self):
+        self.assertEqual(
+            segmentation_db.free_ranges([(1, 10), (20, 30)],
+                                        [1, 5, 6, 30, 50]),
+            [(2, 4), (7, 10), (20, 29)])
+
+    def test_fully_allocated(self):
+        self.assertEqual(segmentation_db.free_ranges([(1, 3)], [1, 2, 3]),
+                         [])
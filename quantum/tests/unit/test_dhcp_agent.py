@@ -28,6 +28,7 @@ from quantum.agent.linux import interface
 from quantum.common import exceptions
 from quantum.openstack.common import cfg
 from quantum.openstack.common import jsonutils
+from quantum.openstack.common.rpc import common as rpc_common
 
 
 ROOTDIR = os.path.dirname(os.path.dirname(__file__))
@@ -183,6 +184,8 @@ class TestDhcpAgent(unittest.TestCase):
                 self.assertTrue(dhcp.needs_resync)
 
     def _test_sync_state_helper(self, known_networks, active_networks):
+        cfg.CONF.set_override('sync_page_size', 0)
+        self.addCleanup(cfg.CONF.clear_override, 'sync_page_size')
         with mock.patch('quantum.agent.dhcp_agent.DhcpPluginApi') as plug:
             mock_plugin = mock.Mock()
             mock_plugin.get_active_networks.return_value = active_networks
@@ -221,6 +224,7 @@ class TestDhcpAgent(unittest.TestCase):
         with mock.patch('quantum.agent.dhcp_agent.DhcpPluginApi') as plug:
             mock_plugin = mock.Mock()
             mock_plugin.get_active_networks.side_effect = Exception
+            mock_plugin.get_active_networks_info.side_effect = Exception
             plug.return_value = mock_plugin
 
             with mock.patch.object(dhcp_agent.LOG, 'exception') as log:
@@ -230,6 +234,54 @@ class TestDhcpAgent(unittest.TestCase):
                 self.assertTrue(log.called)
                 self.assertTrue(dhcp.needs_resync)
 
+    def test_sync_state_paged(self):
+        cfg.CONF.set_override('sync_page_size', 2)
+        self.addCleanup(cfg.CONF.clear_override, 'sync_page_size')
+        # the middle page is short, a network was removed while it was read
+        pages = [[FakeModel('a'), FakeModel('b')], [FakeModel('c')],
+                 [FakeModel('e')]]
+        with mock.patch('quantum.agent.dhcp_agent.DhcpPluginApi') as plug:
+            mock_plugin = mock.Mock()
+            mock_plugin.get_active_networks_info.side_effect = [
+                (pages[0], 'b'), (pages[1], 'd'), (pages[2], None)]
+            plug.return_value = mock_plugin
+
+            dhcp = dhcp_agent.DhcpAgent(cfg.CONF)
+
+            attrs_to_mock = dict(
+                [(a, mock.DEFAULT) for a in
+                 ['refresh_dhcp_helper', 'disable_dhcp_helper', 'cache']])
+
+            with mock.patch.multiple(dhcp, **attrs_to_mock) as mocks:
+                mocks['cache'].get_network_ids.return_value = ['a', 'd']
+                dhcp.sync_state()
+
+                mock_plugin.assert_has_calls(
+                    [mock.call.get_active_networks_info(None, 2),
+                     mock.call.get_active_networks_info('b', 2),
+                     mock.call.get_active_networks_info('d', 2)])
+                mocks['refresh_dhcp_helper'].assert_has_calls(
+                    [mock.call(net.id, net) for page in pages
+                     for net in page])
+                mocks['disable_dhcp_helper'].assert_called_once_with('d')
+                self.assertFalse(mock_plugin.get_network_info.called)
+
+    def test_sync_state_paged_unsupported(self):
+        cfg.CONF.set_override('sync_page_size', 2)
+        self.addCleanup(cfg.CONF.clear_override, 'sync_page_size')
+        with mock.patch('quantum.agent.dhcp_agent.DhcpPluginApi') as plug:
+            mock_plugin = mock.Mock()
+            mock_plugin.get_active_networks_info.side_effect = (
+                rpc_common.RemoteError('AttributeError'))
+            mock_plugin.get_active_networks.return_value = ['a']
+            plug.return_value = mock_plugin
+
+            dhcp = dhcp_agent.DhcpAgent(cfg.CONF)
+            with mock.patch.object(dhcp, 'refresh_dhcp_helper') as refresh:
+                dhcp.sync_state()
+                refresh.assert_called_once_with('a')
+            self.assertFalse(dhcp.needs_resync)
+
     def test_periodic_resync(self):
         dhcp = dhcp_agent.DhcpAgent(cfg.CONF)
         with mock.patch.object(dhcp_agent.eventlet, 'spawn') as spawn:
@@ -289,6 +341,12 @@ class TestDhcpAgentEventHandler(unittest.TestCase):
         self.call_driver.assert_called_once_with('enable', fake_network)
         self.cache.assert_has_calls([mock.call.put(fake_network)])
 
+    def test_enable_dhcp_helper_with_network_info(self):
+        self.dhcp.enable_dhcp_helper(fake_network.id, fake_network)
+        self.assertFalse(self.plugin.get_network_info.called)
+        self.call_driver.assert_called_once_with('enable', fake_network)
+        self.cache.assert_has_calls([mock.call.put(fake_network)])
+
     def test_enable_dhcp_helper_down_network(self):
         self.plugin.get_network_info.return_value = fake_down_network
         self.dhcp.enable_dhcp_helper(fake_down_network.id)
@@ -514,6 +572,17 @@ class TestDhcpPluginApiProxy(unittest.TestCase):
                                               network_id='netid',
                                               host='foo')
 
+    def test_get_active_networks_info(self):
+        self.call.return_value = dict(networks=[dict(id='a'), dict(id='b')],
+                                      marker='b')
+        networks, marker = self.proxy.get_active_networks_info('0', 2)
+        self.assertEqual(['a', 'b'], [net.id for net in networks])
+        self.assertEqual('b', marker)
+        self.make_msg.assert_called_once_with('get_active_networks_info',
+                                              host='foo',
+                                              marker='0',
+                                              limit=2)
+
     def test_get_dhcp_port(self):
         self.call.return_value = dict(a=1)
         retval = self.proxy.get_dhcp_port('netid', 'devid')
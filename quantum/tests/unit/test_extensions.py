@@ -33,6 +33,7 @@ from quantum.common import config
 from quantum.db.db_base_plugin_v2 import QuantumDbPluginV2
 from quantum.openstack.common import jsonutils
 from quantum.openstack.common import log as logging
+import quantum.plugins
 from quantum.plugins.common import constants
 from quantum.tests.unit import BaseTest
 from quantum.tests.unit.extension_stubs import (
@@ -537,6 +538,48 @@ class PluginAwareExtensionManagerTest(unittest.TestCase):
         self.assertTrue("e1" in ext_mgr.extensions)
 
 
+class ExtensionManifestTest(unittest.TestCase):
+
+    def _manifest_paths(self):
+        plugins_dir = os.path.dirname(quantum.plugins.__file__)
+        return (quantum.extensions.__path__[0],
+                os.path.join(plugins_dir, 'nec', 'extensions'))
+
+    def test_manifests_match_extensions(self):
+        for path in self._manifest_paths():
+            with open(os.path.join(path, extensions.MANIFEST)) as f:
+                manifest = jsonutils.loads(f.read())
+            for mod_name in manifest.itervalues():
+                self.assertTrue(os.path.exists(os.path.join(path,
+                                                            mod_name + '.py')))
+            ext_mgr = ExtensionManager(path)
+            self.assertTrue(ext_mgr.extensions)
+            for alias, ext in ext_mgr.extensions.iteritems():
+                self.assertEqual(manifest[alias],
+                                 ext.__class__.__module__)
+
+    def test_only_supported_extensions_are_imported(self):
+        path = quantum.extensions.__path__[0]
+        stub_plugin = StubPlugin(supported_extensions=["router"])
+        ext_mgr = PluginAwareExtensionManager(path,
+                                              {constants.CORE: stub_plugin})
+
+        self.assertEqual(ext_mgr.extensions.keys(), ["router"])
+        self.assertEqual(ext_mgr.load_times.keys(),
+                         [os.path.join(path, 'l3.py')])
+
+    def test_path_without_manifest_is_fully_imported(self):
+        path = quantum.tests.unit.extensions.__path__[0]
+        stub_plugin = StubPlugin(supported_extensions=["v2attrs"])
+        ext_mgr = PluginAwareExtensionManager(path,
+                                              {constants.CORE: stub_plugin})
+
+        self.assertEqual(ext_mgr.extensions.keys(), ["v2attrs"])
+        self.assertEqual(sorted(ext_mgr.load_times),
+                         [os.path.join(path, 'foxinsocks.py'),
+                          os.path.join(path, 'v2attributes.py')])
+
+
 class ExtensionControllerTest(unittest.TestCase):
 
     def setUp(self):
@@ -282,6 +282,28 @@ class TestBasicRouterOperations(unittest2.TestCase):
         self.device_exists.assert_has_calls(
             [mock.call(self.conf.external_network_bridge)])
 
+    def testSyncRoutersPaged(self):
+        self.conf.set_override('sync_page_size', 2)
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        pages = [[{'id': 'a'}, {'id': 'b'}], [{'id': 'c'}]]
+        self.plugin_api.get_routers.side_effect = pages
+        with mock.patch.object(agent, '_process_routers') as process:
+            agent._sync_routers_task(None)
+        process.assert_has_calls([mock.call(page) for page in pages])
+        self.plugin_api.get_routers.assert_has_calls(
+            [mock.call(None, router_id=None, marker=None, limit=2),
+             mock.call(None, router_id=None, marker='b', limit=2)])
+        self.assertFalse(agent.fullsync)
+
+    def testSyncRoutersPagingUnsupported(self):
+        self.conf.set_override('sync_page_size', 2)
+        agent = l3_agent.L3NATAgent(HOSTNAME, self.conf)
+        routers = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+        self.plugin_api.get_routers.return_value = routers
+        with mock.patch.object(agent, '_process_routers') as process:
+            agent._sync_routers_task(None)
+        process.assert_called_once_with(routers)
+
     def testDestroyNamespace(self):
 
         class FakeDev(object):
@@ -1407,6 +1407,19 @@ class L3NatDBTestCase(test_db_plugin.QuantumDbPluginV2TestCase):
                                               None,
                                               p['port']['id'])
 
+    def test_l3_agent_routers_query_paged(self):
+        with contextlib.nested(self.router(),
+                               self.router(),
+                               self.router()) as routers:
+            router_ids = sorted(r['router']['id'] for r in routers)
+            plugin = TestL3NatPlugin()
+            ctx = context.get_admin_context()
+            page = plugin.get_sync_data(ctx, None, limit=2)
+            self.assertEqual(router_ids[:2], [r['id'] for r in page])
+            page = plugin.get_sync_data(ctx, None, marker=page[-1]['id'],
+                                        limit=2)
+            self.assertEqual(router_ids[2:], [r['id'] for r in page])
+
     def test_l3_agent_routers_query_ignore_interfaces_with_moreThanOneIp(self):
         with self.router() as r:
             with self.subnet(cidr='9.0.1.0/24') as subnet:
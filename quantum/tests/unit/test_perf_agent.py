@@ -0,0 +1,91 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import shutil
+import tempfile
+
+import mock
+import unittest2 as unittest
+
+from quantum.agent.linux import ip_lib
+from quantum.agent.linux import iptables_manager
+from quantum.agent.linux import ovs_lib
+from quantum.agent.linux import utils
+from quantum.tests.perf import agent
+
+
+class TestFakeKernel(unittest.TestCase):
+    def setUp(self):
+        self.kernel = agent.FakeKernel()
+        execute_p = mock.patch.object(utils, 'execute', self.kernel.execute)
+        execute_p.start()
+        self.addCleanup(execute_p.stop)
+
+    def test_iptables(self):
+        manager = iptables_manager.IptablesManager(root_helper='sudo')
+        manager.ipv4['filter'].add_rule('INPUT', '-j ACCEPT')
+        manager.apply()
+        manager.apply()
+        filter_table = self.kernel.execute(['iptables-save', '-t', 'filter'])
+        self.assertEqual(filter_table.count('-j ACCEPT'), 1)
+        self.assertEqual(self.kernel.commands['iptables-restore'], 4)
+        self.assertTrue(self.kernel.bytes_written > len(filter_table))
+
+    def test_ip(self):
+        ip = ip_lib.IPWrapper('sudo')
+        device = ip.add_tuntap('tap0')
+        device.link.set_address('fa:16:3e:00:00:01')
+        ns = ip.ensure_namespace('ns')
+        ns.add_device_to_namespace(device)
+        device.addr.add(4, '10.0.0.2/24', '10.0.0.255')
+        self.assertFalse(ip_lib.device_exists('tap0', 'sudo'))
+        self.assertTrue(ip_lib.device_exists('tap0', 'sudo', 'ns'))
+        self.assertEqual([addr['cidr'] for addr in device.addr.list()],
+                         ['10.0.0.2/24'])
+        self.assertEqual(ns.get_devices(exclude_loopback=True), [device])
+
+    def test_ovs(self):
+        bridge = ovs_lib.OVSBridge('br-int', 'sudo')
+        bridge.reset_bridge()
+        bridge.add_port('tap0')
+        bridge.add_port('tap1')
+        bridge.set_db_attribute('Interface', 'tap0', 'external-ids:iface-id',
+                                'port0')
+        bridge.set_db_attribute('Interface', 'tap0',
+                                'external-ids:attached-mac', 'fa:16:3e')
+        self.assertEqual(bridge.get_port_name_list(), ['tap0', 'tap1'])
+        self.assertEqual(bridge.get_vif_port_set(), set(['port0']))
+        self.assertTrue(ip_lib.device_exists('br-int', 'sudo'))
+
+
+class TestAgentBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.state_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_path)
+
+    def test_run(self):
+        benchmark = agent.AgentBenchmark(ports=4, rules=3, routers=2,
+                                         floating_ips=2, dhcp_ports=8,
+                                         repeats=2)
+        results = benchmark.run(agent.agent_conf(self.state_path))
+        self.assertEqual(sorted(results), sorted(benchmark.scenarios))
+        self.assertEqual(results['firewall.prepare_port_filter']['ops'], 4)
+        self.assertEqual(
+            results['ovs.get_vif_port_set']['forks_per_op'], 5)
+        self.assertEqual(results['dhcp.reload_allocations']['commands'],
+                         {'kill': 2})
+        self.assertTrue(results['l3.process_router.new']['bytes_per_op'])
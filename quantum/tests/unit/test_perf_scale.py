@@ -0,0 +1,64 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright (c) 2013 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest2 as unittest
+
+from quantum.openstack.common import cfg
+from quantum.tests.perf import scale
+from quantum.tests.unit import test_db_plugin
+
+
+class TestScaleHelpers(unittest.TestCase):
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEqual(scale.percentile(values, 50), 50)
+        self.assertEqual(scale.percentile(values, 99), 99)
+        self.assertEqual(scale.percentile([7], 90), 7)
+        self.assertEqual(scale.percentile([], 90), 0.0)
+
+    def test_cidr(self):
+        self.assertEqual(scale.cidr('10.0.0.0', 0, 4), '10.0.0.0/28')
+        self.assertEqual(scale.cidr('10.0.0.0', 17, 4), '10.0.1.16/28')
+        self.assertEqual(scale.cidr('172.16.0.0', 0, scale.host_bits(1000)),
+                         '172.16.0.0/22')
+
+    def test_compare(self):
+        baseline = {'fast': {'ops_per_sec': 100.0, 'queries_per_op': 2.0},
+                    'slow': {'ops_per_sec': 100.0, 'queries_per_op': 2.0}}
+        results = {'fast': {'ops_per_sec': 90.0, 'queries_per_op': 2.0},
+                   'slow': {'ops_per_sec': 50.0, 'queries_per_op': 3.0},
+                   'new': {'ops_per_sec': 1.0, 'queries_per_op': 100.0}}
+        regressions = scale.compare(results, baseline, 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith('slow:') for r in regressions))
+
+
+class TestScaleBenchmark(test_db_plugin.QuantumDbPluginV2TestCase):
+    def setUp(self):
+        super(TestScaleBenchmark, self).setUp(plugin=scale.PLUGIN)
+        for resource in ('network', 'subnet', 'port'):
+            cfg.CONF.set_override('quota_%s' % resource, -1, 'QUOTAS')
+
+    def test_run(self):
+        benchmark = scale.Benchmark(self.api, 8, 3)
+        results = benchmark.run()
+        self.assertEqual(sorted(results), sorted(benchmark.scenarios))
+        self.assertEqual(results['networks.create']['ops'], 8)
+        self.assertEqual(results['ports.churn.create']['ops'], 3)
+        for res in results.itervalues():
+            self.assertTrue(res['ops'])
+            self.assertTrue(res['queries_per_op'])
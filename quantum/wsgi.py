@@ -35,6 +35,9 @@ from quantum.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+# size of the chunks of the streamed response bodies
+STREAM_CHUNK_SIZE = 65536
+
 
 def run_server(application, port):
     """Run a WSGI server with the given application."""
@@ -187,6 +190,21 @@ class ActionDispatcher(object):
         raise NotImplementedError()
 
 
+def buffer_chunks(chunks, size=STREAM_CHUNK_SIZE):
+    """Join small chunks of a body into chunks of about size bytes."""
+    buf = []
+    length = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buf)
+            buf = []
+            length = 0
+    if buf:
+        yield ''.join(buf)
+
+
 class DictSerializer(ActionDispatcher):
     """Default request body serialization"""
 
@@ -196,6 +214,14 @@ class DictSerializer(ActionDispatcher):
     def default(self, data):
         return ""
 
+    def serialize_collection(self, name, items):
+        """Return an iterator over the serialized {name: items} dict.
+
+        Subclasses override it to serialize the items one at a time, without
+        holding the whole collection nor its serialization in memory.
+        """
+        return iter([self.default({name: list(items)})])
+
 
 class JSONDictSerializer(DictSerializer):
     """Default JSON request body serialization"""
@@ -203,6 +229,21 @@ class JSONDictSerializer(DictSerializer):
     def default(self, data):
         return jsonutils.dumps(data)
 
+    def __call__(self, data):
+        return self.default(data)
+
+    def serialize_collection(self, name, items):
+        return buffer_chunks(self._collection_chunks(name, items))
+
+    def _collection_chunks(self, name, items):
+        # same output as jsonutils.dumps({name: list(items)})
+        yield '{%s: [' % jsonutils.dumps(name)
+        separator = ''
+        for item in items:
+            yield separator + jsonutils.dumps(item)
+            separator = ', '
+        yield ']}'
+
 
 class XMLDictSerializer(DictSerializer):
 
@@ -234,6 +275,30 @@ class XMLDictSerializer(DictSerializer):
         self._add_xmlns(node, has_atom)
         return node.toxml('UTF-8')
 
+    def serialize_collection(self, name, items):
+        return buffer_chunks(self._collection_chunks(name, items))
+
+    def _collection_chunks(self, name, items):
+        # same output as default({name: list(items)}), each item being
+        # converted to a DOM node of its own
+        doc = minidom.Document()
+        empty = self.to_xml_string(self._to_xml_node(doc, self.metadata,
+                                                     name, []))
+        items = iter(items)
+        for item in items:
+            # the tag of the root is only closed by "/>" when it is empty
+            yield empty[:-2] + '>'
+            yield self._to_xml_list_item(doc, self.metadata, name,
+                                         item).toxml('UTF-8')
+            break
+        else:
+            yield empty
+            return
+        for item in items:
+            yield self._to_xml_list_item(doc, self.metadata, name,
+                                         item).toxml('UTF-8')
+        yield '</%s>' % name
+
     #NOTE (ameade): the has_atom should be removed after all of the
     # xml serializers and view builders have been updated to the current
     # spec that required all responses include the xmlns:atom, the has_atom
@@ -256,22 +321,8 @@ class XMLDictSerializer(DictSerializer):
 
         #TODO(bcwaldon): accomplish this without a type-check
         if isinstance(data, list):
-            collections = metadata.get('list_collections', {})
-            if nodename in collections:
-                metadata = collections[nodename]
-                for item in data:
-                    node = doc.createElement(metadata['item_name'])
-                    node.setAttribute(metadata['item_key'], str(item))
-                    result.appendChild(node)
-                return result
-            singular = metadata.get('plurals', {}).get(nodename, None)
-            if singular is None:
-                if nodename.endswith('s'):
-                    singular = nodename[:-1]
-                else:
-                    singular = 'item'
             for item in data:
-                node = self._to_xml_node(doc, metadata, singular, item)
+                node = self._to_xml_list_item(doc, metadata, nodename, item)
                 result.appendChild(node)
         #TODO(bcwaldon): accomplish this without a type-check
         elif isinstance(data, dict):
@@ -298,6 +349,22 @@ class XMLDictSerializer(DictSerializer):
             result.appendChild(node)
         return result
 
+    def _to_xml_list_item(self, doc, metadata, nodename, item):
+        """Convert an item of the nodename list to an XML node."""
+        collections = metadata.get('list_collections', {})
+        if nodename in collections:
+            metadata = collections[nodename]
+            node = doc.createElement(metadata['item_name'])
+            node.setAttribute(metadata['item_key'], str(item))
+            return node
+        singular = metadata.get('plurals', {}).get(nodename, None)
+        if singular is None:
+            if nodename.endswith('s'):
+                singular = nodename[:-1]
+            else:
+                singular = 'item'
+        return self._to_xml_node(doc, metadata, singular, item)
+
     def _create_link_nodes(self, xml_doc, links):
         link_nodes = []
         for link in links: